@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # SearchVectorField 등 PostgreSQL 전용 기능
     "accounts",  # 사용자 정의 앱
     "books",  # 책 관련 앱
 ]
@@ -98,6 +100,35 @@ DATABASES = {
         "PORT": os.getenv("DB_PORT", "5432"),
     }
 }
+
+# 캐시: REDIS_URL이 있으면 Redis(redis 패키지 필요), 없으면 프로세스 메모리 (개발, 테스트)
+# 예: REDIS_URL=redis://localhost:6379/0
+# 프로세스 메모리 캐시는 프로세스마다 따로이므로, 도서를 저장한 프로세스 밖에서는 상세 화면 캐시가
+# 무효화되지 않습니다. (books/detail_cache.py) 그래서 DEBUG가 아니면 REDIS_URL이 필요합니다.
+REDIS_URL = os.getenv("REDIS_URL")
+if not REDIS_URL and not DEBUG:
+    raise ImproperlyConfigured(
+        "REDIS_URL must be set when DEBUG is off; a per-process cache cannot be "
+        "invalidated across worker processes."
+    )
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "hapinus",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "hapinus",
+            # 도서 상세 화면은 도서마다 키를 5개쯤 쓰므로 기본값(300)보다 크게
+            "OPTIONS": {"MAX_ENTRIES": 50000},
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,6 +168,13 @@ STATICFILES_DIRS = [
 # 정적 파일을 수집할 최종 디렉토리
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
+# 도서 수집 스크립트 디렉토리 (manage.py ingest가 Scripts/의 모듈을 사용)
+INGEST_SCRIPTS_DIR = BASE_DIR.parent / "Scripts"
+
+# 자동완성 색인 (books.autocomplete) 변경분 반영 주기와 전체 재구성 주기 (초)
+AUTOCOMPLETE_REFRESH_SECONDS = 30
+AUTOCOMPLETE_REBUILD_SECONDS = 6 * 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
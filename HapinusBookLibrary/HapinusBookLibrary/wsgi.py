@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'HapinusBookLibrary.settings')
 
 application = get_wsgi_application()
+
+# 자동완성 색인은 웹 서버 프로세스에서만 만들고 갱신 (관리 명령에서는 만들지 않음)
+from books.autocomplete import catalog_autocomplete  # noqa: E402
+
+catalog_autocomplete.start()
@@ -0,0 +1,476 @@
+"""
+도서 제목/인물 이름 자동완성
+
+검색창에 글자를 입력할 때마다 DB를 조회하지 않도록, 프로세스 메모리에 앞부분 색인을 두고 찾습니다.
+
+- 색인 키는 제목과 인물 이름을 초성/자모로 분해한 값입니다. (books.hangul, 초성/자모 검색과 같은 규칙)
+- 키는 정렬된 바이트 배열 하나에 이어 붙여 두고 이진 탐색으로 앞부분이 같은 범위를 찾습니다.
+  자모는 1바이트로 저장하므로 제목 100만 건도 수십 MB 안에 들어갑니다. (benchmark_autocomplete 참고)
+- 범위 안에서는 인기순(가장 큰 값을 구하는 세그먼트 트리) 상위 k개만 꺼내므로,
+  한 글자처럼 범위가 넓은 검색어도 비용이 일정합니다.
+  인기도: 도서는 소장 실물 수, 인물은 참여한 도서 수
+- 시작할 때 전체를 만들고, 이후에는 updated_at이 바뀐 행만 읽어 작은 변경분 색인에 넣습니다.
+  변경분이 AUTOCOMPLETE_MAX_DELTA건을 넘거나 AUTOCOMPLETE_REBUILD_SECONDS가 지나면 전체를 다시 만듭니다.
+  (삭제된 행은 updated_at으로 알 수 없으므로 다음 전체 재구성 때 빠짐)
+"""
+
+import bisect
+import codecs
+import heapq
+import logging
+import threading
+import time
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections
+
+from .hangul import decompose, is_chosung_query
+
+# 색인하는 키의 최대 길이 (분해한 글자 수, 더 긴 검색어는 DB 초성/자모 검색 사용)
+AUTOCOMPLETE_KEY_LENGTH = 32
+AUTOCOMPLETE_LIMIT = 10
+# 변경분 색인 최대 크기 (넘으면 전체 재구성)
+AUTOCOMPLETE_MAX_DELTA = 20000
+# 변경분을 읽을 때 이전 기준 시각보다 앞당겨 읽는 시간 (초)
+# updated_at은 쓰기 트랜잭션 시작 시각이므로, 늦게 커밋된 행을 놓치지 않도록 겹쳐 읽음
+AUTOCOMPLETE_REFRESH_OVERLAP = 300
+ROW_FETCH_SIZE = 10000
+MODES = ("chosung", "jamo")
+
+BOOK_ROWS_SQL = """
+    SELECT b.book_id, b.title, COALESCE(i.copies, 0)
+    FROM books b
+    LEFT JOIN (
+        SELECT book_id, COUNT(*) AS copies FROM book_instances GROUP BY book_id
+    ) i ON i.book_id = b.book_id
+"""
+PERSON_ROWS_SQL = """
+    SELECT p.person_id, p.name, COALESCE(c.books, 0)
+    FROM persons p
+    LEFT JOIN (
+        SELECT person_id, COUNT(DISTINCT book_id) AS books
+        FROM book_persons GROUP BY person_id
+    ) c ON c.person_id = p.person_id
+"""
+# 변경분: 행 자체나 인기도를 계산하는 연결 행의 updated_at이 since 이후인 행
+CHANGED_BOOK_ROWS_SQL = """
+    SELECT b.book_id, b.title,
+           (SELECT COUNT(*) FROM book_instances i WHERE i.book_id = b.book_id)
+    FROM books b
+    WHERE b.book_id IN (
+        SELECT book_id FROM books WHERE updated_at >= %(since)s
+        UNION SELECT book_id FROM book_instances WHERE updated_at >= %(since)s
+    )
+"""
+CHANGED_PERSON_ROWS_SQL = """
+    SELECT p.person_id, p.name,
+           (SELECT COUNT(DISTINCT book_id) FROM book_persons bp
+            WHERE bp.person_id = p.person_id)
+    FROM persons p
+    WHERE p.person_id IN (
+        SELECT person_id FROM persons WHERE updated_at >= %(since)s
+        UNION SELECT person_id FROM book_persons WHERE updated_at >= %(since)s
+    )
+"""
+SECTIONS = {"books": BOOK_ROWS_SQL, "persons": PERSON_ROWS_SQL}
+CHANGED_SECTIONS = {"books": CHANGED_BOOK_ROWS_SQL, "persons": CHANGED_PERSON_ROWS_SQL}
+
+
+def _escape_key_char(error):
+    """
+    자모와 ASCII 외 글자는 0xFF 뒤에 UTF-8 바이트로 저장합니다. (codecs 오류 처리기)
+    """
+    text = error.object[error.start : error.end]
+    return "".join("\xff" + ch.encode().decode("latin-1") for ch in text), error.end
+
+
+codecs.register_error("autocomplete_key", _escape_key_char)
+# 호환 자모(U+3131~U+318E)는 0x80부터 1바이트, latin-1 범위 글자는 다른 글자처럼 0xFF + UTF-8
+# 어느 바이트열도 다른 글자의 바이트열로 시작하지 않으므로, 글자 단위 앞부분 일치 = 바이트 앞부분 일치
+_KEY_TABLE = {code: chr(0x80 + code - 0x3131) for code in range(0x3131, 0x318F)}
+_KEY_TABLE.update(
+    {code: "\xff" + chr(code).encode().decode("latin-1") for code in range(0x80, 0x100)}
+)
+
+
+def _encode(key):
+    return key.translate(_KEY_TABLE).encode("latin-1", errors="autocomplete_key")
+
+
+def encode_key(text, chosung_only=False):
+    """
+    색인 키: 초성/자모로 분해해서 AUTOCOMPLETE_KEY_LENGTH글자까지 바이트로 저장
+    :param text: 제목 또는 이름
+    :param chosung_only: True면 초성 키
+    :return: bytes
+    """
+    return _encode(decompose(text, chosung_only)[:AUTOCOMPLETE_KEY_LENGTH])
+
+
+def _array_bytes(*arrays):
+    return sum(len(values) * values.itemsize for values in arrays)
+
+
+class PrefixIndex:
+    """
+    정렬된 키 배열 (한 종류의 키, 예: 도서 제목의 초성)
+    키는 blob에 정렬 순서대로 이어 붙이고, 위치별 항목 번호(order)와 인기도(popularity),
+    범위 안의 인기도 최댓값 위치를 구하는 세그먼트 트리(tree)를 함께 둡니다.
+    """
+
+    def __init__(self, keys, popularity):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.size = len(order)
+        self.order = array("i", order)
+        self.popularity = array("i", (popularity[i] for i in order))
+        self.offsets = array("I", [0])
+        blob = bytearray()
+        for i in order:
+            blob += keys[i]
+            self.offsets.append(len(blob))
+        self.blob = bytes(blob)
+        self.tree = self._build_tree()
+
+    def _better(self, a, b):
+        """
+        인기도가 더 큰 위치 (같으면 키 순서가 앞선 위치)
+        """
+        if a < 0:
+            return b
+        popularity = self.popularity
+        if popularity[a] > popularity[b] or (popularity[a] == popularity[b] and a < b):
+            return a
+        return b
+
+    def _build_tree(self):
+        size = self.size
+        tree = array("i", bytes(8 * size))
+        tree[size:] = array("i", range(size))
+        better = self._better
+        for node in range(size - 1, 0, -1):
+            tree[node] = better(tree[2 * node], tree[2 * node + 1])
+        return tree
+
+    def _argmax(self, lo, hi):
+        """
+        위치 lo 이상 hi 미만에서 인기도가 가장 큰 위치
+        """
+        best = -1
+        tree = self.tree
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def key(self, position):
+        return self.blob[self.offsets[position] : self.offsets[position + 1]]
+
+    def _bound(self, prefix, upper):
+        """
+        키의 앞부분이 prefix 이상(upper면 초과)인 첫 위치
+        """
+        lo, hi = 0, self.size
+        length = len(prefix)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self.offsets[mid]
+            head = self.blob[start : min(self.offsets[mid + 1], start + length)]
+            if head < prefix or (upper and head == prefix):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def matches(self, prefix):
+        """
+        prefix로 시작하는 키를 인기순으로 꺼내는 제너레이터
+        :return: (인기도, 위치, 항목 번호)
+        """
+        lo, hi = self._bound(prefix, False), self._bound(prefix, True)
+        heap = []
+
+        def push(start, end):
+            if start < end:
+                position = self._argmax(start, end)
+                heapq.heappush(heap, (-self.popularity[position], position, start, end))
+
+        push(lo, hi)
+        while heap:
+            popularity, position, start, end = heapq.heappop(heap)
+            yield -popularity, position, self.order[position]
+            push(start, position)
+            push(position + 1, end)
+
+    @property
+    def nbytes(self):
+        arrays = (self.order, self.popularity, self.offsets, self.tree)
+        return len(self.blob) + _array_bytes(*arrays)
+
+
+class Section:
+    """
+    한 종류(도서 또는 인물)의 색인: ID, 인기도, 표시할 글자와 초성/자모 키 색인
+    """
+
+    def __init__(self, rows):
+        self.ids = array("i")
+        self.popularity = array("i")
+        self.text_offsets = array("I", [0])
+        texts = bytearray()
+        for row_id, text, popularity in rows:
+            self.ids.append(row_id)
+            self.popularity.append(popularity)
+            texts += (text or "").encode()
+            self.text_offsets.append(len(texts))
+        self.texts = bytes(texts)
+        # 키 목록은 구성하는 동안만 필요하므로 모드별로 하나씩 만들어 최대 메모리를 줄임
+        self.indexes = {}
+        for mode in MODES:
+            chosung_only = mode == "chosung"
+            keys = [encode_key(self.text(entry), chosung_only) for entry in range(len(self))]
+            self.indexes[mode] = PrefixIndex(keys, self.popularity)
+            del keys
+
+    def __len__(self):
+        return len(self.ids)
+
+    def text(self, entry):
+        return self.texts[self.text_offsets[entry] : self.text_offsets[entry + 1]].decode()
+
+    def search(self, mode, prefix, limit, skip_ids):
+        """
+        :param skip_ids: 변경분 색인에 새 값이 있어 건너뛸 ID
+        :return: [(-인기도, 키, ID, 글자)] 인기순
+        """
+        index = self.indexes[mode]
+        results = []
+        for popularity, position, entry in index.matches(prefix):
+            if len(results) >= limit:
+                break
+            row_id = self.ids[entry]
+            if row_id not in skip_ids:
+                results.append((-popularity, index.key(position), row_id, self.text(entry)))
+        return results
+
+    @property
+    def nbytes(self):
+        return (
+            len(self.texts)
+            + _array_bytes(self.ids, self.popularity, self.text_offsets)
+            + sum(index.nbytes for index in self.indexes.values())
+        )
+
+
+class Delta:
+    """
+    마지막 전체 구성 이후 바뀐 행 (ID → (글자, 인기도)), 모드별로 키 순서로 정렬해 둠
+    """
+
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.sorted = {
+            mode: sorted(
+                (encode_key(text, mode == "chosung"), -popularity, row_id, text)
+                for row_id, (text, popularity) in self.rows.items()
+            )
+            for mode in MODES
+        }
+
+    def updated(self, rows):
+        merged = dict(self.rows)
+        merged.update(
+            (row_id, (text or "", popularity)) for row_id, text, popularity in rows
+        )
+        return Delta(merged)
+
+    def search(self, mode, prefix, limit):
+        entries = self.sorted[mode]
+        results = []
+        for i in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, popularity, row_id, text = entries[i]
+            if not key.startswith(prefix):
+                break
+            results.append((popularity, key, row_id, text))
+        return sorted(results)[:limit]
+
+
+class Snapshot:
+    """
+    읽기 전용 색인 상태 (갱신할 때는 새 Snapshot으로 통째로 바꿈)
+    """
+
+    def __init__(self, sections, deltas, watermark, built_at, build_seconds):
+        self.sections = sections
+        self.deltas = deltas
+        self.watermark = watermark
+        self.built_at = built_at
+        self.build_seconds = build_seconds
+
+    @property
+    def delta_size(self):
+        return sum(len(delta.rows) for delta in self.deltas.values())
+
+
+def _fetch_rows(sql, params=None):
+    """
+    서버 측 커서로 ROW_FETCH_SIZE건씩 읽습니다. (100만 건을 한 번에 메모리로 읽지 않음)
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(ROW_FETCH_SIZE):
+            yield from rows
+
+
+def _database_now():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT NOW()")
+        return cursor.fetchone()[0]
+
+
+class Autocomplete:
+    """
+    자동완성 서비스: 색인 구성/갱신과 검색
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._snapshot is not None
+
+    def build(self):
+        """
+        DB의 도서와 인물로 색인 전체를 새로 만듭니다.
+        """
+        with self._refresh_lock:
+            started_at = time.monotonic()
+            # 읽기 전 시각을 기준으로 삼아, 읽는 동안 바뀐 행은 다음 갱신에서 다시 읽음
+            watermark = _database_now()
+            sections = {name: Section(_fetch_rows(sql)) for name, sql in SECTIONS.items()}
+            self._snapshot = Snapshot(
+                sections,
+                {name: Delta() for name in SECTIONS},
+                watermark,
+                time.monotonic(),
+                time.monotonic() - started_at,
+            )
+        return self._snapshot
+
+    def refresh(self):
+        """
+        마지막 구성/갱신 이후 updated_at이 바뀐 행을 변경분 색인에 반영합니다.
+        :return: 반영한 행 수
+        """
+        if self._snapshot is None:
+            return sum(len(section) for section in self.build().sections.values())
+        with self._refresh_lock:
+            snapshot = self._snapshot
+            watermark = _database_now()
+            since = snapshot.watermark - timedelta(seconds=AUTOCOMPLETE_REFRESH_OVERLAP)
+            changed = {
+                name: list(_fetch_rows(sql, {"since": since}))
+                for name, sql in CHANGED_SECTIONS.items()
+            }
+            self._snapshot = Snapshot(
+                snapshot.sections,
+                {name: snapshot.deltas[name].updated(changed[name]) for name in changed},
+                watermark,
+                snapshot.built_at,
+                snapshot.build_seconds,
+            )
+        return sum(len(rows) for rows in changed.values())
+
+    def suggest(self, text, limit=AUTOCOMPLETE_LIMIT):
+        """
+        검색어로 시작하는 도서 제목과 인물 이름을 인기순으로 찾습니다.
+        :param text: 사용자가 입력한 검색어 (초성만, 또는 입력 중인 음절이 섞인 검색어)
+        :param limit: 도서/인물별 최대 결과 수
+        :return: {"mode", "books": [(book_id, 제목)], "persons": [(person_id, 이름)]},
+                 색인이 아직 없거나 검색어가 색인 키보다 길면 None
+        """
+        snapshot = self._snapshot
+        chosung_only = is_chosung_query(text or "")
+        key = decompose(text or "", chosung_only)
+        if snapshot is None or len(key) > AUTOCOMPLETE_KEY_LENGTH:
+            return None
+        mode = "chosung" if chosung_only else "jamo"
+        result = {"mode": mode}
+        prefix = _encode(key)
+        for name, section in snapshot.sections.items():
+            delta = snapshot.deltas[name]
+            matches = []
+            if prefix:
+                matches = sorted(
+                    section.search(mode, prefix, limit, delta.rows)
+                    + delta.search(mode, prefix, limit)
+                )[:limit]
+            result[name] = [(row_id, text) for _, _, row_id, text in matches]
+        return result
+
+    def stats(self):
+        """
+        색인 크기와 구성 시간 (벤치마크와 모니터링용)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "entries": {name: len(section) for name, section in snapshot.sections.items()},
+            "bytes": sum(section.nbytes for section in snapshot.sections.values()),
+            "build_seconds": round(snapshot.build_seconds, 2),
+            "delta_rows": snapshot.delta_size,
+            "age_seconds": round(time.monotonic() - snapshot.built_at, 1),
+        }
+
+    def _run(self, refresh_seconds, rebuild_seconds):
+        while True:
+            try:
+                snapshot = self._snapshot
+                if (
+                    snapshot is None
+                    or snapshot.delta_size > AUTOCOMPLETE_MAX_DELTA
+                    or time.monotonic() - snapshot.built_at > rebuild_seconds
+                ):
+                    self.build()
+                else:
+                    self.refresh()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Autocomplete index update failed.")
+            finally:
+                # 이 스레드의 DB 연결 정리
+                connections.close_all()
+            time.sleep(refresh_seconds)
+
+    def start(self):
+        """
+        색인을 만들고 주기적으로 갱신하는 백그라운드 스레드를 시작합니다. (프로세스당 한 번)
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(
+                settings.AUTOCOMPLETE_REFRESH_SECONDS,
+                settings.AUTOCOMPLETE_REBUILD_SECONDS,
+            ),
+            name="autocomplete",
+            daemon=True,
+        )
+        self._thread.start()
+
+
+catalog_autocomplete = Autocomplete()
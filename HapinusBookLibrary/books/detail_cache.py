@@ -0,0 +1,175 @@
+"""
+도서 상세 화면 캐시
+
+도서 상세 화면은 두 조각으로 나눠 캐시합니다.
+- info: 서지 정보, 참여자, 출판사, 카테고리, 태그, 분석 (main_content)
+- holdings: 표지와 소장 실물 현황 (sub_content, 대출 상태가 자주 바뀜)
+로그인하지 않은 사용자에게는 두 조각을 넣은 페이지 전체도 캐시합니다. (로그인 사용자는 메뉴가 다름)
+
+키는 book_id와 조각별 버전으로 만듭니다. (예: book_detail:42:info:<버전>)
+도서나 관련 행이 바뀌면 signals.py가 해당 도서의 해당 조각 버전만 새 값으로 바꾸므로,
+이전 키는 더 이상 읽히지 않고 BOOK_DETAIL_CACHE_TIMEOUT이 지나면 사라집니다.
+버전 키가 캐시에서 밀려나도 새 버전은 임의 값이라 이전 조각을 다시 읽지 않습니다.
+ORM을 거치지 않는 변경은 signal이 없으므로 적재하는 쪽에서 invalidate_books()를 호출합니다.
+(manage.py ingest는 배치를 commit할 때마다 호출하고, Django 밖에서 실행하는 update_csv_to_db.py로
+적재한 도서는 만료 시간까지 이전 화면이 보일 수 있음)
+버전은 캐시에 저장되므로 여러 프로세스가 같은 캐시(Redis)를 써야 다른 프로세스의 변경이 반영됩니다.
+
+같은 키를 동시에 여러 요청이 놓치면(stampede) 캐시의 add()로 잠금을 잡은 요청 하나만 렌더링하고,
+나머지는 CACHE_WAIT_SECONDS 동안 결과를 기다립니다.
+"""
+
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .metrics import METRICS
+
+BOOK_DETAIL_CACHE_TIMEOUT = 60 * 60
+FRAGMENTS = ("info", "holdings")
+# 렌더링 잠금 유지 시간 (렌더링 중 프로세스가 죽어도 이 시간이 지나면 다른 요청이 렌더링)
+CACHE_LOCK_TIMEOUT = 10
+# 다른 요청이 렌더링하는 동안 기다리는 최대 시간과 확인 간격 (초)
+CACHE_WAIT_SECONDS = 2.0
+CACHE_WAIT_INTERVAL = 0.02
+
+
+def version_key(book_id, fragment):
+    return f"book_detail:{book_id}:{fragment}:version"
+
+
+def fragment_keys(book_id, versions):
+    """
+    조각별 캐시 키
+    :param versions: {조각: 버전}
+    """
+    return {
+        fragment: f"book_detail:{book_id}:{fragment}:{version}"
+        for fragment, version in versions.items()
+    }
+
+
+def page_key(book_id, versions):
+    joined = ":".join(versions[fragment] for fragment in FRAGMENTS)
+    return f"book_detail:{book_id}:page:{joined}"
+
+
+def new_version():
+    return uuid.uuid4().hex[:16]
+
+
+def get_versions(book_id):
+    """
+    도서의 조각별 현재 버전 (없으면 새로 만듦)
+    :return: {조각: 버전}
+    """
+    keys = {fragment: version_key(book_id, fragment) for fragment in FRAGMENTS}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for fragment, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            # 동시에 만든 요청이 있으면 먼저 저장된 버전을 사용
+            cache.add(key, new_version(), None)
+            version = cache.get(key)
+        versions[fragment] = version
+    return versions
+
+
+def invalidate_books(book_ids, fragments=FRAGMENTS):
+    """
+    도서의 조각 버전을 새 값으로 바꿉니다.
+    트랜잭션 안에서 호출되면 커밋한 뒤에 바꿉니다. (커밋 전에 바꾸면 다른 요청이 이전 데이터를
+    읽어 새 버전 키에 저장할 수 있음)
+    :param book_ids: 도서 ID 목록
+    :param fragments: 바꿀 조각 목록
+    """
+    book_ids = set(book_ids)
+    if not book_ids:
+        return
+
+    def bump():
+        version = new_version()
+        cache.set_many(
+            {
+                version_key(book_id, fragment): version
+                for book_id in book_ids
+                for fragment in fragments
+            },
+            timeout=None,
+        )
+        METRICS.inc("book_detail_cache_invalidations_total", len(book_ids))
+
+    transaction.on_commit(bump)
+
+
+def record(fragment, result):
+    """
+    캐시 조회 결과 기록 (result: hit, miss, wait)
+    """
+    METRICS.inc("book_detail_cache_requests_total", fragment=fragment, result=result)
+
+
+def hit_ratio(fragment=None):
+    """
+    캐시 적중률 (다른 요청이 렌더링한 결과를 기다려 읽은 경우도 적중으로 셈)
+    :param fragment: 조각 이름 또는 "page", None이면 전체
+    :return: 0~1, 조회가 없었으면 None
+    """
+    counts = {"hit": 0, "miss": 0, "wait": 0}
+    with METRICS.lock:
+        for (name, labels), value in METRICS.counters.items():
+            labels = dict(labels)
+            if name == "book_detail_cache_requests_total" and (
+                fragment is None or labels["fragment"] == fragment
+            ):
+                counts[labels["result"]] += value
+    total = sum(counts.values())
+    return (counts["hit"] + counts["wait"]) / total if total else None
+
+
+def get_or_render(keys, render, timeout=BOOK_DETAIL_CACHE_TIMEOUT):
+    """
+    캐시에서 여러 키를 읽고, 하나라도 없으면 잠금을 잡은 요청 하나만 render()로 만들어 저장합니다.
+    :param keys: {이름: 캐시 키}
+    :param render: 없는 이름 목록을 받아 {이름: 값}을 반환하는 함수
+    :param timeout: 캐시 유지 시간 (초)
+    :return: {이름: 값}
+    """
+    found = cache.get_many(keys.values())
+    values = {name: found[key] for name, key in keys.items() if key in found}
+    for name in values:
+        record(name, "hit")
+    missing = [name for name in keys if name not in values]
+    if not missing:
+        return values
+
+    lock_key = keys[missing[0]] + ":lock"
+    locked = cache.add(lock_key, 1, CACHE_LOCK_TIMEOUT)
+    if not locked:
+        # 다른 요청이 렌더링 중: 결과가 저장될 때까지 잠시 기다림
+        deadline = time.monotonic() + CACHE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(CACHE_WAIT_INTERVAL)
+            found = cache.get_many([keys[name] for name in missing] + [lock_key])
+            if all(keys[name] in found for name in missing):
+                for name in missing:
+                    values[name] = found[keys[name]]
+                    record(name, "wait")
+                return values
+            if lock_key not in found:
+                break
+        # 결과 없이 잠금이 풀렸거나(렌더링 실패, 없는 도서 등) 너무 오래 걸리면 직접 렌더링
+
+    try:
+        rendered = render(missing)
+        cache.set_many({keys[name]: rendered[name] for name in missing}, timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    for name in missing:
+        values[name] = rendered[name]
+        record(name, "miss")
+    return values
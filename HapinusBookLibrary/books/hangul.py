@@ -0,0 +1,80 @@
+"""
+한글 초성/자모 분해
+
+Schema/database.sql의 hangul_decompose() 함수와 같은 규칙으로 분해합니다.
+DB는 books.title_chosung/title_jamo, persons.name_chosung/name_jamo를 트리거로 채우고,
+검색어는 이 모듈로 분해해서 두 결과를 앞부분 일치(LIKE 'ㅎㄹ%')로 비교합니다.
+
+- 한글 음절은 초성만, 또는 호환 자모(ㄱ, ㅏ 등)로 풀어 씁니다.
+- 겹모음/겹받침은 입력 순서대로 나눕니다. ('괜' → 'ㄱㅗㅐㄴ', '닭' → 'ㄷㅏㄹㄱ')
+  그래서 입력 중인 글자('달')나 초성과 음절이 섞인 검색어('해리ㅍ')도 앞부분 일치로 찾을 수 있습니다.
+- 공백과 ASCII 문장부호는 빼고, 영문은 소문자로, 그 밖의 글자는 그대로 둡니다.
+"""
+
+HANGUL_FIRST = 0xAC00  # 가
+HANGUL_LAST = 0xD7A3  # 힣
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ",
+    "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ",
+]
+JONGSUNG = [
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+# 따로 입력된 겹자모 (예: 'ㄳ', 'ㅘ')
+COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ",
+    "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ",
+    "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+# 분해 결과에서 빼는 ASCII 외 공백 (NBSP, 전각 공백)
+DROPPED_SPACES = {"\u00a0", "\u3000"}
+
+
+def _syllable(code, chosung_only):
+    """
+    한글 음절 하나의 초성 또는 자모
+    """
+    syllable = code - HANGUL_FIRST
+    if chosung_only:
+        return CHOSUNG[syllable // 588]
+    jungsung = JUNGSUNG[syllable % 588 // 28]
+    return CHOSUNG[syllable // 588] + jungsung + JONGSUNG[syllable % 28]
+
+
+def _translate_table(chosung_only):
+    """
+    decompose()가 str.translate로 한 번에 바꿀 수 있도록 글자별 변환 결과를 미리 만듭니다.
+    (자동완성 색인처럼 제목 100만 건을 분해해도 글자마다 Python 코드를 실행하지 않음)
+    """
+    table = {
+        code: _syllable(code, chosung_only) for code in range(HANGUL_FIRST, HANGUL_LAST + 1)
+    }
+    table.update({ord(ch): jamo for ch, jamo in COMPOUND_JAMO.items()})
+    for code in range(128):
+        ch = chr(code).lower()
+        table[code] = ch if ch.isalnum() else None
+    table.update({ord(ch): None for ch in DROPPED_SPACES})
+    return table
+
+
+_TABLES = {chosung_only: _translate_table(chosung_only) for chosung_only in (False, True)}
+
+
+def decompose(text, chosung_only=False):
+    """
+    문자열을 초성 또는 자모로 분해합니다.
+    :param text: 원본 문자열
+    :param chosung_only: True면 음절마다 초성만
+    :return: 분해한 문자열 (예: "해리 포터" → "ㅎㄹㅍㅌ" 또는 "ㅎㅐㄹㅣㅍㅗㅌㅓ")
+    """
+    return text.translate(_TABLES[bool(chosung_only)])
+
+
+def is_chosung_query(text):
+    """
+    공백을 빼면 초성(자음)만으로 된 검색어인지 확인합니다. (예: "ㅎㄹ ㅍㅌ")
+    """
+    letters = "".join(text.split())
+    return bool(letters) and all(ch in CHOSUNG for ch in letters)
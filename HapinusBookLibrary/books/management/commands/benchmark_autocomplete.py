@@ -0,0 +1,174 @@
+"""
+자동완성 색인 벤치마크 명령
+
+populate_catalog로 만든 합성 카탈로그로 자동완성 메모리 색인(books.autocomplete)을 만들고,
+구성 시간, 색인 크기, 프로세스 최대 메모리 증가량과 입력 중인 검색어 종류별 응답 시간을 측정합니다.
+결과는 benchmark_search.py와 같은 형식의 JSON으로 출력하고, 구성 시간/색인 크기/p95가
+기준을 넘으면 실패로 끝납니다. (기본 기준은 제목 100만 건 기준)
+
+Usage:
+    python manage.py populate_catalog --books 1000000
+    python manage.py benchmark_autocomplete --queries 20000
+"""
+
+import json
+import platform
+import random
+import resource
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.autocomplete import Autocomplete
+from books.hangul import decompose
+from books.management.commands.populate_catalog import (
+    GIVEN_SYLLABLES,
+    SURNAMES,
+    TITLE_WORDS,
+)
+
+QUERY_KINDS = ["chosung", "syllables", "typing", "person", "miss"]
+
+
+def make_query(kind, rng):
+    """
+    합성 카탈로그의 단어로 검색창에 입력 중인 kind 종류의 검색어를 만듭니다.
+    """
+    word = rng.choice(TITLE_WORDS)
+    if kind == "chosung":
+        return decompose(word, chosung_only=True)[: rng.randint(1, 3)]
+    if kind == "syllables":
+        return word[: rng.randint(1, len(word))]
+    if kind == "typing":
+        # 음절 뒤에 다음 음절의 초성까지 입력한 상태 (예: "데이터ㅂ")
+        cut = rng.randint(0, len(word) - 1)
+        return word[:cut] + decompose(word[cut], chosung_only=True)
+    if kind == "person":
+        return rng.choice(SURNAMES) + rng.choice(GIVEN_SYLLABLES)[: rng.randint(0, 1)]
+    return "".join(rng.choices("뷁쀍뛣꿿", k=2))
+
+
+def max_rss_mb():
+    # Linux의 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = "Measure autocomplete index build time, memory and lookup latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=20000,
+            help="measured lookups (default: %(default)s)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="query mix random seed")
+        parser.add_argument(
+            "--max-build-seconds",
+            type=float,
+            default=60,
+            help="fail if building the index takes longer (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--max-memory-mb",
+            type=float,
+            default=128,
+            help="fail if the built index is larger (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--target-p95-ms",
+            type=float,
+            default=5,
+            help="fail if the overall p95 lookup latency is above this many "
+            "milliseconds (default: %(default)s)",
+        )
+        parser.add_argument("--output", help="write the JSON result to this file")
+
+    def handle(self, *args, **options):
+        scripts_dir = str(settings.INGEST_SCRIPTS_DIR)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        from benchmark_ingest import (  # pylint: disable=import-outside-toplevel
+            PERCENTILES,
+            git_revision,
+            percentile,
+        )
+
+        index = Autocomplete()
+        rss_before = max_rss_mb()
+        index.build()
+        stats = index.stats()
+        if stats["entries"]["books"] == 0:
+            raise CommandError("The books table is empty; run populate_catalog first.")
+
+        rng = random.Random(options["seed"])
+        timings = []
+        for i in range(options["queries"]):
+            kind = QUERY_KINDS[i % len(QUERY_KINDS)]
+            text = make_query(kind, rng)
+            started_at = time.perf_counter()
+            index.suggest(text)
+            timings.append((kind, time.perf_counter() - started_at))
+
+        def summarize(latencies):
+            latencies = sorted(latencies)
+            return {
+                "queries": len(latencies),
+                **{
+                    f"p{p}": round(percentile(latencies, p) * 1000, 3) if latencies else None
+                    for p in PERCENTILES
+                },
+            }
+
+        overall = summarize([seconds for _, seconds in timings])
+        index_mb = round(stats["bytes"] / 1024 / 1024, 1)
+        result = {
+            "benchmark": "autocomplete",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "entries": stats["entries"],
+            "config": {
+                key: options[key]
+                for key in (
+                    "queries",
+                    "seed",
+                    "max_build_seconds",
+                    "max_memory_mb",
+                    "target_p95_ms",
+                )
+            },
+            "build_seconds": stats["build_seconds"],
+            "index_mb": index_mb,
+            # 구성 중 임시 키 목록 등을 포함한 프로세스 최대 메모리 증가량
+            "peak_rss_increase_mb": round(max_rss_mb() - rss_before, 1),
+            "latency_ms": overall,
+            "latency_ms_by_kind": {
+                kind: summarize([seconds for k, seconds in timings if k == kind])
+                for kind in QUERY_KINDS
+            },
+        }
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], mode="w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        failures = []
+        if stats["build_seconds"] > options["max_build_seconds"]:
+            failures.append(
+                f"build took {stats['build_seconds']} s "
+                f"(limit {options['max_build_seconds']} s)"
+            )
+        if index_mb > options["max_memory_mb"]:
+            failures.append(f"index is {index_mb} MB (limit {options['max_memory_mb']} MB)")
+        if overall["p95"] > options["target_p95_ms"]:
+            failures.append(
+                f"p95 {overall['p95']} ms is above the {options['target_p95_ms']} ms target"
+            )
+        if failures:
+            raise CommandError("; ".join(failures) + ".")
@@ -0,0 +1,133 @@
+"""
+도서 목록 페이지네이션 벤치마크 명령
+
+populate_catalog로 만든 합성 카탈로그에서 여러 깊이(페이지 번호)의 목록 페이지를 읽는 시간을
+커서(books/pagination.py)와 OFFSET/LIMIT + COUNT(*)(Paginator) 방식으로 각각 측정합니다.
+커서 방식은 깊이와 관계없이 비슷해야 하며, 결과는 benchmark_search와 같은 형식의 JSON으로 출력합니다.
+
+Usage:
+    python manage.py populate_catalog --books 1000000
+    python manage.py benchmark_browse --depths 1 100 1000 10000 --repeat 20
+"""
+
+import json
+import platform
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connection
+
+from books.models import Book
+from books.pagination import BOOK_SORT_ORDERS, PAGE_SIZE, cursor_page, encode_cursor
+
+
+class Command(BaseCommand):
+    help = "Compare cursor and OFFSET pagination latency at several page depths."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--depths",
+            type=int,
+            nargs="+",
+            default=[1, 10, 100, 1000, 10000],
+            help="page numbers to measure (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="measured reads per depth and method (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=sorted(BOOK_SORT_ORDERS),
+            default="title",
+            help="list order (default: %(default)s)",
+        )
+        parser.add_argument("--output", help="write the JSON result to this file")
+
+    @staticmethod
+    def cursor_at(sort, depth):
+        """
+        depth 페이지를 가리키는 커서 (앞 페이지의 마지막 행, 측정 전에 한 번만 계산)
+        """
+        if depth <= 1:
+            return None
+        last = (
+            Book.objects.order_by(*sort.order_by())
+            .only(*sort.fields)[(depth - 1) * PAGE_SIZE - 1 : (depth - 1) * PAGE_SIZE]
+        )
+        rows = list(last)
+        return encode_cursor(sort.values(rows[0])) if rows else None
+
+    @staticmethod
+    def measure(read, repeat):
+        read()  # 캐시 예열
+        latencies = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            read()
+            latencies.append(time.perf_counter() - started_at)
+        return sorted(latencies)
+
+    def handle(self, *args, **options):
+        scripts_dir = str(settings.INGEST_SCRIPTS_DIR)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        from benchmark_ingest import (  # pylint: disable=import-outside-toplevel
+            PERCENTILES,
+            git_revision,
+            percentile,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = 'books'")
+            catalog_books = cursor.fetchone()[0]
+        if catalog_books <= 0:
+            raise CommandError("The books table is empty; run populate_catalog first.")
+
+        sort = BOOK_SORT_ORDERS[options["sort"]]
+        queryset = Book.objects.order_by(*sort.order_by())
+
+        def summarize(latencies):
+            return {f"p{p}": round(percentile(latencies, p) * 1000, 2) for p in PERCENTILES}
+
+        by_depth = {}
+        for depth in options["depths"]:
+            cursor = self.cursor_at(sort, depth)
+            if depth > 1 and cursor is None:
+                self.stderr.write(f"Skipping depth {depth}: the catalog has fewer pages.")
+                continue
+            by_depth[str(depth)] = {
+                "cursor": summarize(
+                    self.measure(
+                        lambda: list(cursor_page(Book.objects.all(), sort, cursor)),
+                        options["repeat"],
+                    )
+                ),
+                "offset": summarize(
+                    self.measure(
+                        lambda: list(Paginator(queryset, PAGE_SIZE).page(depth)),
+                        options["repeat"],
+                    )
+                ),
+            }
+
+        result = {
+            "benchmark": "browse",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "catalog_books": catalog_books,
+            "config": {key: options[key] for key in ("depths", "repeat", "sort")},
+            "latency_ms_by_depth": by_depth,
+        }
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], mode="w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,180 @@
+"""
+도서 검색 벤치마크 명령
+
+populate_catalog로 만든 합성 카탈로그에서 검색어 종류별(단어, 앞부분, 두 단어, 부분 일치,
+인물 이름, 결과 없음)로 검색 결과 첫 페이지를 읽는 시간을 여러 스레드에서 동시에 측정합니다.
+결과는 커밋끼리 비교할 수 있도록 benchmark_ingest.py와 같은 형식의 JSON으로 출력하고,
+--target-p95-ms를 넘으면 실패로 끝납니다.
+
+Usage:
+    python manage.py populate_catalog --books 1000000
+    python manage.py benchmark_search --queries 2000 --concurrency 8 --target-p95-ms 50
+"""
+
+import json
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from books.management.commands.populate_catalog import (
+    GIVEN_SYLLABLES,
+    SURNAMES,
+    TITLE_WORDS,
+)
+from books.search import TRIGRAM_MIN_LENGTH, search_page
+
+QUERY_KINDS = ["word", "prefix", "two_words", "substring", "person", "miss"]
+
+
+def make_query(kind, rng):
+    """
+    합성 카탈로그의 단어로 kind 종류의 검색어를 만듭니다.
+    """
+    if kind == "word":
+        return rng.choice(TITLE_WORDS)
+    if kind == "prefix":
+        # 입력 중인 검색어처럼 단어의 첫 1~2글자
+        word = rng.choice(TITLE_WORDS)
+        return word[: rng.randint(1, min(2, len(word)))]
+    if kind == "two_words":
+        return f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)}"
+    if kind == "substring":
+        # 단어 중간의 TRIGRAM_MIN_LENGTH글자 (예: "데이터베이스" → "이터베")
+        word = rng.choice([w for w in TITLE_WORDS if len(w) > TRIGRAM_MIN_LENGTH])
+        start = rng.randint(1, len(word) - TRIGRAM_MIN_LENGTH)
+        return word[start : start + TRIGRAM_MIN_LENGTH]
+    if kind == "person":
+        return rng.choice(SURNAMES) + "".join(rng.choices(GIVEN_SYLLABLES, k=2))
+    return "".join(rng.choices("뷁쀍뛣꿿", k=3))
+
+
+class Command(BaseCommand):
+    help = "Measure catalog search latency percentiles on a (synthetic) catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=2000,
+            help="measured searches (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=200,
+            help="unmeasured searches run first (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="threads searching at once, one connection each (default: %(default)s)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="query mix random seed")
+        parser.add_argument(
+            "--target-p95-ms",
+            type=float,
+            help="fail if the overall p95 latency is above this many milliseconds",
+        )
+        parser.add_argument("--output", help="write the JSON result to this file")
+
+    def run_queries(self, queries, concurrency):
+        """
+        검색어 목록을 concurrency개 스레드로 나눠 실행하고 (kind, 초) 리스트를 반환합니다.
+        """
+        results = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            timings = []
+            try:
+                for kind, text in chunk:
+                    started_at = time.perf_counter()
+                    page = search_page(text, 1)
+                    list(page.object_list)
+                    timings.append((kind, time.perf_counter() - started_at))
+            finally:
+                # 스레드마다 열린 DB 연결 정리
+                connections.close_all()
+            with lock:
+                results.extend(timings)
+
+        chunks = [queries[i::concurrency] for i in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker, chunk) for chunk in chunks]:
+                future.result()
+        return results
+
+    def handle(self, *args, **options):
+        scripts_dir = str(settings.INGEST_SCRIPTS_DIR)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        from benchmark_ingest import (  # pylint: disable=import-outside-toplevel
+            PERCENTILES,
+            git_revision,
+            percentile,
+        )
+
+        with connection.cursor() as cursor:
+            # 카탈로그 크기는 통계 추정값으로 충분 (COUNT(*)는 100만 건에서 느림)
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = 'books'")
+            catalog_books = cursor.fetchone()[0]
+        if catalog_books <= 0:
+            raise CommandError("The books table is empty; run populate_catalog first.")
+
+        rng = random.Random(options["seed"])
+        total = options["warmup"] + options["queries"]
+        queries = [
+            (kind, make_query(kind, rng))
+            for kind in (QUERY_KINDS[i % len(QUERY_KINDS)] for i in range(total))
+        ]
+        self.run_queries(queries[: options["warmup"]], options["concurrency"])
+        started_at = time.perf_counter()
+        timings = self.run_queries(queries[options["warmup"] :], options["concurrency"])
+        elapsed = time.perf_counter() - started_at
+
+        def summarize(latencies):
+            latencies = sorted(latencies)
+            return {
+                "queries": len(latencies),
+                **{
+                    f"p{p}": round(percentile(latencies, p) * 1000, 2) if latencies else None
+                    for p in PERCENTILES
+                },
+            }
+
+        overall = summarize([seconds for _, seconds in timings])
+        result = {
+            "benchmark": "search",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "catalog_books": catalog_books,
+            "config": {
+                key: options[key]
+                for key in ("queries", "warmup", "concurrency", "seed", "target_p95_ms")
+            },
+            "queries_per_second": round(len(timings) / elapsed, 1) if elapsed else None,
+            "latency_ms": overall,
+            "latency_ms_by_kind": {
+                kind: summarize([seconds for k, seconds in timings if k == kind])
+                for kind in QUERY_KINDS
+            },
+        }
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], mode="w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        target = options["target_p95_ms"]
+        if target is not None and overall["p95"] > target:
+            raise CommandError(f"p95 {overall['p95']} ms is above the {target} ms target.")
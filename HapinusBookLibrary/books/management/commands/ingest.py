@@ -0,0 +1,552 @@
+"""
+ISBN 수집 파이프라인 명령
+
+정규화 → Kakao API 조회 → 표지 다운로드 → DB 반영을 하나의 명령으로 실행합니다.
+각 단계는 작업 스레드에서 실행되는 제너레이터이고, 단계 사이는 크기가 정해진 큐로 연결되어
+레코드가 한 건씩 흘러갑니다. 중간에 book_info.csv를 다시 쓰지 않으므로, 새 ISBN 한 건은
+다음 배치 실행을 기다리지 않고 몇 초 안에 DB에 반영됩니다.
+--from-csv로 읽은 행은 DB에 commit된 뒤에 book_info.csv에 IS_UPDATED=TRUE로 저장됩니다.
+
+Usage:
+    python manage.py ingest 9788936434120 8936434128
+    python manage.py ingest --file isbns.txt --fetch-workers 4 --download-workers 8
+    python manage.py ingest --from-csv --resume
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.detail_cache import invalidate_books
+
+# 단계 사이 큐의 끝을 알리는 표시
+END_OF_STREAM = object()
+
+
+def iter_queue(inbox):
+    """
+    큐에서 END_OF_STREAM이 나올 때까지 레코드를 꺼내는 제너레이터
+    같은 큐를 읽는 다른 작업 스레드도 끝나도록 END_OF_STREAM을 다시 넣습니다.
+    """
+    while True:
+        record = inbox.get()
+        if record is END_OF_STREAM:
+            inbox.put(END_OF_STREAM)
+            return
+        yield record
+
+
+def iter_timed_batches(inbox, batch_size, interval):
+    """
+    큐의 레코드를 batch_size개가 모이거나, 첫 레코드를 받은 뒤 interval초가 지나면 묶어서 반환
+    입력이 드문드문 들어와도 레코드가 interval초 넘게 기다리지 않습니다.
+    """
+    batch = []
+    deadline = None
+    while True:
+        timeout = max(0.0, deadline - time.monotonic()) if batch else None
+        try:
+            record = inbox.get(timeout=timeout)
+        except queue.Empty:
+            yield batch
+            batch = []
+            continue
+        if record is END_OF_STREAM:
+            inbox.put(END_OF_STREAM)
+            if batch:
+                yield batch
+            return
+        if not batch:
+            deadline = time.monotonic() + interval
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+
+class Stage:
+    """
+    작업 스레드 workers개가 같은 제너레이터 함수를 실행하는 파이프라인 단계
+    함수는 입력 큐를 받아 다음 단계로 넘길 레코드를 yield합니다.
+    모든 작업 스레드가 끝나면 출력 큐에 END_OF_STREAM을 넣습니다.
+    metrics가 있으면 단계별 처리 건수와 입력 큐 길이를 기록합니다.
+    """
+
+    def __init__(self, name, func, workers, inbox, outbox=None, metrics=None):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.metrics = metrics
+        self.count = 0
+        self.errors = []
+        self.lock = threading.Lock()
+        self.remaining = workers
+        self.threads = [
+            threading.Thread(target=self._run, name=f"ingest-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _run(self):
+        try:
+            for record in self.func(self.inbox):
+                with self.lock:
+                    self.count += 1
+                if self.metrics:
+                    self.metrics.inc("ingest_records_total", stage=self.name)
+                    self.metrics.set_gauge(
+                        "ingest_queue_depth", self.inbox.qsize(), stage=self.name
+                    )
+                if self.outbox is not None:
+                    self.outbox.put(record)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.exception("Ingest stage %s failed.", self.name)
+            self.errors.append(e)
+            # 앞 단계가 가득 찬 큐에서 멈추지 않도록 남은 입력을 버림
+            for _ in iter_queue(self.inbox):
+                pass
+        finally:
+            with self.lock:
+                self.remaining -= 1
+                last = self.remaining == 0
+            if last and self.outbox is not None:
+                self.outbox.put(END_OF_STREAM)
+
+
+class IngestPipeline:
+    """
+    Scripts/의 수집 모듈로 각 단계를 구성하는 파이프라인
+    DB 반영 단계는 작업 스레드마다 별도의 DB 연결을 사용합니다.
+    """
+
+    def __init__(self, options):
+        scripts_dir = str(settings.INGEST_SCRIPTS_DIR)
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        # KAKAO_API_KEY 검사 등 import 시점의 설정은 명령을 실행할 때만 적용되도록 여기서 import
+        import download_image  # pylint: disable=import-outside-toplevel
+        import isbn_journal  # pylint: disable=import-outside-toplevel
+        import isbn_processor_to_csv  # pylint: disable=import-outside-toplevel
+        import isbn_utils  # pylint: disable=import-outside-toplevel
+        import update_csv_to_db  # pylint: disable=import-outside-toplevel
+        from image_store import ImageStore  # pylint: disable=import-outside-toplevel
+        from kakao_response_cache import (  # pylint: disable=import-outside-toplevel
+            KakaoResponseCache,
+        )
+        from pipeline_metrics import METRICS  # pylint: disable=import-outside-toplevel
+
+        self.downloader = download_image
+        self.journal_module = isbn_journal
+        self.processor = isbn_processor_to_csv
+        self.isbn_utils = isbn_utils
+        self.loader = update_csv_to_db
+        self.metrics = METRICS
+
+        self.fetch_workers = options["fetch_workers"] or isbn_processor_to_csv.KAKAO_WORKERS
+        self.download_workers = (
+            options["download_workers"] or download_image.DOWNLOAD_WORKERS
+        )
+        self.db_workers = options["db_workers"]
+        self.skip_download = options["skip_download"]
+        self.queue_size = options["queue_size"]
+        self.batch_size = options["batch_size"]
+        self.commit_interval = options["commit_interval"]
+        self.rejects_filename = options["rejects"] or update_csv_to_db.REJECTS_FILENAME
+
+        self.journal = isbn_journal.IsbnJournal()
+        # --from-csv로 읽은 ISBN 키와, 적재한 행을 book_info.csv에 TRUE로 저장할 writer
+        self.csv_keys = set()
+        self.book_info_writer = (
+            isbn_processor_to_csv.BookInfoCsvWriter(isbn_processor_to_csv.BOOK_INFO_FILENAME)
+            if options["from_csv"]
+            else None
+        )
+        self.cache = None if options["no_cache"] else KakaoResponseCache()
+        self.rate_limiter = isbn_processor_to_csv.TokenBucket(
+            options["rate"] or isbn_processor_to_csv.KAKAO_RATE_LIMIT
+        )
+        self.kakao_session = isbn_processor_to_csv.create_kakao_session(self.fetch_workers)
+        self.image_store = None if self.skip_download else ImageStore()
+        self.download_session = download_image.create_download_session(
+            self.download_workers
+        )
+        self.manifest = download_image.load_manifest(download_image.IMAGE_MANIFEST_FILENAME)
+
+        self.lock = threading.Lock()
+        self.stats = {
+            "fetch_failed": 0,
+            "not_found": 0,
+            download_image.DOWNLOADED: 0,
+            download_image.NOT_MODIFIED: 0,
+            download_image.FAILED: 0,
+        }
+        self.db_counts = {**update_csv_to_db.new_change_counts(), "rejected": 0}
+        self.reject_parts = []
+        self.latencies = []
+
+    def close(self):
+        """
+        manifest 저장, 파일과 연결 정리
+        """
+        if not self.skip_download:
+            self.downloader.save_manifest(
+                self.downloader.IMAGE_MANIFEST_FILENAME, self.manifest
+            )
+            self.image_store.close()
+        self.download_session.close()
+        self.kakao_session.close()
+        if self.cache:
+            self.cache.log_stats()
+            self.cache.close()
+        self.journal.close()
+        if self.book_info_writer:
+            self.book_info_writer.flush()
+        parts = [part for part in self.reject_parts if os.path.exists(part)]
+        if parts:
+            self.loader.merge_rejects(parts, self.rejects_filename)
+
+    def normalize(self, isbn_keys):
+        """
+        정규화 단계: ISBN 키를 ISBN-13으로 묶고, 잘못된 키는 저널에 영구 실패로 기록합니다.
+        :param isbn_keys: 원본 ISBN 키 리스트
+        :return: 레코드 딕셔너리를 반환하는 제너레이터
+        """
+        isbn_groups, invalid_keys = self.isbn_utils.normalize_isbn_keys(isbn_keys)
+        for isbn_key in invalid_keys:
+            logging.error("Invalid ISBN_KEY %s, skipping.", isbn_key)
+            self.journal.record(
+                isbn_key, self.journal_module.STATUS_FAILED_PERMANENT, "invalid isbn"
+            )
+        for isbn13, keys in isbn_groups.items():
+            yield {"isbn13": isbn13, "isbn_keys": keys, "started_at": time.monotonic()}
+
+    def fetch(self, inbox):
+        """
+        Kakao API 조회 단계: 응답을 book_info.csv 행과 같은 형식의 딕셔너리로 변환합니다.
+        """
+        journal_module = self.journal_module
+        for record in iter_queue(inbox):
+            data = self.processor.get_book_info_from_kakao_api(
+                record["isbn13"], self.kakao_session, self.rate_limiter, self.cache
+            )
+            if data is None:
+                status, detail, stat = (
+                    journal_module.STATUS_FAILED_RETRYABLE,
+                    "fetch failed",
+                    "fetch_failed",
+                )
+            else:
+                book = self.processor.json_to_book_dictionary(record["isbn_keys"][0], data)
+                if book is not None:
+                    self.journal.record_many(record["isbn_keys"], journal_module.STATUS_FETCHED)
+                    # 저자/번역가 리스트는 CSV에 저장될 때와 같은 문자열 형식으로 변환
+                    record["book"] = {
+                        key: str(value) if isinstance(value, list) else value
+                        for key, value in book.items()
+                    }
+                    yield record
+                    continue
+                status, detail, stat = (
+                    journal_module.STATUS_FAILED_PERMANENT,
+                    "no documents",
+                    "not_found",
+                )
+            with self.lock:
+                self.stats[stat] += 1
+            for isbn_key in record["isbn_keys"]:
+                self.journal.record(isbn_key, status, detail)
+
+    def download(self, inbox):
+        """
+        표지 다운로드 단계: 다운로드에 실패해도 레코드는 DB 반영 단계로 넘깁니다.
+        """
+        for record in iter_queue(inbox):
+            isbn_key = record["book"]["ISBN_KEY"]
+            thumbnail_url = record["book"]["THUMBNAIL_URL"]
+            if thumbnail_url:
+                with self.lock:
+                    entry = self.manifest.get(isbn_key)
+                result, entry, _ = self.downloader.download_image(
+                    thumbnail_url, isbn_key, self.image_store, self.download_session, entry
+                )
+                with self.lock:
+                    self.stats[result] += 1
+                    if entry:
+                        self.manifest[isbn_key] = entry
+            yield record
+
+    def invalidate_detail_cache(self, conn, cursor, books):
+        """
+        반영한 도서의 상세 화면 캐시 버전을 바꿉니다. (SQL 적재는 ORM signal이 없으므로 직접 호출)
+        :param books: load_batch가 반영한 CSV 행 딕셔너리 리스트
+        """
+        isbn13s = [
+            isbn13 for isbn13 in map(self.loader.canonical_isbn13, books) if isbn13
+        ]
+        if not isbn13s:
+            return
+        cursor.execute("SELECT book_id FROM books WHERE isbn13 = ANY(%s)", (isbn13s,))
+        book_ids = [book_id for (book_id,) in cursor.fetchall()]
+        # 다음 배치까지 읽기 트랜잭션을 열어 두지 않음
+        conn.commit()
+        invalidate_books(book_ids)
+
+    def mark_csv_rows_updated(self, records):
+        """
+        --from-csv로 읽은 행을 적재한 책 정보로 바꿔 IS_UPDATED=TRUE로 저장합니다.
+        DB에 commit한 뒤에 호출하므로, 중단되어도 적재하지 않은 행은 FALSE로 남습니다.
+        :param records: 적재한 레코드 리스트
+        """
+        if not self.book_info_writer:
+            return
+        with self.lock:
+            for record in records:
+                for isbn_key in record["isbn_keys"]:
+                    if isbn_key in self.csv_keys:
+                        self.book_info_writer.save({**record["book"], "ISBN_KEY": isbn_key})
+
+    def upsert(self, inbox):
+        """
+        DB 반영 단계: batch_size건 또는 commit_interval초마다 모아서 한 트랜잭션으로 반영합니다.
+        commit한 뒤 반영한 도서의 상세 화면 캐시를 무효화하고, --from-csv 행을 TRUE로 표시합니다.
+        """
+        loader = self.loader
+        rejects_filename = f"{self.rejects_filename}.{threading.current_thread().name}"
+        with self.lock:
+            self.reject_parts.append(rejects_filename)
+        counts = loader.new_change_counts()
+        conn = loader.psycopg2.connect(**loader.DB_CONFIG)
+        try:
+            with conn.cursor() as cursor, loader.RejectWriter(rejects_filename) as rejects:
+                dimensions = loader.DimensionCache(cursor)
+                try:
+                    for records in iter_timed_batches(
+                        inbox, self.batch_size, self.commit_interval
+                    ):
+                        by_key = {record["book"]["ISBN_KEY"]: record for record in records}
+                        loaded_keys = loader.load_batch(
+                            conn,
+                            cursor,
+                            [record["book"] for record in records],
+                            dimensions,
+                            rejects,
+                            counts,
+                        )
+                        loaded = [by_key[isbn_key] for isbn_key in loaded_keys]
+                        self.invalidate_detail_cache(
+                            conn, cursor, [record["book"] for record in loaded]
+                        )
+                        self.mark_csv_rows_updated(loaded)
+                        finished_at = time.monotonic()
+                        for isbn_key in loaded_keys:
+                            record = by_key[isbn_key]
+                            self.journal.record_many(
+                                record["isbn_keys"], self.journal_module.STATUS_LOADED
+                            )
+                            latency = finished_at - record["started_at"]
+                            self.metrics.observe("ingest_latency_seconds", latency)
+                            with self.lock:
+                                self.latencies.append(latency)
+                            yield record
+                finally:
+                    with self.lock:
+                        for key, value in counts.items():
+                            self.db_counts[key] += value
+                        self.db_counts["rejected"] += rejects.count
+        finally:
+            conn.close()
+
+    def run(self, isbn_keys):
+        """
+        단계를 시작하고, 정규화한 레코드를 첫 큐에 넣은 뒤 모든 단계가 끝날 때까지 기다립니다.
+        큐가 가득 차면 앞 단계가 기다리므로 메모리 사용량은 큐 크기로 제한됩니다.
+        :param isbn_keys: 원본 ISBN 키 리스트
+        :return: Stage 리스트
+        """
+        fetch_queue = queue.Queue(maxsize=self.queue_size)
+        download_queue = queue.Queue(maxsize=self.queue_size)
+        upsert_queue = queue.Queue(maxsize=self.queue_size)
+        stages = [
+            Stage(
+                "fetch",
+                self.fetch,
+                self.fetch_workers,
+                fetch_queue,
+                download_queue,
+                self.metrics,
+            )
+        ]
+        if self.skip_download:
+            upsert_queue = download_queue
+        else:
+            stages.append(
+                Stage(
+                    "download",
+                    self.download,
+                    self.download_workers,
+                    download_queue,
+                    upsert_queue,
+                    self.metrics,
+                )
+            )
+        stages.append(
+            Stage(
+                "upsert", self.upsert, self.db_workers, upsert_queue, metrics=self.metrics
+            )
+        )
+
+        for stage in stages:
+            stage.start()
+        for record in self.normalize(isbn_keys):
+            fetch_queue.put(record)
+        fetch_queue.put(END_OF_STREAM)
+        for stage in stages:
+            stage.join()
+        return stages
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalize ISBNs, fetch metadata from the Kakao API, download covers and "
+        "upsert the books in one streaming pipeline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("isbns", nargs="*", help="ISBN-10 or ISBN-13 values to ingest")
+        parser.add_argument("--file", help="read ISBNs from a file, one per line")
+        parser.add_argument(
+            "--from-csv",
+            action="store_true",
+            help="ingest the IS_UPDATED=FALSE rows of ../data/book_info.csv",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="skip ISBNs the journal marks as finished",
+        )
+        parser.add_argument(
+            "--fetch-workers",
+            type=int,
+            help="concurrent Kakao API requests (default: KAKAO_WORKERS)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="maximum Kakao API requests per second (default: KAKAO_RATE_LIMIT)",
+        )
+        parser.add_argument(
+            "--download-workers",
+            type=int,
+            help="concurrent cover downloads (default: DOWNLOAD_WORKERS)",
+        )
+        parser.add_argument(
+            "--db-workers",
+            type=int,
+            default=1,
+            help="database connections for the upsert stage (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--skip-download", action="store_true", help="do not download covers"
+        )
+        parser.add_argument(
+            "--queue-size",
+            type=int,
+            default=100,
+            help="records buffered between two stages (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="maximum rows per database transaction (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--commit-interval",
+            type=float,
+            default=1.0,
+            help="seconds a row may wait for its batch to fill (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--no-cache", action="store_true", help="bypass the Kakao response cache"
+        )
+        parser.add_argument("--rejects", help="file for rows that could not be loaded")
+
+    def read_isbn_keys(self, pipeline, options):
+        """
+        명령행 인자, --file, --from-csv에서 ISBN 키를 모읍니다.
+        """
+        isbn_keys = list(options["isbns"])
+        if options["file"]:
+            with open(options["file"], mode="r", encoding="utf-8") as file:
+                isbn_keys.extend(line.strip() for line in file if line.strip())
+        if options["from_csv"]:
+            csv_keys = pipeline.processor.read_book_info_csv(
+                pipeline.processor.BOOK_INFO_FILENAME
+            )
+            pipeline.csv_keys.update(csv_keys)
+            isbn_keys.extend(csv_keys)
+        if options["resume"]:
+            statuses = pipeline.journal_module.load_journal_statuses()
+            isbn_keys = pipeline.journal_module.filter_unfinished(isbn_keys, statuses)
+        return isbn_keys
+
+    def handle(self, *args, **options):
+        if not (options["isbns"] or options["file"] or options["from_csv"]):
+            raise CommandError("Give ISBNs as arguments, or use --file or --from-csv.")
+        if options["rate"] is not None and options["rate"] <= 0:
+            raise CommandError("--rate must be greater than 0.")
+
+        started_at = time.monotonic()
+        pipeline = IngestPipeline(options)
+        # 종료 시 저장은 명령 한 번에 한 번만 등록 (IngestPipeline이 Scripts/를 sys.path에 추가함)
+        from pipeline_metrics import install_metrics  # pylint: disable=import-outside-toplevel
+
+        install_metrics("ingest")
+        try:
+            isbn_keys = self.read_isbn_keys(pipeline, options)
+            stages = pipeline.run(isbn_keys)
+        finally:
+            pipeline.close()
+        elapsed = time.monotonic() - started_at
+
+        stats = pipeline.stats
+        downloader = pipeline.downloader
+        counts = pipeline.db_counts
+        latencies = sorted(pipeline.latencies)
+        self.stdout.write(
+            f"Ingested {len(isbn_keys)} ISBN keys in {elapsed:.1f}s: "
+            f"{stages[0].count} fetched ({stats['fetch_failed']} failed, "
+            f"{stats['not_found']} not found)."
+        )
+        if not pipeline.skip_download:
+            self.stdout.write(
+                f"Covers: {stats[downloader.DOWNLOADED]} downloaded, "
+                f"{stats[downloader.NOT_MODIFIED]} not modified, "
+                f"{stats[downloader.FAILED]} failed."
+            )
+        self.stdout.write(
+            f"Database: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['rejected']} rejected."
+        )
+        if latencies:
+            self.stdout.write(
+                f"End-to-end latency per ISBN: p50 {latencies[len(latencies) // 2]:.2f}s, "
+                f"max {latencies[-1]:.2f}s."
+            )
+        failed = [stage.name for stage in stages if stage.errors]
+        if failed:
+            raise CommandError(f"Ingest stages failed: {', '.join(failed)} (see the log).")
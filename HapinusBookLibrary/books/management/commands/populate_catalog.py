@@ -0,0 +1,221 @@
+"""
+벤치마크용 합성 카탈로그 생성 명령
+
+한국어 단어로 만든 제목, 합성 인물과 출판사로 도서를 원하는 만큼 추가합니다.
+검색 컬럼 등은 실제 적재와 같은 DB 트리거가 계산합니다.
+합성 도서의 ISBN-13은 SYNTHETIC_ISBN_PREFIX로 시작하고, 인물과 출판사는 메모(bio/notes)에
+SYNTHETIC_MARKER가 있으므로 --cleanup으로 합성 데이터만 지울 수 있습니다.
+
+Usage:
+    python manage.py populate_catalog --books 1000000
+    python manage.py populate_catalog --cleanup
+"""
+
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# 실제 도서 ISBN과 겹치지 않는 접두어 (979-0은 악보용 ISMN 영역)
+SYNTHETIC_ISBN_PREFIX = "9790"
+SYNTHETIC_MARKER = "synthetic catalog"
+SYNTHETIC_PUBLISHERS = 500
+
+TITLE_WORDS = [
+    "사랑", "바다", "시간", "여름", "겨울", "도시", "고양이", "기억", "편지", "마음",
+    "세계", "역사", "과학", "철학", "우주", "여행", "정원", "소년", "소녀", "나무",
+    "바람", "노래", "별빛", "언어", "경제", "심리학", "수학", "음악", "그림", "섬",
+    "새벽", "골목", "서점", "도서관", "기차", "달리기", "요리", "식물", "숲", "강물",
+    "유령", "탐정", "비밀", "모험", "약속", "이별", "계절", "미래", "과거", "하루",
+    "알고리즘", "데이터베이스", "프로그래밍", "인공지능", "민주주의", "자본주의",
+    "고고학자", "천문학자", "박물관", "미술관", "백과사전", "오후", "저녁", "아침",
+]
+TITLE_PATTERNS = [
+    "{0}의 {1}",
+    "{0}과 {1}",
+    "{0} {1} {2}",
+    "{0}",
+    "나의 {0}",
+    "{0}을 위한 {1}",
+]
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류홍")
+GIVEN_SYLLABLES = list("민서지현수영준우하은도윤예진성호유나연재희주원태경")
+
+
+def title_sql():
+    """
+    TITLE_PATTERNS 중 하나를 골라 TITLE_WORDS의 임의 단어로 채우는 SQL 식
+    """
+    word = "(%(words)s::text[])[1 + floor(random() * %(word_count)s)::int]"
+    cases = " ".join(
+        f"WHEN {i} THEN '" + re.sub(r"\{\d\}", f"' || {word} || '", pattern) + "'"
+        for i, pattern in enumerate(TITLE_PATTERNS)
+    )
+    return f"CASE floor(random() * {len(TITLE_PATTERNS)})::int {cases} END"
+
+
+class Command(BaseCommand):
+    help = "Add a synthetic catalog of books, persons and publishers for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--books", type=int, default=0, help="number of synthetic books to add"
+        )
+        parser.add_argument(
+            "--persons",
+            type=int,
+            default=50000,
+            help="synthetic persons to create if none exist (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50000,
+            help="books per transaction (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--seed", type=float, default=0.42, help="random seed between -1 and 1"
+        )
+        parser.add_argument(
+            "--cleanup", action="store_true", help="delete the synthetic rows instead"
+        )
+
+    def cleanup(self, cursor):
+        cursor.execute(
+            "DELETE FROM books WHERE isbn13 LIKE %s", [SYNTHETIC_ISBN_PREFIX + "%"]
+        )
+        books = cursor.rowcount
+        cursor.execute("DELETE FROM persons WHERE bio = %s", [SYNTHETIC_MARKER])
+        cursor.execute("DELETE FROM publishers WHERE notes = %s", [SYNTHETIC_MARKER])
+        self.stdout.write(f"Deleted {books} synthetic books.")
+
+    def ensure_dimensions(self, cursor, persons):
+        """
+        합성 출판사와 인물을 만들고 ID 배열을 반환합니다. (이미 있으면 그대로 사용)
+        """
+        cursor.execute(
+            "INSERT INTO publishers (name, notes) "
+            "SELECT '합성출판사' || g, %s FROM generate_series(1, %s) g "
+            "ON CONFLICT (name) DO NOTHING",
+            [SYNTHETIC_MARKER, SYNTHETIC_PUBLISHERS],
+        )
+        cursor.execute("SELECT COUNT(*) FROM persons WHERE bio = %s", [SYNTHETIC_MARKER])
+        if cursor.fetchone()[0] == 0:
+            # 성 + 이름 두 글자 (예: 김민서), 일련번호 g로 조합을 고름
+            cursor.execute(
+                """
+                INSERT INTO persons (name, bio)
+                SELECT (%(surnames)s::text[])[1 + g %% %(surname_count)s]
+                    || (%(syllables)s::text[])
+                       [1 + (g / %(surname_count)s) %% %(syllable_count)s]
+                    || (%(syllables)s::text[])
+                       [1 + (g / %(surname_count)s / %(syllable_count)s) %% %(syllable_count)s],
+                    %(marker)s
+                FROM generate_series(0, %(persons)s - 1) g
+                """,
+                {
+                    "surnames": SURNAMES,
+                    "surname_count": len(SURNAMES),
+                    "syllables": GIVEN_SYLLABLES,
+                    "syllable_count": len(GIVEN_SYLLABLES),
+                    "marker": SYNTHETIC_MARKER,
+                    "persons": persons,
+                },
+            )
+        cursor.execute(
+            "SELECT array_agg(publisher_id) FROM publishers WHERE notes = %s",
+            [SYNTHETIC_MARKER],
+        )
+        publisher_ids = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT array_agg(person_id) FROM persons WHERE bio = %s", [SYNTHETIC_MARKER]
+        )
+        return publisher_ids, cursor.fetchone()[0]
+
+    def add_books(self, cursor, first, last, publisher_ids, person_ids):
+        """
+        일련번호 first~last의 합성 도서와 저자/역자 연결을 추가합니다.
+        """
+        params = {
+            "words": TITLE_WORDS,
+            "word_count": len(TITLE_WORDS),
+            "first": first,
+            "last": last,
+            "prefix": SYNTHETIC_ISBN_PREFIX,
+            "publisher_ids": publisher_ids,
+            "publisher_count": len(publisher_ids),
+            "person_ids": person_ids,
+            "person_count": len(person_ids),
+        }
+        cursor.execute(
+            f"""
+            INSERT INTO books (title, isbn13, publication_date, pages, publisher_id)
+            SELECT
+                {title_sql()},
+                %(prefix)s || lpad(g::text, 9, '0'),
+                DATE '1990-01-01' + floor(random() * 12000)::int,
+                50 + floor(random() * 700)::int,
+                (%(publisher_ids)s::int[])[1 + floor(random() * %(publisher_count)s)::int]
+            FROM generate_series(%(first)s, %(last)s) g
+            ON CONFLICT (isbn13) DO NOTHING
+            """,
+            params,
+        )
+        # 저자 1~2명, 약 20%는 역자 1명 (한 문장으로 넣어 검색 컬럼 갱신 트리거가 한 번만 실행됨)
+        cursor.execute(
+            """
+            INSERT INTO book_persons (book_id, person_id, role)
+            SELECT b.book_id,
+                   (%(person_ids)s::int[])[1 + floor(random() * %(person_count)s)::int],
+                   r.role
+            FROM books b
+            CROSS JOIN LATERAL (
+                SELECT 'author' AS role
+                UNION ALL SELECT 'author' WHERE random() < 0.3
+                UNION ALL SELECT 'translator' WHERE random() < 0.2
+            ) r
+            WHERE b.isbn13 BETWEEN %(prefix)s || lpad(%(first)s::text, 9, '0')
+                               AND %(prefix)s || lpad(%(last)s::text, 9, '0')
+            ON CONFLICT DO NOTHING
+            """,
+            params,
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("populate_catalog needs PostgreSQL.")
+        with connection.cursor() as cursor:
+            if options["cleanup"]:
+                with transaction.atomic():
+                    self.cleanup(cursor)
+                return
+            if options["books"] <= 0:
+                raise CommandError("Give --books N or --cleanup.")
+
+            cursor.execute("SELECT setseed(%s)", [options["seed"]])
+            with transaction.atomic():
+                publisher_ids, person_ids = self.ensure_dimensions(
+                    cursor, options["persons"]
+                )
+            cursor.execute(
+                "SELECT COALESCE(MAX(substr(isbn13, 5)::int), 0) FROM books "
+                "WHERE isbn13 LIKE %s",
+                [SYNTHETIC_ISBN_PREFIX + "%"],
+            )
+            start = cursor.fetchone()[0] + 1
+            end = start + options["books"] - 1
+            started_at = time.monotonic()
+            for first in range(start, end + 1, options["batch_size"]):
+                last = min(end, first + options["batch_size"] - 1)
+                with transaction.atomic():
+                    self.add_books(cursor, first, last, publisher_ids, person_ids)
+                self.stdout.write(
+                    f"Added books {first}..{last} ({time.monotonic() - started_at:.0f}s)"
+                )
+            cursor.execute("ANALYZE books")
+            cursor.execute("ANALYZE book_persons")
+        self.stdout.write(
+            f"Added {options['books']} synthetic books in "
+            f"{time.monotonic() - started_at:.1f}s."
+        )
@@ -0,0 +1,17 @@
+"""
+웹 프로세스 메트릭
+
+수집 스크립트와 같은 레지스트리(Scripts/pipeline_metrics.py)를 사용하므로 메트릭 이름 규칙과
+Prometheus 텍스트 형식이 같습니다. 값은 프로세스마다 따로 집계됩니다.
+"""
+
+import sys
+
+from django.conf import settings
+
+if str(settings.INGEST_SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(settings.INGEST_SCRIPTS_DIR))
+
+from pipeline_metrics import Metrics  # noqa: E402  pylint: disable=wrong-import-position
+
+METRICS = Metrics()
@@ -0,0 +1,185 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:58
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Book',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('book_id', models.AutoField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='title')),
+                ('subtitle', models.CharField(blank=True, max_length=255, null=True, verbose_name='subtitle')),
+                ('original_title', models.CharField(blank=True, max_length=255, null=True, verbose_name='original title')),
+                ('isbn10', models.CharField(max_length=10, null=True, unique=True, verbose_name='ISBN-10')),
+                ('isbn13', models.CharField(max_length=13, null=True, unique=True, verbose_name='ISBN-13')),
+                ('publication_date', models.DateField(blank=True, null=True, verbose_name='publication date')),
+                ('edition', models.CharField(blank=True, max_length=50, null=True, verbose_name='edition')),
+                ('pages', models.IntegerField(blank=True, null=True, verbose_name='pages')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='description')),
+                ('cover_image_url', models.CharField(blank=True, max_length=255, null=True, verbose_name='cover image URL')),
+                ('content_fingerprint', models.CharField(editable=False, max_length=32, null=True)),
+            ],
+            options={
+                'verbose_name': 'book',
+                'verbose_name_plural': 'books',
+                'db_table': 'books',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BookAnalysis',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('analysis_id', models.AutoField(primary_key=True, serialize=False)),
+                ('rating', models.DecimalField(blank=True, decimal_places=1, max_digits=2, null=True, verbose_name='rating')),
+                ('review_text', models.TextField(blank=True, null=True, verbose_name='review')),
+                ('hexagon_value_1', models.IntegerField(blank=True, null=True)),
+                ('hexagon_value_2', models.IntegerField(blank=True, null=True)),
+                ('hexagon_value_3', models.IntegerField(blank=True, null=True)),
+                ('hexagon_value_4', models.IntegerField(blank=True, null=True)),
+                ('hexagon_value_5', models.IntegerField(blank=True, null=True)),
+                ('hexagon_value_6', models.IntegerField(blank=True, null=True)),
+                ('analysis_date', models.DateField(blank=True, db_default=django.db.models.functions.datetime.Now(), null=True, verbose_name='analysis date')),
+            ],
+            options={
+                'verbose_name': 'book analysis',
+                'verbose_name_plural': 'book analyses',
+                'db_table': 'book_analyses',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BookInstance',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('instance_id', models.AutoField(primary_key=True, serialize=False)),
+                ('acquisition_date', models.DateField(blank=True, null=True, verbose_name='acquisition date')),
+                ('condition', models.CharField(blank=True, choices=[('new', '새 책'), ('good', '좋음'), ('fair', '보통'), ('poor', '나쁨'), ('damaged', '파손'), ('lost', '분실')], max_length=50, null=True, verbose_name='condition')),
+                ('status', models.CharField(choices=[('available', '대출 가능'), ('loaned_out', '대출 중'), ('reserved', '예약됨'), ('maintenance', '정비 중')], default='available', max_length=50, null=True, verbose_name='status')),
+                ('library_location', models.CharField(blank=True, max_length=100, null=True, verbose_name='library location')),
+                ('identifier_value', models.CharField(blank=True, max_length=255, null=True, unique=True, verbose_name='identifier value')),
+                ('identifier_type', models.CharField(blank=True, choices=[('BARCODE_EAN13', 'EAN-13 바코드'), ('BARCODE_CODE128', 'Code 128 바코드'), ('QR_CODE', 'QR 코드'), ('RFID_EPC', 'RFID EPC'), ('NFC_UID', 'NFC UID'), ('CUSTOM_ID', '사용자 정의 ID'), ('OTHER', '기타')], max_length=20, null=True, verbose_name='identifier type')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='notes')),
+            ],
+            options={
+                'verbose_name': 'book instance',
+                'verbose_name_plural': 'book instances',
+                'db_table': 'book_instances',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BookPerson',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('pk', models.CompositePrimaryKey('book', 'person', 'role', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('role', models.CharField(choices=[('author', '저자'), ('translator', '역자'), ('editor', '편집'), ('illustrator', '그림')], max_length=50, verbose_name='role')),
+            ],
+            options={
+                'verbose_name': 'book person',
+                'verbose_name_plural': 'book persons',
+                'db_table': 'book_persons',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BookTag',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('pk', models.CompositePrimaryKey('book', 'tag', blank=True, editable=False, primary_key=True, serialize=False)),
+            ],
+            options={
+                'verbose_name': 'book tag',
+                'verbose_name_plural': 'book tags',
+                'db_table': 'book_tags',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('category_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='name')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='description')),
+            ],
+            options={
+                'verbose_name': 'category',
+                'verbose_name_plural': 'categories',
+                'db_table': 'categories',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('person_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='name')),
+                ('bio', models.TextField(blank=True, null=True, verbose_name='bio')),
+            ],
+            options={
+                'verbose_name': 'person',
+                'verbose_name_plural': 'persons',
+                'db_table': 'persons',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Publisher',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('publisher_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='name')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='notes')),
+            ],
+            options={
+                'verbose_name': 'publisher',
+                'verbose_name_plural': 'publishers',
+                'db_table': 'publishers',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False, null=True, verbose_name='updated at')),
+                ('tag_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='name')),
+            ],
+            options={
+                'verbose_name': 'tag',
+                'verbose_name_plural': 'tags',
+                'db_table': 'tags',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
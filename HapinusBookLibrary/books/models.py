@@ -1,3 +1,343 @@
+"""
+도서 카탈로그 모델
+
+테이블은 Schema/database.sql이 만들고 Scripts/update_csv_to_db.py가 채우므로,
+모델은 기존 테이블에 대응만 하고 Django 마이그레이션으로 테이블을 만들거나 바꾸지 않습니다.
+(managed = False, created_at/updated_at은 DB 기본값과 트리거가 관리)
+"""
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Now
+from django.utils.translation import gettext_lazy as _
+
+
+class CatalogModel(models.Model):
+    """
+    카탈로그 테이블 공통 필드 (DB가 값을 채우므로 Django에서는 읽기 전용)
+    """
+
+    created_at = models.DateTimeField(
+        _("created at"), null=True, editable=False, db_default=Now()
+    )
+    updated_at = models.DateTimeField(
+        _("updated at"), null=True, editable=False, db_default=Now()
+    )
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class Publisher(CatalogModel):
+    """
+    출판사
+    """
+
+    publisher_id = models.AutoField(primary_key=True)
+    name = models.CharField(_("name"), max_length=100, unique=True)
+    notes = models.TextField(_("notes"), null=True, blank=True)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "publishers"
+        verbose_name = _("publisher")
+        verbose_name_plural = _("publishers")
+
+    def __str__(self):
+        return self.name
+
+
+class Category(CatalogModel):
+    """
+    카테고리 (parent로 계층 구성)
+    """
+
+    category_id = models.AutoField(primary_key=True)
+    name = models.CharField(_("name"), max_length=100)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column="parent_category_id",
+        related_name="children",
+    )
+    description = models.TextField(_("description"), null=True, blank=True)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "categories"
+        verbose_name = _("category")
+        verbose_name_plural = _("categories")
+
+    def __str__(self):
+        return self.name
+
+
+class Person(CatalogModel):
+    """
+    저자, 역자 등 도서에 참여한 사람
+    """
+
+    person_id = models.AutoField(primary_key=True)
+    name = models.CharField(_("name"), max_length=100)
+    bio = models.TextField(_("bio"), null=True, blank=True)
+    # 초성/자모 앞부분 검색용 (DB 트리거가 계산, books/hangul.py 참고)
+    name_chosung = models.TextField(null=True, editable=False)
+    name_jamo = models.TextField(null=True, editable=False)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "persons"
+        verbose_name = _("person")
+        verbose_name_plural = _("persons")
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(CatalogModel):
+    """
+    태그
+    """
+
+    tag_id = models.AutoField(primary_key=True)
+    name = models.CharField(_("name"), max_length=50, unique=True)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "tags"
+        verbose_name = _("tag")
+        verbose_name_plural = _("tags")
+
+    def __str__(self):
+        return self.name
+
+
+class Book(CatalogModel):
+    """
+    도서 (ISBN 하나에 해당하는 서지 정보)
+    참여자는 book_persons, 태그는 book_tags, 실물은 book_instances,
+    분석 정보는 book_analyses 테이블에 있습니다.
+    """
+
+    book_id = models.AutoField(primary_key=True)
+    title = models.CharField(_("title"), max_length=255)
+    subtitle = models.CharField(_("subtitle"), max_length=255, null=True, blank=True)
+    original_title = models.CharField(
+        _("original title"), max_length=255, null=True, blank=True
+    )
+    isbn10 = models.CharField(_("ISBN-10"), max_length=10, unique=True, null=True)
+    isbn13 = models.CharField(_("ISBN-13"), max_length=13, unique=True, null=True)
+    publication_date = models.DateField(_("publication date"), null=True, blank=True)
+    edition = models.CharField(_("edition"), max_length=50, null=True, blank=True)
+    pages = models.IntegerField(_("pages"), null=True, blank=True)
+    description = models.TextField(_("description"), null=True, blank=True)
+    cover_image_url = models.CharField(
+        _("cover image URL"), max_length=255, null=True, blank=True
+    )
+    # 표지를 받기 전에 그릴 플레이스홀더 (cover_placeholders.py가 계산)
+    cover_dominant_color = models.CharField(max_length=7, null=True, editable=False)
+    cover_blurhash = models.CharField(max_length=64, null=True, editable=False)
+    cover_aspect_ratio = models.FloatField(null=True, editable=False)
+    # update_csv_to_db.py가 계산한 내용 지문
+    content_fingerprint = models.CharField(max_length=32, null=True, editable=False)
+    # 검색용 컬럼 (제목/부제/원제/참여자/출판사로 DB 트리거가 계산, books/search.py 참고)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(null=True, editable=False)
+    # 초성/자모 앞부분 검색용 (DB 트리거가 계산, books/hangul.py 참고)
+    title_chosung = models.TextField(null=True, editable=False)
+    title_jamo = models.TextField(null=True, editable=False)
+    publisher = models.ForeignKey(
+        Publisher,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column="publisher_id",
+        related_name="books",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column="category_id",
+        related_name="books",
+    )
+
+    class Meta(CatalogModel.Meta):
+        db_table = "books"
+        verbose_name = _("book")
+        verbose_name_plural = _("books")
+
+    def __str__(self):
+        return self.title
+
+
+class BookPerson(CatalogModel):
+    """
+    도서-참여자 관계 (같은 사람이 한 도서에 여러 역할로 참여할 수 있음)
+    """
+
+    class Role(models.TextChoices):
+        AUTHOR = "author", "저자"
+        TRANSLATOR = "translator", "역자"
+        EDITOR = "editor", "편집"
+        ILLUSTRATOR = "illustrator", "그림"
+
+    pk = models.CompositePrimaryKey("book", "person", "role")
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, db_column="book_id", related_name="book_persons"
+    )
+    person = models.ForeignKey(
+        Person,
+        on_delete=models.CASCADE,
+        db_column="person_id",
+        related_name="book_persons",
+    )
+    role = models.CharField(_("role"), max_length=50, choices=Role.choices)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "book_persons"
+        verbose_name = _("book person")
+        verbose_name_plural = _("book persons")
+
+    def __str__(self):
+        return f"{self.person} ({self.get_role_display()})"
+
+
+class BookTag(CatalogModel):
+    """
+    도서-태그 관계
+    """
+
+    pk = models.CompositePrimaryKey("book", "tag")
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, db_column="book_id", related_name="book_tags"
+    )
+    tag = models.ForeignKey(
+        Tag, on_delete=models.CASCADE, db_column="tag_id", related_name="book_tags"
+    )
+
+    class Meta(CatalogModel.Meta):
+        db_table = "book_tags"
+        verbose_name = _("book tag")
+        verbose_name_plural = _("book tags")
+
+    def __str__(self):
+        return str(self.tag)
+
+
+class BookInstance(CatalogModel):
+    """
+    도서 실물 (소장본 한 권)
+    """
+
+    class Condition(models.TextChoices):
+        NEW = "new", "새 책"
+        GOOD = "good", "좋음"
+        FAIR = "fair", "보통"
+        POOR = "poor", "나쁨"
+        DAMAGED = "damaged", "파손"
+        LOST = "lost", "분실"
+
+    class Status(models.TextChoices):
+        AVAILABLE = "available", "대출 가능"
+        LOANED_OUT = "loaned_out", "대출 중"
+        RESERVED = "reserved", "예약됨"
+        MAINTENANCE = "maintenance", "정비 중"
+
+    class IdentifierType(models.TextChoices):
+        BARCODE_EAN13 = "BARCODE_EAN13", "EAN-13 바코드"
+        BARCODE_CODE128 = "BARCODE_CODE128", "Code 128 바코드"
+        QR_CODE = "QR_CODE", "QR 코드"
+        RFID_EPC = "RFID_EPC", "RFID EPC"
+        NFC_UID = "NFC_UID", "NFC UID"
+        CUSTOM_ID = "CUSTOM_ID", "사용자 정의 ID"
+        OTHER = "OTHER", "기타"
+
+    instance_id = models.AutoField(primary_key=True)
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, db_column="book_id", related_name="instances"
+    )
+    acquisition_date = models.DateField(_("acquisition date"), null=True, blank=True)
+    condition = models.CharField(
+        _("condition"), max_length=50, choices=Condition.choices, null=True, blank=True
+    )
+    status = models.CharField(
+        _("status"),
+        max_length=50,
+        choices=Status.choices,
+        default=Status.AVAILABLE,
+        null=True,
+    )
+    library_location = models.CharField(
+        _("library location"), max_length=100, null=True, blank=True
+    )
+    identifier_value = models.CharField(
+        _("identifier value"), max_length=255, unique=True, null=True, blank=True
+    )
+    # DB에서는 physical_identifier_type_enum 타입
+    identifier_type = models.CharField(
+        _("identifier type"),
+        max_length=20,
+        choices=IdentifierType.choices,
+        null=True,
+        blank=True,
+    )
+    notes = models.TextField(_("notes"), null=True, blank=True)
+
+    class Meta(CatalogModel.Meta):
+        db_table = "book_instances"
+        verbose_name = _("book instance")
+        verbose_name_plural = _("book instances")
+
+    def __str__(self):
+        return f"{self.book_id} #{self.instance_id}"
+
+    @property
+    def is_available(self):
+        return self.status == self.Status.AVAILABLE
+
+
+class BookAnalysis(CatalogModel):
+    """
+    도서 분석 (평점, 서평, 6각형 값) - 도서당 하나
+    """
+
+    analysis_id = models.AutoField(primary_key=True)
+    book = models.OneToOneField(
+        Book, on_delete=models.CASCADE, db_column="book_id", related_name="analysis"
+    )
+    rating = models.DecimalField(
+        _("rating"), max_digits=2, decimal_places=1, null=True, blank=True
+    )
+    review_text = models.TextField(_("review"), null=True, blank=True)
+    hexagon_value_1 = models.IntegerField(null=True, blank=True)
+    hexagon_value_2 = models.IntegerField(null=True, blank=True)
+    hexagon_value_3 = models.IntegerField(null=True, blank=True)
+    hexagon_value_4 = models.IntegerField(null=True, blank=True)
+    hexagon_value_5 = models.IntegerField(null=True, blank=True)
+    hexagon_value_6 = models.IntegerField(null=True, blank=True)
+    analysis_date = models.DateField(
+        _("analysis date"), null=True, blank=True, db_default=Now()
+    )
+
+    class Meta(CatalogModel.Meta):
+        db_table = "book_analyses"
+        verbose_name = _("book analysis")
+        verbose_name_plural = _("book analyses")
+
+    def __str__(self):
+        return f"{self.book_id} ({self.rating})"
 
-# Create your models here.
+    @property
+    def hexagon_values(self):
+        """
+        6각형 값 리스트 (1~6 순서)
+        """
+        return [
+            self.hexagon_value_1,
+            self.hexagon_value_2,
+            self.hexagon_value_3,
+            self.hexagon_value_4,
+            self.hexagon_value_5,
+            self.hexagon_value_6,
+        ]
@@ -0,0 +1,162 @@
+"""
+커서(keyset) 페이지네이션
+
+Paginator는 OFFSET/LIMIT과 COUNT(*)를 사용하므로 도서가 많을수록 뒤쪽 페이지가 느려집니다.
+여기서는 (정렬 키, book_id) 순서로 인덱스를 읽고, 이전 페이지의 마지막 행 다음부터
+WHERE (title, book_id) > (%s, %s)로 찾으므로 몇 번째 페이지든 비용이 같습니다.
+
+- 커서는 마지막(또는 첫) 행의 정렬 키 값을 서명해 인코딩한 문자열이라 클라이언트가 만들거나 고칠 수 없습니다.
+  (잘못된 커서는 첫 페이지로 처리)
+- 순서는 book_id까지 포함한 값이므로 항상 같고, 읽는 중에 도서가 추가돼도 이미 본 도서가 다시 나오거나
+  아직 보지 않은 도서를 건너뛰지 않습니다. (커서 앞쪽에 추가된 도서는 보이지 않음)
+- 전체 건수는 COUNT(*) 대신 PostgreSQL 실행 계획의 예상 행 수를 사용합니다.
+"""
+
+import json
+
+from django.core import signing
+from django.db.models import F, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+
+CURSOR_SALT = "books.pagination.cursor"
+PAGE_SIZE = 20
+
+
+class Row(Func):
+    """
+    행 값 생성자 (예: (title, book_id)), 행 비교는 여러 컬럼 인덱스를 그대로 사용할 수 있음
+    """
+
+    function = ""
+    template = "(%(expressions)s)"
+
+    def _resolve_output_field(self):
+        return self.source_expressions[0].output_field
+
+
+class SortOrder:
+    """
+    정렬 순서: 같은 방향의 컬럼 목록 (마지막 컬럼은 고유해야 함, 보통 book_id)
+    """
+
+    def __init__(self, label, fields, descending=False):
+        self.label = label
+        self.fields = tuple(fields)
+        self.descending = descending
+
+    def order_by(self, reverse=False):
+        prefix = "-" if self.descending != reverse else ""
+        return [prefix + field for field in self.fields]
+
+    def after(self, values, reverse=False):
+        """
+        values 다음 행을 찾는 조건 (reverse면 이전 행)
+        """
+        lookup = LessThan if self.descending != reverse else GreaterThan
+        return lookup(
+            Row(*(F(field) for field in self.fields)),
+            Row(*(Value(value) for value in values)),
+        )
+
+    def values(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+
+# 도서 목록 정렬 (Schema/database.sql의 idx_books_title (title, book_id)와 기본 키 인덱스 사용)
+BOOK_SORT_ORDERS = {
+    "title": SortOrder("제목순", ["title", "book_id"]),
+    "recent": SortOrder("최근 등록순", ["book_id"], descending=True),
+}
+DEFAULT_BOOK_SORT = "title"
+
+
+class CursorPage:
+    """
+    커서 페이지 (Paginator의 Page처럼 반복할 수 있음)
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor, estimated_count):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.estimated_count = estimated_count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(values, reverse=False):
+    return signing.dumps({"v": values, "r": reverse}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor, sort):
+    """
+    :return: (정렬 키 값 리스트, 이전 페이지 방향 여부), 커서가 없거나 잘못됐으면 (None, False)
+    """
+    if not cursor:
+        return None, False
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        values, reverse = data["v"], bool(data["r"])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None, False
+    if not isinstance(values, list) or len(values) != len(sort.fields):
+        return None, False
+    return values, reverse
+
+
+def estimated_count(queryset):
+    """
+    실행 계획의 예상 행 수 (통계 기반 추정값이므로 실제 건수와 다를 수 있음)
+    """
+    # 목록 화면의 JOIN(select_related)은 건수와 관계없으므로 빼고 추정
+    plan = json.loads(queryset.select_related(None).order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def cursor_page(queryset, sort, cursor=None, page_size=PAGE_SIZE):
+    """
+    커서 다음(또는 이전) 한 페이지
+    :param queryset: 필터만 적용한 쿼리셋 (정렬은 sort로 정함)
+    :param sort: SortOrder
+    :param cursor: 이전 응답의 next_cursor 또는 previous_cursor (없으면 첫 페이지)
+    :param page_size: 페이지당 행 수
+    :return: CursorPage
+    """
+    values, reverse = decode_cursor(cursor, sort)
+    page = queryset.order_by(*sort.order_by(reverse))
+    if values is not None:
+        page = page.filter(sort.after(values, reverse))
+    # 한 건 더 읽어 다음 페이지가 있는지 확인
+    rows = list(page[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    if reverse:
+        # 이전 페이지로 왔으면 다음 페이지는 항상 있음
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, values is not None
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(sort.values(rows[-1]))
+    if rows and has_previous:
+        previous_cursor = encode_cursor(sort.values(rows[0]), reverse=True)
+    return CursorPage(rows, next_cursor, previous_cursor, estimated_count(queryset))
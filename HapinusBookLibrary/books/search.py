@@ -0,0 +1,192 @@
+"""
+도서 검색
+
+books.search_vector(tsvector)와 books.search_text(소문자 텍스트)는 제목, 부제, 원제와
+참여자 이름, 출판사 이름으로 DB 트리거가 계산합니다. (Schema/database.sql 참고)
+
+- 단어 일치: 검색어의 각 단어로 시작하는 단어가 모두 있는 도서 (tsvector GIN 인덱스)
+  한국어는 "소년이"처럼 조사가 붙어 있으므로 앞부분 일치(:*)로 찾습니다.
+- 부분 일치: 검색어가 단어 중간에 있는 도서 (search_text의 pg_trgm GIN 인덱스)
+  trigram 인덱스는 3글자 이상이어야 쓸 수 있으므로 짧은 검색어는 단어 일치로만 찾습니다.
+
+결과는 모든 단어가 제목에 있는 도서가 먼저이고, 그 안에서 ts_rank 순서(제목 > 부제/원제/참여자 >
+출판사 가중치), 같은 점수는 book_id 순서입니다. 정렬과 SEARCH_MAX_RESULTS 제한은 DB에서 합니다.
+흔한 단어가 수십만 권과 일치해도 ts_rank는 각 그룹에서 인덱스가 먼저 돌려준
+SEARCH_RANK_CANDIDATES권에만 계산하므로, 검색 시간이 일치한 도서 수에 비례하지 않습니다.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import F, Prefetch, Q
+
+from .hangul import decompose, is_chosung_query
+from .models import Book, BookPerson, Person
+
+SEARCH_CONFIG = "simple"
+# 검색어 최대 길이 (글자)
+SEARCH_QUERY_MAX_LENGTH = 100
+# 앞부분 일치로 찾을 최소 단어 길이
+PREFIX_MIN_LENGTH = 2
+# 부분 일치 검색을 사용할 최소 단어 길이 (pg_trgm 인덱스 조건)
+TRIGRAM_MIN_LENGTH = 3
+# 순위를 매겨 보여줄 최대 결과 수 (흔한 단어도 일치한 도서를 모두 읽지 않도록 제한)
+SEARCH_MAX_RESULTS = 1000
+# 제목 일치/나머지 그룹마다 순위를 계산할 최대 후보 수 (SEARCH_MAX_RESULTS 이상)
+SEARCH_RANK_CANDIDATES = 2000
+SEARCH_PAGE_SIZE = 20
+# 초성/자모 앞부분 검색의 기본/최대 결과 수
+PREFIX_SEARCH_LIMIT = 10
+PREFIX_SEARCH_MAX_LIMIT = 50
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def normalize_query(text):
+    """
+    검색어 정규화: 소문자로 바꾸고 연속된 공백을 하나로 줄입니다.
+    :param text: 사용자가 입력한 검색어
+    :return: 정규화한 검색어 (최대 SEARCH_QUERY_MAX_LENGTH글자)
+    """
+    return " ".join((text or "").lower().split())[:SEARCH_QUERY_MAX_LENGTH]
+
+
+def prefix_search_query(terms, weights=""):
+    """
+    모든 단어가 앞부분 일치하는 tsquery (예: "소년:* & 한강:*")
+    한 글자 단어는 앞부분이 같은 단어가 너무 많아 인덱스를 오래 읽으므로 단어 전체가 같아야 합니다.
+    단어에는 \\w 문자만 있으므로 tsquery 문법 문자가 섞이지 않습니다.
+    :param weights: 일치할 가중치 (예: "A"면 제목에 있는 단어만, "소년:*A & 한강:*A")
+    """
+    label = f":{weights}" if weights else ""
+    return SearchQuery(
+        " & ".join(
+            term + label if len(term) < PREFIX_MIN_LENGTH else f"{term}:*{weights}"
+            for term in terms
+        ),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def search_condition(text):
+    """
+    검색어에 해당하는 WHERE 조건과 순위 계산에 쓸 tsquery
+    :param text: 사용자가 입력한 검색어
+    :return: (Q, SearchQuery, 제목 일치 SearchQuery) 튜플, 검색어에 단어가 없으면 None
+    """
+    query_text = normalize_query(text)
+    terms = _TERM_PATTERN.findall(query_text)
+    if not terms:
+        return None
+    query = prefix_search_query(terms)
+    condition = Q(search_vector=query)
+    if max(len(term) for term in terms) >= TRIGRAM_MIN_LENGTH:
+        condition |= Q(search_text__contains=query_text)
+    return condition, query, prefix_search_query(terms, weights="A")
+
+
+def rank_candidates(condition, query, limit):
+    """
+    condition과 일치하는 도서 중 인덱스(bitmap scan)가 먼저 돌려준 SEARCH_RANK_CANDIDATES권만
+    순위를 매깁니다. 후보를 고를 때 정렬하지 않으므로 일치한 도서를 모두 읽지 않고, ts_rank 계산과
+    정렬은 후보 수만큼만 합니다. (ORM은 LIMIT한 쿼리셋을 다시 정렬할 수 없어 바깥 쿼리는 SQL로 작성)
+    :return: 순위순 book_id 리스트 (최대 limit건)
+    """
+    candidates = (
+        Book.objects.filter(condition)
+        .order_by()
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .values("book_id", "rank")
+    )[:SEARCH_RANK_CANDIDATES]
+    sql, params = candidates.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT book_id FROM ({sql}) candidates ORDER BY rank DESC, book_id LIMIT %s",
+            (*params, limit),
+        )
+        return [book_id for (book_id,) in cursor.fetchall()]
+
+
+def ranked_book_ids(text, limit=SEARCH_MAX_RESULTS):
+    """
+    검색어와 일치하는 도서 ID를 순위순으로 반환합니다.
+    모든 단어가 제목에 있는 도서를 먼저 순위순으로 limit건까지 찾고, 모자라면 나머지(부제, 참여자,
+    출판사, 부분 일치)에서 순위순으로 채웁니다. 그룹마다 후보 수가 정해져 있으므로 흔한 단어도
+    일치한 도서 전체의 순위를 계산하지 않고, 제목 일치가 limit건을 넘으면 나머지는 찾지 않습니다.
+    :param text: 사용자가 입력한 검색어
+    :param limit: 최대 결과 수
+    :return: book_id 리스트
+    """
+    search = search_condition(text)
+    if search is None:
+        return []
+    condition, query, title_query = search
+    title_match = Q(search_vector=title_query)
+    book_ids = rank_candidates(title_match, query, limit)
+    if len(book_ids) < limit:
+        book_ids += rank_candidates(
+            condition & ~title_match, query, limit - len(book_ids)
+        )
+    return book_ids
+
+
+def book_summary_queryset():
+    """
+    도서 목록 한 줄에 필요한 출판사와 저자를 함께 읽는 쿼리셋 (book.authors는 BookPerson 리스트)
+    """
+    return Book.objects.select_related("publisher").prefetch_related(
+        Prefetch(
+            "book_persons",
+            queryset=BookPerson.objects.filter(role=BookPerson.Role.AUTHOR)
+            .select_related("person")
+            .order_by("person__name"),
+            to_attr="authors",
+        )
+    )
+
+
+def search_page(text, page_number, page_size=SEARCH_PAGE_SIZE):
+    """
+    검색 결과 한 페이지 (출판사와 저자를 함께 읽음)
+    순위 계산은 ID만 읽는 쿼리 하나로 하고, 도서 정보는 해당 페이지의 도서만 읽습니다.
+    :param text: 사용자가 입력한 검색어
+    :param page_number: 페이지 번호 (잘못된 값이면 첫 페이지 또는 마지막 페이지)
+    :param page_size: 페이지당 결과 수
+    :return: django.core.paginator.Page (object_list는 Book 리스트)
+    """
+    page = Paginator(ranked_book_ids(text), page_size).get_page(page_number)
+    books = book_summary_queryset().in_bulk(page.object_list)
+    page.object_list = [books[book_id] for book_id in page.object_list if book_id in books]
+    return page
+
+
+def prefix_search(text, limit=PREFIX_SEARCH_LIMIT):
+    """
+    초성 또는 자모 앞부분으로 도서 제목과 인물 이름을 찾습니다.
+    초성만 입력하면("ㅎㄹㅍㅌ") 초성 컬럼, 음절이 섞여 있으면("해리ㅍ", "핼") 자모 컬럼과 비교합니다.
+    두 컬럼 모두 C 콜레이션 B-tree 인덱스가 있어 조건과 정렬을 인덱스로 처리합니다.
+    :param text: 사용자가 입력한 검색어
+    :param limit: 도서/인물별 최대 결과 수
+    :return: {"mode": "chosung" 또는 "jamo", "books": Book 쿼리셋, "persons": Person 쿼리셋}
+    """
+    chosung_only = is_chosung_query(text or "")
+    key = decompose(text or "", chosung_only)
+    mode = "chosung" if chosung_only else "jamo"
+    if not key:
+        return {"mode": mode, "books": Book.objects.none(), "persons": Person.objects.none()}
+    title_field = f"title_{mode}"
+    name_field = f"name_{mode}"
+    books = (
+        Book.objects.filter(**{f"{title_field}__startswith": key})
+        .order_by(title_field, "book_id")
+        .only("book_id", "title")[:limit]
+    )
+    persons = (
+        Person.objects.filter(**{f"{name_field}__startswith": key})
+        .order_by(name_field, "person_id")
+        .only("person_id", "name")[:limit]
+    )
+    return {"mode": mode, "books": books, "persons": persons}
@@ -0,0 +1,69 @@
+"""
+도서 상세 화면 캐시 무효화
+
+도서나 화면에 보이는 관련 행이 저장/삭제되면 해당 도서의 캐시 조각 버전만 바꿉니다. (detail_cache.py 참고)
+출판사, 카테고리, 인물, 태그는 연결된 도서를 찾아 바꾸고, 삭제할 때는 연결이 끊기기 전(pre_delete)에 찾습니다.
+QuerySet.update()나 SQL로 바꾼 행은 signal이 없으므로 캐시 만료 시간까지 반영되지 않습니다.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .detail_cache import FRAGMENTS, invalidate_books
+from .models import (
+    Book,
+    BookAnalysis,
+    BookInstance,
+    BookPerson,
+    BookTag,
+    Category,
+    Person,
+    Publisher,
+    Tag,
+)
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_book(sender, instance, **kwargs):
+    invalidate_books([instance.pk], FRAGMENTS)
+
+
+@receiver([post_save, post_delete], sender=BookPerson)
+@receiver([post_save, post_delete], sender=BookTag)
+@receiver([post_save, post_delete], sender=BookAnalysis)
+def invalidate_book_info(sender, instance, **kwargs):
+    invalidate_books([instance.book_id], ["info"])
+
+
+@receiver([post_save, post_delete], sender=BookInstance)
+def invalidate_book_holdings(sender, instance, **kwargs):
+    invalidate_books([instance.book_id], ["holdings"])
+
+
+@receiver([post_save, pre_delete], sender=Publisher)
+def invalidate_publisher_books(sender, instance, **kwargs):
+    invalidate_books(
+        Book.objects.filter(publisher=instance).values_list("pk", flat=True), ["info"]
+    )
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def invalidate_category_books(sender, instance, **kwargs):
+    invalidate_books(
+        Book.objects.filter(category=instance).values_list("pk", flat=True), ["info"]
+    )
+
+
+@receiver([post_save, pre_delete], sender=Person)
+def invalidate_person_books(sender, instance, **kwargs):
+    invalidate_books(
+        BookPerson.objects.filter(person=instance).values_list("book_id", flat=True),
+        ["info"],
+    )
+
+
+@receiver([post_save, pre_delete], sender=Tag)
+def invalidate_tag_books(sender, instance, **kwargs):
+    invalidate_books(
+        BookTag.objects.filter(tag=instance).values_list("book_id", flat=True), ["info"]
+    )
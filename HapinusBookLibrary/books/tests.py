@@ -1,3 +1,740 @@
-from django.test import TestCase
+import random
+import sys
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .autocomplete import AUTOCOMPLETE_KEY_LENGTH, Autocomplete, PrefixIndex, encode_key
+from .detail_cache import get_or_render, get_versions, hit_ratio, version_key
+from .hangul import decompose, is_chosung_query
+from .metrics import Metrics
+from .models import (
+    Book,
+    BookAnalysis,
+    BookInstance,
+    BookPerson,
+    BookTag,
+    Category,
+    Person,
+    Publisher,
+    Tag,
+)
+from .pagination import BOOK_SORT_ORDERS, cursor_page, estimated_count
+from .search import prefix_search, ranked_book_ids
+
+SCHEMA_FILENAME = settings.BASE_DIR.parent / "Schema" / "database.sql"
+
+
+def create_catalog_schema():
+    """
+    카탈로그 모델은 managed = False이므로, 테스트 DB에 Schema/database.sql로 테이블을 만듭니다.
+    (--keepdb로 이미 만들어진 경우는 건너뜀)
+    """
+    if "books" in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(SCHEMA_FILENAME.read_text(encoding="utf-8"))
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CatalogTestCase(TestCase):
+    """
+    카탈로그 테이블이 필요한 테스트의 기본 클래스 (캐시는 테스트마다 비운 프로세스 메모리)
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_catalog_schema()
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+
+
+class BookDetailViewTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        publisher = Publisher.objects.create(name="창비")
+        category = Category.objects.create(name="소설")
+        cls.book = Book.objects.create(
+            title="소년이 온다",
+            isbn13="9788936434120",
+            publisher=publisher,
+            category=category,
+        )
+        cls.add_related_rows(cls.book, 2)
+        BookAnalysis.objects.create(
+            book=cls.book, rating="4.5", review_text="좋은 책", hexagon_value_1=5
+        )
+
+    @staticmethod
+    def add_related_rows(book, count, start=0):
+        """
+        저자, 역자, 태그, 실물을 count개씩 추가합니다.
+        """
+        for i in range(start, start + count):
+            author = Person.objects.create(name=f"저자{i}")
+            translator = Person.objects.create(name=f"역자{i}")
+            BookPerson.objects.create(book=book, person=author, role="author")
+            BookPerson.objects.create(book=book, person=translator, role="translator")
+            BookTag.objects.create(book=book, tag=Tag.objects.create(name=f"태그{i}"))
+            BookInstance.objects.create(
+                book=book,
+                library_location=f"서가 {i}",
+                status="available" if i % 2 == 0 else "loaned_out",
+            )
+
+    def get_detail(self):
+        return self.client.get(reverse("books:book_detail", args=[self.book.book_id]))
+
+    def test_renders_related_rows(self):
+        response = self.get_detail()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [label for label, _ in response.context["contributors"]], ["저자", "역자"]
+        )
+        self.assertContains(response, "창비")
+        self.assertContains(response, "저자0")
+        self.assertContains(response, "역자1")
+        self.assertContains(response, "태그1")
+        self.assertContains(response, "4.5")
+        self.assertEqual(response.context["available_count"], 1)
+        self.assertEqual(len(response.context["instances"]), 2)
+
+    def test_query_count_does_not_grow_with_related_rows(self):
+        # 도서+출판사+카테고리+분석 1개, 참여자 1개, 태그 1개, 실물 1개
+        with self.assertNumQueries(4):
+            self.get_detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_related_rows(self.book, 20, start=2)
+        with self.assertNumQueries(4):
+            response = self.get_detail()
+        self.assertEqual(len(response.context["instances"]), 22)
+
+    def test_book_without_analysis(self):
+        book = Book.objects.create(title="분석 없는 책", isbn13="9788936434121")
+        response = self.client.get(reverse("books:book_detail", args=[book.book_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["analysis"])
+        self.assertContains(response, "소장 중인 실물이 없습니다.")
+
+    def test_cover_placeholder(self):
+        book = Book.objects.create(
+            title="표지 있는 책",
+            isbn13="9788936434122",
+            cover_image_url="https://example.com/cover.jpg",
+            cover_dominant_color="#a1b2c3",
+            cover_blurhash="LEHV6nWB2yk8pyo0adR*.7kCMdnj",
+            cover_aspect_ratio=0.6667,
+        )
+        response = self.client.get(reverse("books:book_detail", args=[book.book_id]))
+        self.assertContains(response, "background-color: #a1b2c3; aspect-ratio: 0.6667;")
+        self.assertContains(response, 'data-blurhash="LEHV6nWB2yk8pyo0adR*.7kCMdnj"')
+
+    def test_missing_book_returns_404(self):
+        response = self.client.get(reverse("books:book_detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchViewTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        changbi = Publisher.objects.create(name="창비")
+        munhak = Publisher.objects.create(name="문학동네")
+        han_kang = Person.objects.create(name="한강")
+        cls.boy = Book.objects.create(
+            title="소년이 온다", isbn13="9788936434120", publisher=changbi
+        )
+        cls.vegetarian = Book.objects.create(
+            title="채식주의자", isbn13="9788936433598", publisher=changbi
+        )
+        cls.other = Book.objects.create(
+            title="작별하지 않는다", isbn13="9788954682152", publisher=munhak
+        )
+        BookPerson.objects.create(book=cls.boy, person=han_kang, role="author")
+        BookPerson.objects.create(book=cls.vegetarian, person=han_kang, role="author")
+
+    def search(self, query, **params):
+        return self.client.get(reverse("books:search"), {"q": query, **params})
+
+    def result_ids(self, response):
+        return [book.book_id for book in response.context["page"]]
+
+    def test_word_prefix_matches_title(self):
+        # "소년이"의 앞부분만 입력해도 찾음
+        response = self.search("소년")
+        self.assertEqual(self.result_ids(response), [self.boy.book_id])
+        self.assertContains(response, "한강")
+
+    def test_matches_person_and_publisher_names(self):
+        self.assertEqual(
+            sorted(self.result_ids(self.search("한강"))),
+            [self.boy.book_id, self.vegetarian.book_id],
+        )
+        self.assertEqual(self.result_ids(self.search("문학동네")), [self.other.book_id])
+
+    def test_substring_match_inside_word(self):
+        self.assertEqual(self.result_ids(self.search("주의자")), [self.vegetarian.book_id])
+
+    def test_title_match_ranks_above_person_match(self):
+        book = Book.objects.create(title="한강 산책", isbn13="9788936400000")
+        self.assertEqual(self.result_ids(self.search("한강"))[0], book.book_id)
+
+    def test_limit_keeps_best_title_match(self):
+        # 먼저 저장된 참여자 일치 도서가 limit보다 많아도 나중에 저장된 제목 일치 도서가 빠지지 않음
+        book = Book.objects.create(title="한강 산책", isbn13="9788936400000")
+        self.assertEqual(ranked_book_ids("한강", limit=1), [book.book_id])
+        self.assertEqual(
+            ranked_book_ids("한강", limit=2), [book.book_id, self.boy.book_id]
+        )
+
+    def test_ranks_bounded_candidates_per_group(self):
+        book = Book.objects.create(title="한강 산책", isbn13="9788936400000")
+        with mock.patch("books.search.SEARCH_RANK_CANDIDATES", 1):
+            # 그룹마다 후보 한 권만 순위를 매기므로, 참여자 일치 도서 두 권 중 한 권만 나옴
+            book_ids = ranked_book_ids("한강")
+        self.assertEqual(len(book_ids), 2)
+        self.assertEqual(book_ids[0], book.book_id)
+        self.assertIn(book_ids[1], [self.boy.book_id, self.vegetarian.book_id])
+
+    def test_person_rename_updates_search(self):
+        Person.objects.filter(name="한강").update(name="Han Kang")
+        self.assertEqual(self.result_ids(self.search("한강")), [])
+        self.assertEqual(len(self.result_ids(self.search("han kang"))), 2)
+
+    def test_pagination(self):
+        response = self.search("창비", page=2)
+        self.assertEqual(response.context["page"].number, 1)  # 결과가 한 페이지뿐
+        self.assertEqual(response.context["page"].paginator.count, 2)
+
+    def test_empty_query(self):
+        self.assertIsNone(self.search("   ").context["page"])
+        # 단어가 없는 검색어는 DB를 검색하지 않고 빈 결과
+        self.assertEqual(self.search("!?").context["page"].paginator.count, 0)
+
+
+class HangulTests(SimpleTestCase):
+    def test_decompose(self):
+        self.assertEqual(decompose("해리 포터", chosung_only=True), "ㅎㄹㅍㅌ")
+        self.assertEqual(decompose("해리 포터"), "ㅎㅐㄹㅣㅍㅗㅌㅓ")
+        # 겹모음/겹받침은 입력 순서대로 나눔
+        self.assertEqual(decompose("괜찮아 닭"), "ㄱㅗㅐㄴㅊㅏㄴㅎㅇㅏㄷㅏㄹㄱ")
+        self.assertEqual(decompose("ㄳ ㅘ"), "ㄱㅅㅗㅏ")
+        # 공백과 ASCII 문장부호는 빼고 영문은 소문자로
+        self.assertEqual(decompose("Harry Potter: 1권!", chosung_only=True), "harrypotter1ㄱ")
+
+    def test_typing_states_are_prefixes(self):
+        # 입력 중인 글자와 초성이 섞인 검색어도 완성된 제목의 앞부분
+        title = decompose("해리 포터와 마법사의 돌")
+        for typed in ["ㅎ", "해", "핼", "해리", "해리ㅍ", "해리 퐅"]:
+            self.assertTrue(title.startswith(decompose(typed)), typed)
+
+    def test_is_chosung_query(self):
+        self.assertTrue(is_chosung_query("ㅎㄹ ㅍㅌ"))
+        self.assertFalse(is_chosung_query("해리ㅍ"))
+        self.assertFalse(is_chosung_query("  "))
+
+
+class PrefixSearchTests(CatalogTestCase):
+    TITLES = [
+        "해리 포터와 마법사의 돌",
+        "해리엇",
+        "소년이 온다",
+        "괜찮아, 사랑이야",
+        "닭강정",
+        "Harry Potter and the Philosopher's Stone",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        # 인덱스 사용 여부는 행 수에 따라 달라지므로 합성 카탈로그 위에 알려진 제목을 추가
+        call_command("populate_catalog", books=3000, persons=2000, stdout=StringIO())
+        for i, title in enumerate(cls.TITLES):
+            Book.objects.create(title=title, isbn13=f"978000000{i:04d}")
+        Person.objects.create(name="한강")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE books")
+            cursor.execute("ANALYZE persons")
+
+    def prefix(self, query):
+        response = self.client.get(reverse("books:prefix"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def titles(self, query):
+        return [book["title"] for book in self.prefix(query)["books"]]
+
+    def test_chosung_query(self):
+        result = self.prefix("ㅎㄹㅍㅌ")
+        self.assertEqual(result["mode"], "chosung")
+        self.assertEqual([book["title"] for book in result["books"]], [self.TITLES[0]])
+
+    def test_half_composed_syllables(self):
+        self.assertEqual(self.titles("해리ㅍ"), [self.TITLES[0]])
+        self.assertEqual(sorted(self.titles("핼")), sorted(self.TITLES[:2]))
+        self.assertEqual(self.titles("괜차"), [self.TITLES[3]])
+        self.assertEqual(self.titles("닭"), [self.TITLES[4]])
+        self.assertEqual(self.titles("harry p"), [self.TITLES[5]])
+
+    def test_person_names(self):
+        self.assertIn("한강", [person["name"] for person in self.prefix("ㅎㄱ")["persons"]])
+
+    def test_rename_updates_decomposition(self):
+        Book.objects.filter(title="해리엇").update(title="샬롯의 거미줄")
+        self.assertEqual(self.titles("ㅅㄹㅇㄱㅁㅈ"), ["샬롯의 거미줄"])
+        self.assertEqual(self.titles("핼"), [self.TITLES[0]])
+
+    def test_database_and_python_decompose_the_same_way(self):
+        samples = self.TITLES + ["ㄳ ㅘ ㄲ", "Ａ全角　공백", "숫자 123 & 기호!?"]
+        with connection.cursor() as cursor:
+            for text in samples:
+                cursor.execute(
+                    "SELECT hangul_decompose(%s, TRUE), hangul_decompose(%s, FALSE)",
+                    [text, text],
+                )
+                self.assertEqual(
+                    cursor.fetchone(),
+                    (decompose(text, chosung_only=True), decompose(text)),
+                    text,
+                )
+
+    def test_queries_use_indexes(self):
+        for query in ["ㅎㄹㅍㅌ", "ㄷ", "해리ㅍ", "핼", "사랑", "ㅎㄱ"]:
+            result = prefix_search(query)
+            for queryset in (result["books"], result["persons"]):
+                plan = queryset.explain()
+                self.assertIn("Index Scan", plan, f"{query}: {plan}")
+                self.assertNotIn("Seq Scan", plan, f"{query}: {plan}")
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def test_top_k_matches_brute_force(self):
+        rng = random.Random(0)
+        keys = [
+            "".join(rng.choices("ㄱㄴㄷㅏㅓab", k=rng.randint(0, 5))).encode()
+            for _ in range(500)
+        ]
+        popularity = [rng.randint(0, 20) for _ in keys]
+        index = PrefixIndex(keys, popularity)
+        for prefix in [b"", "ㄱ".encode(), "ㄱㅏ".encode(), b"a", b"ab", b"zz"]:
+            expected = sorted(
+                (-popularity[i], keys[i], i)
+                for i in range(len(keys))
+                if keys[i].startswith(prefix)
+            )
+            found = [
+                (-pop, index.key(position), entry)
+                for pop, position, entry in index.matches(prefix)
+            ]
+            self.assertEqual(found, expected, prefix)
+
+    def test_encoded_keys_keep_prefixes(self):
+        self.assertTrue(encode_key("해리 포터").startswith(encode_key("해리ㅍ")))
+        self.assertFalse(encode_key("é한").startswith(encode_key("ê")))
+        self.assertEqual(len(encode_key("가" * 100)), AUTOCOMPLETE_KEY_LENGTH)
+
+
+class AutocompleteTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 소장 실물이 많을수록 인기 도서
+        cls.books = {}
+        rows = [("사랑의 기술", 1), ("사랑과 전쟁", 3), ("사람의 아들", 2)]
+        for i, (title, copies) in enumerate(rows):
+            book = Book.objects.create(title=title, isbn13=f"978000000{i:04d}")
+            for _ in range(copies):
+                BookInstance.objects.create(book=book)
+            cls.books[title] = book
+        cls.han_kang = Person.objects.create(name="한강")
+        Person.objects.create(name="한강희")
+        BookPerson.objects.create(
+            book=cls.books["사랑의 기술"], person=cls.han_kang, role="author"
+        )
+
+    def setUp(self):
+        self.index = Autocomplete()
+        self.index.build()
+
+    def titles(self, query):
+        return [title for _, title in self.index.suggest(query)["books"]]
+
+    def test_orders_matches_by_popularity(self):
+        self.assertEqual(self.titles("사"), ["사랑과 전쟁", "사람의 아들", "사랑의 기술"])
+        self.assertEqual(self.titles("ㅅㄹㅇ"), ["사람의 아들", "사랑의 기술"])
+        # "살"은 "사람"을 입력하는 중일 수도 있음
+        self.assertEqual(self.titles("살"), ["사랑과 전쟁", "사람의 아들", "사랑의 기술"])
+        self.assertEqual(self.titles("사랑ㄱ"), ["사랑과 전쟁"])
+        self.assertEqual(
+            [name for _, name in self.index.suggest("ㅎㄱ")["persons"]], ["한강", "한강희"]
+        )
+
+    def test_refresh_applies_changed_rows(self):
+        Book.objects.filter(pk=self.books["사람의 아들"].pk).update(title="살인자의 기억법")
+        for _ in range(3):
+            BookInstance.objects.create(book=self.books["사랑의 기술"])
+        Book.objects.create(title="사과", isbn13="9780000009999")
+        # 테스트 트랜잭션 안에서는 모든 행의 updated_at이 같으므로 바뀌지 않은 행도 다시 읽음
+        self.assertGreaterEqual(self.index.refresh(), 3)
+        self.assertEqual(
+            self.titles("사"), ["사랑의 기술", "사랑과 전쟁", "살인자의 기억법", "사과"]
+        )
+        self.assertEqual(self.titles("사람"), [])
+
+    def test_view_reads_memory_index(self):
+        with mock.patch("books.views.catalog_autocomplete", self.index):
+            with self.assertNumQueries(0):
+                response = self.client.get(
+                    reverse("books:autocomplete"), {"q": "사ㄹ", "limit": 1}
+                )
+        self.assertEqual(response.json()["books"][0]["title"], "사랑과 전쟁")
+
+    def test_view_falls_back_to_database(self):
+        with mock.patch("books.views.catalog_autocomplete", Autocomplete()):
+            response = self.client.get(reverse("books:autocomplete"), {"q": "ㅅㄹㄱ"})
+        self.assertEqual(
+            [book["title"] for book in response.json()["books"]], ["사랑과 전쟁"]
+        )
+
+
+class BookDetailCacheTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.publisher = Publisher.objects.create(name="창비")
+        cls.author = Person.objects.create(name="한강")
+        cls.book = Book.objects.create(
+            title="소년이 온다", isbn13="9788936434120", publisher=cls.publisher
+        )
+        cls.other = Book.objects.create(title="작별하지 않는다", isbn13="9788954682152")
+        BookPerson.objects.create(book=cls.book, person=cls.author, role="author")
+        BookInstance.objects.create(book=cls.book, status="available")
+
+    def get_detail(self, book=None):
+        book = book or self.book
+        return self.client.get(reverse("books:book_detail", args=[book.book_id]))
+
+    def test_repeated_requests_read_cache(self):
+        first = self.get_detail()
+        with self.assertNumQueries(0):
+            second = self.get_detail()
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, "한강")
+        self.assertGreater(hit_ratio("page"), 0)
+
+    def test_instance_change_invalidates_only_holdings(self):
+        self.get_detail()
+        versions = get_versions(self.book.book_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            BookInstance.objects.create(book=self.book, status="loaned_out")
+        changed = get_versions(self.book.book_id)
+        self.assertEqual(changed["info"], versions["info"])
+        self.assertNotEqual(changed["holdings"], versions["holdings"])
+        # 도서와 실물만 다시 읽음
+        with self.assertNumQueries(2):
+            response = self.get_detail()
+        self.assertContains(response, "전체 2권")
+
+    def test_related_row_changes_invalidate_affected_books(self):
+        self.get_detail()
+        self.get_detail(self.other)
+        other_versions = get_versions(self.other.book_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Publisher.objects.filter(pk=self.publisher.pk).get().save()
+        self.assertEqual(get_versions(self.other.book_id), other_versions)
+
+        def rename_author():
+            self.author.name = "Han Kang"
+            self.author.save()
+
+        for change in [
+            rename_author,
+            lambda: BookTag.objects.create(book=self.book, tag=Tag.objects.create(name="5.18")),
+            lambda: BookAnalysis.objects.create(book=self.book, rating="4.5"),
+        ]:
+            versions = get_versions(self.book.book_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertNotEqual(get_versions(self.book.book_id)["info"], versions["info"])
+        response = self.get_detail()
+        self.assertContains(response, "Han Kang")
+        self.assertContains(response, "5.18")
+        self.assertContains(response, "4.5")
+
+    def test_logged_in_user_gets_own_menu(self):
+        self.get_detail()
+        user = get_user_model().objects.create_user(email="reader@example.com", password="pw")
+        self.client.force_login(user)
+        response = self.get_detail()
+        self.assertContains(response, "로그아웃")
+        self.assertContains(response, "소년이 온다")
+
+    def test_missing_book_is_not_cached(self):
+        response = self.client.get(reverse("books:book_detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(cache.get("book_detail:999999:info:lock"))
+
+    def test_concurrent_miss_waits_for_first_render(self):
+        keys = {"info": "stampede:info"}
+        cache.add("stampede:info:lock", 1)
+        # 잠금을 잡은 다른 요청이 잠시 후 결과를 저장
+        timer = threading.Timer(0.05, cache.set, args=("stampede:info", "rendered"))
+        timer.start()
+        try:
+            values = get_or_render(keys, lambda missing: self.fail("rendered twice"))
+        finally:
+            timer.join()
+        self.assertEqual(values, {"info": "rendered"})
+
+    def test_metrics_endpoint(self):
+        self.get_detail()
+        self.get_detail()
+        staff = get_user_model().objects.create_user(
+            email="admin@example.com", password="pw", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get(reverse("books:metrics"))
+        self.assertContains(response, 'book_detail_cache_requests_total{fragment="page"')
+        self.assertContains(response, "book_detail_cache_hit_ratio")
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("books:metrics")).status_code, 302)
+        self.assertIsNotNone(cache.get(version_key(self.book.book_id, "info")))
+
+
+class CursorPaginationTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 같은 제목이 여러 권 있어도 book_id로 순서가 정해짐
+        for i, title in enumerate(["가", "나", "나", "나", "다", "라", "마"]):
+            Book.objects.create(title=title, isbn13=f"97889000000{i:02d}")
+
+    def expected_ids(self, sort_name):
+        sort = BOOK_SORT_ORDERS[sort_name]
+        return list(Book.objects.order_by(*sort.order_by()).values_list("book_id", flat=True))
+
+    def walk(self, sort_name, page_size=2):
+        """
+        첫 페이지부터 next_cursor를 따라가며 페이지별 book_id 목록을 반환합니다.
+        """
+        pages, cursor = [], None
+        while True:
+            page = cursor_page(Book.objects.all(), BOOK_SORT_ORDERS[sort_name], cursor, page_size)
+            pages.append([book.book_id for book in page])
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_walks_every_book_once_in_order(self):
+        for sort_name in BOOK_SORT_ORDERS:
+            pages = self.walk(sort_name)
+            self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+            self.assertEqual(sum(pages, []), self.expected_ids(sort_name), sort_name)
+
+    def test_previous_cursor_returns_same_page(self):
+        sort = BOOK_SORT_ORDERS["title"]
+        first = cursor_page(Book.objects.all(), sort, page_size=3)
+        self.assertFalse(first.has_previous)
+        second = cursor_page(Book.objects.all(), sort, first.next_cursor, page_size=3)
+        back = cursor_page(Book.objects.all(), sort, second.previous_cursor, page_size=3)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_insert_before_cursor_does_not_shift_pages(self):
+        sort = BOOK_SORT_ORDERS["title"]
+        first = cursor_page(Book.objects.all(), sort, page_size=3)
+        Book.objects.create(title="가", isbn13="9788900000100")
+        second = cursor_page(Book.objects.all(), sort, first.next_cursor, page_size=3)
+        seen = {book.book_id for book in first} | {book.book_id for book in second}
+        self.assertEqual(len(seen), 6)
+
+    def test_invalid_cursor_returns_first_page(self):
+        sort = BOOK_SORT_ORDERS["title"]
+        first = cursor_page(Book.objects.all(), sort, page_size=2)
+        for cursor in ["garbage", first.next_cursor + "x"]:
+            page = cursor_page(Book.objects.all(), sort, cursor, page_size=2)
+            self.assertEqual(list(page), list(first))
+
+    def test_does_not_count_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            cursor_page(Book.objects.all(), BOOK_SORT_ORDERS["recent"])
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in queries))
+        self.assertGreater(estimated_count(Book.objects.all()), 0)
+
+    def test_book_list_view(self):
+        response = self.client.get(reverse("books:book_list"), {"sort": "recent"})
+        self.assertEqual(response.context["sort"], "recent")
+        self.assertEqual(
+            [book.book_id for book in response.context["page"]], self.expected_ids("recent")
+        )
+        # 알 수 없는 정렬은 기본 정렬
+        response = self.client.get(reverse("books:book_list"), {"sort": "price"})
+        self.assertEqual(response.context["sort"], "title")
+
+
+class CsvLoaderTests(CatalogTestCase):
+    """
+    update_csv_to_db.py의 행 단위/대량 적재
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if str(settings.INGEST_SCRIPTS_DIR) not in sys.path:
+            sys.path.insert(0, str(settings.INGEST_SCRIPTS_DIR))
+        import update_csv_to_db  # pylint: disable=import-outside-toplevel
+
+        cls.loader = update_csv_to_db
+
+    def csv_row(self, **values):
+        row = dict.fromkeys(self.loader.BOOK_INFO_HEADER, "")
+        row.update(ISBN_KEY="9788936434120", IS_UPDATED="TRUE", TITLE="소년이 온다")
+        row.update(values)
+        return row
+
+    def prepare(self, change, **values):
+        row = self.loader.prepare_book_row(self.csv_row(**values))
+        row["change"] = change
+        return row
+
+    def links(self):
+        book = Book.objects.get(isbn13="9788936434120")
+        return (
+            sorted(
+                (book_person.person.name, book_person.role)
+                for book_person in book.book_persons.select_related("person")
+            ),
+            sorted(book_tag.tag.name for book_tag in book.book_tags.select_related("tag")),
+            BookAnalysis.objects.filter(book=book).exists(),
+        )
+
+    def test_row_mode_removes_dropped_links(self):
+        with connection.cursor() as cursor:
+            dimensions = self.loader.DimensionCache(cursor)
+            self.loader.update_book_row(
+                cursor,
+                self.prepare(
+                    "inserted",
+                    AUTHORS="['한강']",
+                    TRANSLATORS="['데버라 스미스']",
+                    TAGS="['소설', '역사']",
+                    RATING="4.5",
+                ),
+                dimensions,
+            )
+            self.loader.update_book_row(
+                cursor,
+                self.prepare("updated", AUTHORS="['한강']", TAGS="['소설']"),
+                dimensions,
+            )
+        self.assertEqual(self.links(), ([("한강", "author")], ["소설"], False))
+
+    def test_bulk_mode_removes_dropped_links(self):
+        with connection.cursor() as cursor:
+            cursor.execute(self.loader.CREATE_STAGING_SQL)
+            self.loader.bulk_load_batch(
+                cursor,
+                [
+                    self.prepare(
+                        "inserted",
+                        AUTHORS="['한강']",
+                        TRANSLATORS="['데버라 스미스']",
+                        TAGS="['소설', '역사']",
+                        RATING="4.5",
+                    )
+                ],
+            )
+            self.loader.bulk_load_batch(
+                cursor, [self.prepare("updated", AUTHORS="['한강', '김영하']", TAGS="['소설']")]
+            )
+        self.assertEqual(
+            self.links(), ([("김영하", "author"), ("한강", "author")], ["소설"], False)
+        )
+
+    def test_row_mode_refreshes_search_once_per_batch(self):
+        rows = [
+            (None, self.prepare("inserted", AUTHORS="['한강']", TRANSLATORS="['데버라 스미스']")),
+            (
+                None,
+                self.prepare(
+                    "inserted", ISBN_KEY="9788936433598", TITLE="채식주의자", AUTHORS="['한강']"
+                ),
+            ),
+        ]
+        # 현재 트랜잭션에서 books 행을 UPDATE한 횟수 (트리거가 실행한 UPDATE 포함)
+        updated_sql = "SELECT pg_stat_get_xact_tuples_updated('books'::regclass)"
+        with connection.cursor() as cursor:
+            cursor.execute(updated_sql)
+            before = cursor.fetchone()[0]
+            self.loader.update_rows_with_savepoints(
+                cursor, rows, self.loader.DimensionCache(cursor), self.loader.RejectWriter(None)
+            )
+            cursor.execute(updated_sql)
+            # 연결 3개를 넣을 때마다가 아니라 배치 끝에 도서마다 한 번만 다시 씀
+            self.assertEqual(cursor.fetchone()[0] - before, 2)
+        self.assertEqual(Book.objects.filter(search_text__contains="한강").count(), 2)
+        self.assertTrue(Book.objects.filter(search_text__contains="데버라 스미스").exists())
+
+    def test_long_values_fit_schema(self):
+        # 스키마보다 긴 값 하나 때문에 대량 적재 배치 전체가 실패하지 않음
+        row = self.prepare(
+            "inserted",
+            TITLE="가" * 300,
+            TAGS=f"['{'태' * 60}']",
+            THUMBNAIL_URL="https://example.com/" + "a" * 300,
+        )
+        self.assertEqual(len(row["title"]), 255)
+        self.assertEqual(row["tags"], ["태" * 50])
+        self.assertIsNone(row["cover_image_url"])
+        with connection.cursor() as cursor:
+            cursor.execute(self.loader.CREATE_STAGING_SQL)
+            self.loader.bulk_load_batch(cursor, [row])
+        self.assertEqual(self.links(), ([], ["태" * 50], False))
+
+    def test_dimension_lookups_counted_once(self):
+        rows = [
+            (None, self.prepare("inserted", AUTHORS="['한강']", TAGS="['소설']")),
+            (
+                None,
+                self.prepare(
+                    "inserted", ISBN_KEY="9788936433598", TITLE="채식주의자", AUTHORS="['한강']"
+                ),
+            ),
+        ]
+        with connection.cursor() as cursor:
+            dimensions = self.loader.DimensionCache(cursor)
+            self.loader.update_rows_with_savepoints(
+                cursor, rows, dimensions, self.loader.RejectWriter(None)
+            )
+        # 배치 전체에서 한 번씩 찾은 이름만 셈 (행마다 다시 찾는 것은 세지 않음)
+        self.assertEqual(
+            dimensions.misses, {"publishers": 0, "categories": 0, "persons": 1, "tags": 1}
+        )
+        self.assertEqual(sum(dimensions.hits.values()), 0)
+
+
+class MetricsSnapshotTests(SimpleTestCase):
+    def test_worker_snapshots_merge_into_parent(self):
+        parent, worker = Metrics(), Metrics()
+        parent.inc("db_rows_total", result="inserted")
+        for value in (0.02, 0.2):
+            worker.inc("db_rows_total", result="inserted")
+            worker.observe("db_batch_seconds", value)
+            # 작업마다 스냅샷을 꺼내므로 같은 값이 두 번 합쳐지지 않음
+            parent.merge(worker.take_snapshot())
+        summary = parent.to_dict()
+        self.assertEqual(summary["counters"], {'db_rows_total{result="inserted"}': 3})
+        self.assertEqual(summary["histograms"]["db_batch_seconds"]["count"], 2)
+        self.assertEqual(worker.to_dict()["counters"], {})
@@ -5,5 +5,10 @@ from . import views
 app_name = "books"
 
 urlpatterns = [
+    path("", views.book_list, name="book_list"),
     path("<int:book_id>/", views.book_detail, name="book_detail"),
+    path("search/", views.search, name="search"),
+    path("prefix/", views.prefix, name="prefix"),
+    path("autocomplete/", views.autocomplete, name="autocomplete"),
+    path("metrics/", views.metrics, name="metrics"),
 ]
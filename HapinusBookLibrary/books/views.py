@@ -1,12 +1,221 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
+from .autocomplete import catalog_autocomplete
+from .detail_cache import (
+    FRAGMENTS,
+    fragment_keys,
+    get_or_render,
+    get_versions,
+    hit_ratio,
+    page_key,
+)
+from .metrics import METRICS
+from .models import Book, BookInstance, BookPerson, BookTag
+from .pagination import BOOK_SORT_ORDERS, DEFAULT_BOOK_SORT, cursor_page
+from .search import (
+    PREFIX_SEARCH_LIMIT,
+    PREFIX_SEARCH_MAX_LIMIT,
+    SEARCH_MAX_RESULTS,
+    SEARCH_QUERY_MAX_LENGTH,
+    book_summary_queryset,
+    normalize_query,
+    prefix_search,
+    search_page,
+)
 
-# Create your views here.
-def book_detail(request, book_id):
-    book = {
-        "id": book_id,
-        "title": f"Book Title {book_id}",
-        "author": "Author Name",
-        "description": "This is a sample book description.",
+
+def book_detail_queryset():
+    """
+    도서 상세 화면에 필요한 관계를 함께 읽는 쿼리셋
+    출판사, 카테고리, 분석 정보는 JOIN으로, 참여자, 태그, 실물은 관계별 쿼리 한 번씩으로 읽으므로
+    참여자나 실물이 늘어나도 쿼리 수는 4개로 일정합니다.
+    """
+    return Book.objects.select_related(
+        "publisher", "category", "analysis"
+    ).prefetch_related(
+        Prefetch(
+            "book_persons",
+            queryset=BookPerson.objects.select_related("person").order_by("person__name"),
+        ),
+        Prefetch(
+            "book_tags",
+            queryset=BookTag.objects.select_related("tag").order_by("tag__name"),
+        ),
+        Prefetch("instances", queryset=BookInstance.objects.order_by("instance_id")),
+    )
+
+
+def group_persons_by_role(book_persons):
+    """
+    참여자를 역할별로 묶습니다. (저자, 역자, 편집, 그림 순서이며 참여자가 없는 역할은 제외)
+    :param book_persons: BookPerson 리스트
+    :return: (역할 표시 이름, Person 리스트) 튜플 리스트
+    """
+    persons_by_role = {}
+    for book_person in book_persons:
+        persons_by_role.setdefault(book_person.role, []).append(book_person.person)
+    return [
+        (label, persons_by_role[role])
+        for role, label in BookPerson.Role.choices
+        if role in persons_by_role
+    ]
+
+
+def render_book_fragments(book_id, fragments):
+    """
+    도서 상세 화면 조각 렌더링 (캐시에 없는 조각만, 도서가 없으면 Http404)
+    소장 현황만 필요하면 참여자, 태그 등은 읽지 않습니다.
+    :param fragments: 렌더링할 조각 이름 목록 (detail_cache.FRAGMENTS 중)
+    :return: {조각: {"title": 제목, "html": HTML}}
+    """
+    if "info" in fragments:
+        queryset = book_detail_queryset()
+    else:
+        queryset = Book.objects.prefetch_related(
+            Prefetch("instances", queryset=BookInstance.objects.order_by("instance_id"))
+        )
+    book = get_object_or_404(queryset, pk=book_id)
+    instances = book.instances.all()
+    context = {"book": book, "instances": instances}
+    if "info" in fragments:
+        context.update(
+            {
+                "contributors": group_persons_by_role(book.book_persons.all()),
+                "tags": [book_tag.tag for book_tag in book.book_tags.all()],
+                "analysis": getattr(book, "analysis", None),
+            }
+        )
+    if "holdings" in fragments:
+        context["available_count"] = sum(
+            1 for instance in instances if instance.is_available
+        )
+    return {
+        fragment: {
+            "title": book.title,
+            "html": render_to_string(f"books/_book_{fragment}.html", context),
+        }
+        for fragment in fragments
+    }
+
+
+def render_book_page(request, book_id, versions):
+    fragments = get_or_render(
+        fragment_keys(book_id, versions),
+        lambda missing: render_book_fragments(book_id, missing),
+    )
+    context = {
+        "title": fragments["info"]["title"],
+        **{fragment: mark_safe(value["html"]) for fragment, value in fragments.items()},
     }
-    return render(request, "books/book_detail.html", {"book": book})
+    return render_to_string("books/book_detail.html", context, request)
+
+
+def book_detail(request, book_id):
+    """
+    도서 상세 화면 (조각 캐시, 로그인하지 않은 사용자는 페이지 캐시, books/detail_cache.py 참고)
+    """
+    versions = get_versions(book_id)
+    if request.user.is_authenticated:
+        return HttpResponse(render_book_page(request, book_id, versions))
+    page = get_or_render(
+        {"page": page_key(book_id, versions)},
+        lambda missing: {"page": render_book_page(request, book_id, versions)},
+    )
+    return HttpResponse(page["page"])
+
+
+@staff_member_required
+def metrics(request):
+    """
+    웹 프로세스 메트릭 (Prometheus 텍스트 형식, 관리자만)
+    """
+    for fragment in (*FRAGMENTS, "page"):
+        ratio = hit_ratio(fragment)
+        if ratio is not None:
+            METRICS.set_gauge("book_detail_cache_hit_ratio", round(ratio, 4), fragment=fragment)
+    return HttpResponse(METRICS.to_prometheus(), content_type="text/plain; version=0.0.4")
+
+
+def book_list(request):
+    """
+    도서 목록 (정렬별 커서 페이지네이션, 깊은 페이지도 비용이 같음, books/pagination.py 참고)
+    """
+    sort = request.GET.get("sort")
+    if sort not in BOOK_SORT_ORDERS:
+        sort = DEFAULT_BOOK_SORT
+    page = cursor_page(
+        book_summary_queryset(), BOOK_SORT_ORDERS[sort], request.GET.get("cursor")
+    )
+    context = {"page": page, "sort": sort, "sort_orders": BOOK_SORT_ORDERS}
+    return render(request, "books/book_list.html", context)
+
+
+def search(request):
+    query = normalize_query(request.GET.get("q", ""))
+    page = search_page(query, request.GET.get("page")) if query else None
+    context = {"query": query, "page": page, "max_results": SEARCH_MAX_RESULTS}
+    return render(request, "books/search.html", context)
+
+
+def prefix_params(request):
+    """
+    앞부분 검색 API의 검색어와 결과 수 (limit은 1~PREFIX_SEARCH_MAX_LIMIT)
+    """
+    query = request.GET.get("q", "")[:SEARCH_QUERY_MAX_LENGTH]
+    try:
+        limit = int(request.GET.get("limit", PREFIX_SEARCH_LIMIT))
+    except ValueError:
+        limit = PREFIX_SEARCH_LIMIT
+    return query, max(1, min(limit, PREFIX_SEARCH_MAX_LIMIT))
+
+
+def prefix_response(query, mode, books, persons):
+    """
+    :param books: (book_id, 제목) 목록
+    :param persons: (person_id, 이름) 목록
+    """
+    return JsonResponse(
+        {
+            "query": query,
+            "mode": mode,
+            "books": [{"book_id": book_id, "title": title} for book_id, title in books],
+            "persons": [
+                {"person_id": person_id, "name": name} for person_id, name in persons
+            ],
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+def database_prefix_response(query, limit):
+    result = prefix_search(query, limit)
+    return prefix_response(
+        query,
+        result["mode"],
+        [(book.book_id, book.title) for book in result["books"]],
+        [(person.person_id, person.name) for person in result["persons"]],
+    )
+
+
+def prefix(request):
+    """
+    초성/자모 앞부분 검색 API (예: ?q=ㅎㄹㅍㅌ, ?q=해리ㅍ&limit=5)
+    """
+    return database_prefix_response(*prefix_params(request))
+
+
+def autocomplete(request):
+    """
+    검색창 자동완성 API (prefix와 같은 형식, 인기순)
+    메모리 색인에서 찾고, 색인을 아직 만들지 못했거나 검색어가 길면 DB 초성/자모 검색을 사용합니다.
+    """
+    query, limit = prefix_params(request)
+    result = catalog_autocomplete.suggest(query, limit)
+    if result is None:
+        return database_prefix_response(query, limit)
+    return prefix_response(query, result["mode"], result["books"], result["persons"])
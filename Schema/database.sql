@@ -1,5 +1,9 @@
 -- Database Schema for Bookstore Management System
 
+-- 도서 검색의 부분 일치(LIKE '%...%') 인덱스에 사용
+-- (한글이 trigram으로 분리되려면 데이터베이스 LC_CTYPE이 UTF-8 로캘이어야 함, 예: ko_KR.UTF-8, C.UTF-8)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ENUM Type for Physical Identifier Types
 -- This ENUM type is used to categorize different types of physical identifiers for books
 CREATE TYPE physical_identifier_type_enum AS ENUM (
@@ -22,6 +26,57 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Hangul Decomposition Function (한글 초성/자모 분해)
+-- 한글 음절을 초성만(chosung_only = TRUE) 또는 호환 자모로 풀어 씁니다. (예: '해리 포터' → 'ㅎㄹㅍㅌ', 'ㅎㅐㄹㅣㅍㅗㅌㅓ')
+-- 겹받침/겹모음은 입력 순서대로 나누므로('닭' → 'ㄷㅏㄹㄱ') 입력 중인 글자('달')도 앞부분 일치로 찾을 수 있습니다.
+-- 공백과 ASCII 문장부호는 빼고, 영문은 소문자로, 그 밖의 글자는 그대로 둡니다.
+-- books/hangul.py의 decompose()와 같은 결과를 내야 합니다.
+CREATE OR REPLACE FUNCTION hangul_decompose(input TEXT, chosung_only BOOLEAN)
+RETURNS TEXT AS $$
+DECLARE
+  chosung CONSTANT TEXT := 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ';
+  jungsung CONSTANT TEXT[] := ARRAY[
+    'ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ',
+    'ㅗㅣ', 'ㅛ', 'ㅜ', 'ㅜㅓ', 'ㅜㅔ', 'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ'
+  ];
+  jongsung CONSTANT TEXT[] := ARRAY[
+    '', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ',
+    'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+  ];
+  compound CONSTANT TEXT := 'ㄳㄵㄶㄺㄻㄼㄽㄾㄿㅀㅄㅘㅙㅚㅝㅞㅟㅢ';
+  compound_parts CONSTANT TEXT[] := ARRAY[
+    'ㄱㅅ', 'ㄴㅈ', 'ㄴㅎ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ', 'ㄹㅍ', 'ㄹㅎ', 'ㅂㅅ',
+    'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅜㅓ', 'ㅜㅔ', 'ㅜㅣ', 'ㅡㅣ'
+  ];
+  result TEXT := '';
+  ch TEXT;
+  code INTEGER;
+  syllable INTEGER;
+BEGIN
+  FOREACH ch IN ARRAY regexp_split_to_array(input, '') LOOP
+    code := ascii(ch);
+    IF code BETWEEN 44032 AND 55203 THEN          -- 가..힣
+      syllable := code - 44032;
+      result := result || substr(chosung, syllable / 588 + 1, 1);
+      IF NOT chosung_only THEN
+        result := result || jungsung[syllable % 588 / 28 + 1] || jongsung[syllable % 28 + 1];
+      END IF;
+    ELSIF strpos(compound, ch) > 0 THEN
+      result := result || compound_parts[strpos(compound, ch)];
+    ELSIF code BETWEEN 65 AND 90 THEN             -- A..Z
+      result := result || chr(code + 32);
+    ELSIF code < 128 THEN                         -- 숫자/소문자만 남김
+      IF ch ~ '[0-9a-z]' THEN
+        result := result || ch;
+      END IF;
+    ELSIF code NOT IN (160, 12288) THEN           -- NBSP, 전각 공백 제외
+      result := result || ch;
+    END IF;
+  END LOOP;
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE;
+
 -- ------------------------------------------------------------------
 -- Table: publishers (출판사)
 CREATE TABLE publishers (
@@ -62,10 +117,33 @@ CREATE TABLE persons (
     person_id INTEGER PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
     name VARCHAR(100) NOT NULL, 
     bio TEXT,
+    name_chosung TEXT COLLATE "C",                 -- 이름 초성 (예: 한강 → ㅎㄱ, 트리거가 관리)
+    name_jamo TEXT COLLATE "C",                    -- 이름 자모 (예: 한강 → ㅎㅏㄴㄱㅏㅇ, 트리거가 관리)
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 초성/자모 앞부분 검색 (books/search.py의 prefix_search)
+-- 컬럼이 C 콜레이션이므로 일반 B-tree 인덱스로 LIKE 'ㅎㄱ%'와 정렬을 모두 처리
+CREATE INDEX idx_persons_name_chosung ON persons (name_chosung);
+CREATE INDEX idx_persons_name_jamo ON persons (name_jamo);
+-- 자동완성 색인(books/autocomplete.py)이 바뀐 행만 읽을 때 사용
+CREATE INDEX idx_persons_updated_at ON persons (updated_at);
+
+CREATE OR REPLACE FUNCTION trigger_set_person_name_jamo()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.name_chosung := hangul_decompose(NEW.name, TRUE);
+  NEW.name_jamo := hangul_decompose(NEW.name, FALSE);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_persons_name_jamo
+BEFORE INSERT OR UPDATE OF name ON persons
+FOR EACH ROW
+EXECUTE FUNCTION trigger_set_person_name_jamo();
+
 CREATE TRIGGER set_persons_timestamp
 BEFORE UPDATE ON persons
 FOR EACH ROW
@@ -99,6 +177,14 @@ CREATE TABLE books (
     pages INTEGER,
     description TEXT,
     cover_image_url VARCHAR(255),
+    cover_dominant_color CHAR(7),                  -- 표지 대표 색상 (예: #a1b2c3, cover_placeholders.py가 관리)
+    cover_blurhash VARCHAR(64),                    -- 표지 blurhash (cover_placeholders.py가 관리)
+    cover_aspect_ratio REAL,                       -- 표지 너비/높이 (cover_placeholders.py가 관리)
+    content_fingerprint CHAR(32),                  -- update_csv_to_db.py가 계산한 내용 지문 (바뀐 행만 다시 쓰기 위함)
+    search_vector TSVECTOR,                        -- 검색용 단어 목록 (제목/부제/원제/참여자/출판사, 트리거가 관리)
+    search_text TEXT,                              -- 부분 일치 검색용 소문자 텍스트 (같은 내용, 트리거가 관리)
+    title_chosung TEXT COLLATE "C",                -- 제목 초성 (예: ㅎㄹㅍㅌ, 트리거가 관리)
+    title_jamo TEXT COLLATE "C",                   -- 제목 자모 (예: ㅎㅐㄹㅣㅍㅗㅌㅓ, 트리거가 관리)
     publisher_id INTEGER REFERENCES publishers(publisher_id) ON DELETE SET NULL,
     category_id INTEGER REFERENCES categories(category_id) ON DELETE SET NULL,
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
@@ -107,7 +193,8 @@ CREATE TABLE books (
     CONSTRAINT check_book_pages CHECK (pages IS NULL OR pages > 0) -- 페이지 수 제약 조건 추가
 );
 
-CREATE INDEX idx_books_title ON books (title);
+-- 제목순 목록의 커서 페이지네이션 (books/pagination.py): WHERE (title, book_id) > (...) ORDER BY title, book_id
+CREATE INDEX idx_books_title ON books (title, book_id);
 CREATE INDEX idx_books_publisher_id ON books (publisher_id);
 CREATE INDEX idx_books_category_id ON books (category_id);
 
@@ -115,12 +202,35 @@ CREATE INDEX idx_books_category_id ON books (category_id);
 CREATE INDEX idx_books_isbn10 ON books (isbn10) WHERE isbn10 IS NOT NULL; -- NULL이 아닌 값에 대해서만 인덱싱
 CREATE INDEX idx_books_isbn13 ON books (isbn13) WHERE isbn13 IS NOT NULL; -- NULL이 아닌 값에 대해서만 인덱싱
 
+-- 도서 검색 (books/search.py): 단어(앞부분) 일치는 tsvector, 부분 일치는 trigram 인덱스 사용
+CREATE INDEX idx_books_search_vector ON books USING GIN (search_vector);
+CREATE INDEX idx_books_search_text_trgm ON books USING GIN (search_text gin_trgm_ops);
+-- 초성/자모 앞부분 검색 (C 콜레이션 컬럼이므로 LIKE 'ㅎㄹ%'와 정렬에 같은 인덱스 사용)
+CREATE INDEX idx_books_title_chosung ON books (title_chosung);
+CREATE INDEX idx_books_title_jamo ON books (title_jamo);
+-- 자동완성 색인(books/autocomplete.py)이 바뀐 행만 읽을 때 사용
+CREATE INDEX idx_books_updated_at ON books (updated_at);
+
 
 CREATE TRIGGER set_books_timestamp
 BEFORE UPDATE ON books
 FOR EACH ROW
 EXECUTE FUNCTION trigger_set_timestamp();
 
+CREATE OR REPLACE FUNCTION trigger_set_book_title_jamo()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.title_chosung := hangul_decompose(NEW.title, TRUE);
+  NEW.title_jamo := hangul_decompose(NEW.title, FALSE);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_books_title_jamo
+BEFORE INSERT OR UPDATE OF title ON books
+FOR EACH ROW
+EXECUTE FUNCTION trigger_set_book_title_jamo();
+
 -- ------------------------------------------------------------------
 -- Table: person_tags (저자-태그 관계)
 CREATE TABLE person_tags (
@@ -162,11 +272,128 @@ CREATE TABLE book_persons (
     PRIMARY KEY (book_id, person_id, role)
 );
 
+-- 인물별 참여 도서 (기본 키는 book_id로 시작하므로 person_id로 찾을 때 별도 인덱스 필요)
+CREATE INDEX idx_book_persons_person_id ON book_persons (person_id);
+-- 자동완성 색인(books/autocomplete.py)이 인물별 참여 도서 수가 바뀐 인물을 찾을 때 사용
+CREATE INDEX idx_book_persons_updated_at ON book_persons (updated_at);
+
 CREATE TRIGGER set_book_persons_timestamp
 BEFORE UPDATE ON book_persons
 FOR EACH ROW
 EXECUTE FUNCTION trigger_set_timestamp();
 
+-- ------------------------------------------------------------------
+-- Book search columns (도서 검색 컬럼 갱신)
+-- books.search_vector/search_text는 도서의 제목, 부제, 원제와 참여자 이름, 출판사 이름으로 만듭니다.
+-- 도서 행은 BEFORE 트리거가 직접 계산하고, 참여자/출판사가 바뀌면 해당 도서의 search_vector를
+-- NULL로 바꿔 BEFORE 트리거가 다시 계산하게 합니다. (문장 단위 트리거라 대량 적재에도 한 번씩만 실행)
+CREATE OR REPLACE FUNCTION trigger_set_book_search()
+RETURNS TRIGGER AS $$
+DECLARE
+  person_names TEXT;
+  publisher_name TEXT;
+BEGIN
+  SELECT string_agg(p.name, ' ' ORDER BY p.name) INTO person_names
+  FROM book_persons bp JOIN persons p ON p.person_id = bp.person_id
+  WHERE bp.book_id = NEW.book_id;
+  SELECT name INTO publisher_name FROM publishers WHERE publisher_id = NEW.publisher_id;
+
+  NEW.search_vector :=
+      setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A')
+   || setweight(to_tsvector('simple', concat_ws(' ', NEW.subtitle, NEW.original_title)), 'B')
+   || setweight(to_tsvector('simple', coalesce(person_names, '')), 'B')
+   || setweight(to_tsvector('simple', coalesce(publisher_name, '')), 'C');
+  NEW.search_text := lower(
+      concat_ws(' ', NEW.title, NEW.subtitle, NEW.original_title, person_names, publisher_name)
+  );
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_books_search
+BEFORE INSERT OR UPDATE OF title, subtitle, original_title, publisher_id, search_vector ON books
+FOR EACH ROW
+EXECUTE FUNCTION trigger_set_book_search();
+
+-- book_persons 변경: 추가/삭제/변경된 연결의 도서를 다시 계산
+-- 연결을 한 행씩 넣는 적재 스크립트는 트랜잭션에서 SET LOCAL hapinus.defer_book_search = on으로
+-- 이 트리거를 건너뛰고, 배치 끝에 반영한 도서의 search_vector를 한 번만 NULL로 바꿉니다.
+CREATE OR REPLACE FUNCTION trigger_refresh_book_search_by_book_persons()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF current_setting('hapinus.defer_book_search', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'UPDATE' THEN
+    UPDATE books SET search_vector = NULL
+    WHERE book_id IN (SELECT book_id FROM changed_rows UNION SELECT book_id FROM old_rows);
+  ELSE
+    UPDATE books SET search_vector = NULL
+    WHERE book_id IN (SELECT book_id FROM changed_rows);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_book_search_on_book_persons_insert
+AFTER INSERT ON book_persons
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_refresh_book_search_by_book_persons();
+
+CREATE TRIGGER refresh_book_search_on_book_persons_update
+AFTER UPDATE ON book_persons
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_refresh_book_search_by_book_persons();
+
+CREATE TRIGGER refresh_book_search_on_book_persons_delete
+AFTER DELETE ON book_persons
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_refresh_book_search_by_book_persons();
+
+-- persons/publishers 이름 변경: 이름이 바뀐 행과 연결된 도서만 다시 계산
+CREATE OR REPLACE FUNCTION trigger_refresh_book_search_by_person()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE books SET search_vector = NULL
+  WHERE book_id IN (
+    SELECT bp.book_id
+    FROM new_rows n
+    JOIN old_rows o ON o.person_id = n.person_id
+    JOIN book_persons bp ON bp.person_id = n.person_id
+    WHERE n.name IS DISTINCT FROM o.name
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_book_search_on_persons_update
+AFTER UPDATE ON persons
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_refresh_book_search_by_person();
+
+CREATE OR REPLACE FUNCTION trigger_refresh_book_search_by_publisher()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE books SET search_vector = NULL
+  WHERE publisher_id IN (
+    SELECT n.publisher_id
+    FROM new_rows n JOIN old_rows o ON o.publisher_id = n.publisher_id
+    WHERE n.name IS DISTINCT FROM o.name
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER refresh_book_search_on_publishers_update
+AFTER UPDATE ON publishers
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_refresh_book_search_by_publisher();
+
 -- ------------------------------------------------------------------
 -- Table: book_instances (도서 실물 정보)
 CREATE TABLE book_instances (
@@ -184,6 +411,8 @@ CREATE TABLE book_instances (
 );
 
 CREATE INDEX idx_book_instances_book_id ON book_instances (book_id);
+-- 자동완성 색인(books/autocomplete.py)이 소장 실물 수가 바뀐 도서를 찾을 때 사용
+CREATE INDEX idx_book_instances_updated_at ON book_instances (updated_at);
 
 CREATE TRIGGER set_book_instances_timestamp
 BEFORE UPDATE ON book_instances
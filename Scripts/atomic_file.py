@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 임시 파일에 쓴 뒤 rename하는 원자적 파일 쓰기 모듈
+# ------------------------------------------------------------------------
+# Filename: atomic_file.py
+# Usage: from atomic_file import atomic_write
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+# 새 파일의 권한 (open()으로 만든 파일과 같은 0666 & ~umask, umask는 import 시점에 한 번만 읽음)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+DEFAULT_FILE_MODE = 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(filename, mode="w", prefix=None, fsync=False, **kwargs):
+    """
+    같은 디렉토리의 임시 파일을 열어 주고, 블록이 끝나면 filename으로 rename합니다.
+    쓰는 도중 중단되어도 기존 파일은 그대로이고, 예외가 나면 임시 파일을 지웁니다.
+    NamedTemporaryFile은 0600으로 만들어지므로 기존 파일의 권한(없으면 기본 권한)으로 바꿉니다.
+    :param filename: 저장할 파일 경로
+    :param mode: 파일 열기 모드 ("w" 또는 "wb")
+    :param prefix: 임시 파일 이름 접두사
+    :param fsync: True이면 rename 전에 디스크에 기록
+    :param kwargs: NamedTemporaryFile에 넘길 인자 (encoding, newline 등)
+    :return: 쓰기 모드로 열린 임시 파일
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    try:
+        file_mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        file_mode = DEFAULT_FILE_MODE
+    file = tempfile.NamedTemporaryFile(
+        mode=mode, dir=directory, prefix=prefix, suffix=".tmp", delete=False, **kwargs
+    )
+    try:
+        with file:
+            yield file
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        os.chmod(file.name, file_mode)
+        os.replace(file.name, filename)
+    except BaseException:
+        try:
+            os.remove(file.name)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# update_csv_to_db.py의 적재 속도(rows/s)를 프로세스 수별로 측정하는 벤치마크 스크립트
+# 지정한 DB의 도서/참조 테이블을 비우므로 로컬 테스트용 DB에서만 실행하세요.
+# ------------------------------------------------------------------------
+# Filename: benchmark_db_loader.py
+# Usage: python benchmark_db_loader.py --database hapinus_bench [--rows 20000]
+#                                      [--workers 1,2,4,8] [--bulk]
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from isbn_utils import isbn13_check_digit
+
+# 적재 전에 비우는 테이블 (연결 테이블과 book_analyses는 CASCADE로 함께 비워짐)
+RESET_TABLES = ["books", "publishers", "categories", "persons", "tags"]
+
+
+def generate_book_info_csv(filename, rows, header, seed=0):
+    """
+    book_info.csv 형식의 합성 데이터를 만듭니다.
+    출판사/카테고리/저자/태그는 실제 데이터처럼 일부 이름이 자주 반복되도록 고릅니다.
+    :param filename: 저장할 파일 경로
+    :param rows: 행 수
+    :param header: CSV 헤더 (BOOK_INFO_HEADER)
+    :param seed: 난수 시드 (같은 시드면 같은 파일)
+    """
+    rng = random.Random(seed)
+    persons = max(10, rows // 4)
+
+    def pick(prefix, size):
+        # 앞쪽 이름이 더 자주 나오도록 치우친 분포
+        return f"{prefix}{int(size * rng.random() ** 2)}"
+
+    with open(filename, mode="w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=header)
+        writer.writeheader()
+        for i in range(rows):
+            first12 = f"979{i:09d}"
+            isbn13 = first12 + isbn13_check_digit(first12)
+            book = dict.fromkeys(header, "")
+            book.update(
+                {
+                    "ISBN_KEY": isbn13,
+                    "IS_UPDATED": "TRUE",
+                    "TITLE": f"합성 도서 {i}",
+                    "AUTHORS": str([pick("저자", persons) for _ in range(rng.randint(1, 3))]),
+                    "TRANSLATORS": str([pick("역자", persons // 10)])
+                    if rng.random() < 0.3
+                    else "[]",
+                    "PUBLISHER": pick("출판사", 2000),
+                    "PUBLISHED_DATE": f"20{rng.randint(0, 24):02d}-{rng.randint(1, 12):02d}-01",
+                    "ISBN_13": isbn13,
+                    "PAGES": str(rng.randint(40, 1200)),
+                    "CATEGORY": pick("분류", 50),
+                    "TAGS": ",".join(pick("태그", 5000) for _ in range(rng.randint(0, 5))),
+                    "RATING": f"{rng.randint(0, 50) / 10:.1f}",
+                    "THUMBNAIL_URL": f"https://example.com/covers/{isbn13}.jpg",
+                    "DESCRIPTION": "합성 도서 설명입니다. " * rng.randint(5, 40),
+                }
+            )
+            writer.writerow(book)
+
+
+def reset_tables(loader):
+    """
+    벤치마크 DB의 도서/참조 테이블을 비웁니다.
+    """
+    conn = loader.psycopg2.connect(**loader.DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(RESET_TABLES)} RESTART IDENTITY CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_benchmark(loader, filename, workers, bulk, rejects_filename):
+    """
+    빈 테이블에 CSV 전체를 적재하고 걸린 시간을 잽니다.
+    :return: (적재 결과 딕셔너리, 걸린 시간(초))
+    """
+    reset_tables(loader)
+    started_at = time.monotonic()
+    if workers > 1:
+        counts = loader.parallel_load_books(
+            loader.iter_book_info_csv(filename), workers, bulk, None, rejects_filename
+        )
+    elif bulk:
+        counts = loader.bulk_load_books(
+            loader.iter_book_info_csv(filename), rejects_filename=rejects_filename
+        )
+    else:
+        counts = loader.update_books_in_db(
+            loader.iter_book_info_csv(filename), rejects_filename=rejects_filename
+        )
+    return counts, time.monotonic() - started_at
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure update_csv_to_db.py rows/s against a local PostgreSQL "
+        "for several worker counts. TRUNCATES the loader tables of --database."
+    )
+    parser.add_argument(
+        "--database", required=True, help="throwaway database with Schema/database.sql"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=20000, help="synthetic rows (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(w) for w in value.split(",")],
+        default=[1, 2, 4, 8],
+        help="comma-separated worker counts (default: 1,2,4,8)",
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="benchmark the COPY-based bulk mode"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # update_csv_to_db는 import할 때 DB 설정을 읽으므로 먼저 대상 DB를 지정
+    os.environ["DB_NAME"] = args.database
+    import update_csv_to_db as loader
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "book_info.csv")
+        rejects_filename = os.path.join(directory, "rejects.csv")
+        generate_book_info_csv(filename, args.rows, loader.BOOK_INFO_HEADER)
+
+        mode = "bulk" if args.bulk else "row"
+        print(f"{args.rows} rows, {mode} mode, database {args.database}")
+        print(f"{'workers':>7} {'seconds':>8} {'rows/s':>9} {'speedup':>7}")
+        baseline = None
+        for workers in args.workers:
+            counts, elapsed = run_benchmark(
+                loader, filename, workers, args.bulk, rejects_filename
+            )
+            if counts["inserted"] != args.rows:
+                print(f"warning: {counts} (expected {args.rows} inserted)", file=sys.stderr)
+            rows_per_second = args.rows / elapsed
+            baseline = baseline or rows_per_second
+            print(
+                f"{workers:>7} {elapsed:>8.2f} {rows_per_second:>9.1f} "
+                f"{rows_per_second / baseline:>6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
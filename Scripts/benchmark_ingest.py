@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 수집 스크립트(Kakao API 조회, 표지 다운로드, DB 적재)의 처리량과 지연 시간을
+# 로컬 모의 서버(mock_kakao_server.py)를 상대로 측정하는 벤치마크 스크립트
+# 결과는 커밋끼리 비교할 수 있도록 JSON으로 출력합니다.
+# db 단계는 지정한 DB의 도서/참조 테이블을 비우므로 로컬 테스트용 DB에서만 실행하세요.
+# ------------------------------------------------------------------------
+# Filename: benchmark_ingest.py
+# Usage: python benchmark_ingest.py [--rows 1000] [--stages fetch,download,db]
+#                                   [--database hapinus_bench] [--latency SEC]
+#                                   [--error-rate R] [--throttle-rate R]
+#                                   [--output result.json]
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from book_info_store import BOOK_INFO_HEADER
+from isbn_utils import isbn13_check_digit
+from mock_kakao_server import MockKakaoServer
+
+STAGES = ["fetch", "download", "db"]
+PERCENTILES = [50, 95, 99]
+# 각 단계는 작업 디렉토리 아래에서 실행되므로 스크립트의 ../data, ../logs가 임시 디렉토리를 가리킴
+WORK_SUBDIRS = ["work", "data", "logs"]
+
+
+def generate_isbn_csv(filename, rows, seed=0):
+    """
+    아직 조회하지 않은(IS_UPDATED=FALSE) ISBN_KEY만 있는 book_info.csv를 만듭니다.
+    :param filename: 저장할 파일 경로
+    :param rows: 행 수 (1,000 ~ 1,000,000 정도)
+    :param seed: ISBN 번호대를 바꾸는 시드 (같은 시드면 같은 파일)
+    """
+    with open(filename, mode="w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=BOOK_INFO_HEADER)
+        writer.writeheader()
+        for i in range(rows):
+            first12 = f"978{(seed * rows + i) % 10**9:09d}"
+            book = dict.fromkeys(BOOK_INFO_HEADER, "")
+            book.update(
+                {"ISBN_KEY": first12 + isbn13_check_digit(first12), "IS_UPDATED": "FALSE"}
+            )
+            writer.writerow(book)
+
+
+def percentile(sorted_values, p):
+    """
+    정렬된 값 목록의 p 백분위수 (nearest-rank 방식)
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(records, elapsed, latencies, errors, unit):
+    """
+    단계 하나의 측정 결과를 딕셔너리로 정리합니다.
+    :param records: 처리한 레코드 수
+    :param elapsed: 걸린 시간 (초)
+    :param latencies: 요청(또는 배치)별 지연 시간 리스트 (초)
+    :param errors: 실패한 레코드 수
+    :param unit: latencies의 단위 ("request" 또는 "batch")
+    """
+    latencies = sorted(latencies)
+    return {
+        "records": records,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed, 1) if elapsed else None,
+        "latency_unit": unit,
+        "latency_ms": {
+            f"p{p}": round(percentile(latencies, p) * 1000, 2) if latencies else None
+            for p in PERCENTILES
+        },
+        # Linux에서 ru_maxrss는 KB 단위, 단계마다 별도 프로세스이므로 단계별 최대값
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def timed(func, latencies):
+    """
+    호출마다 걸린 시간을 latencies에 추가하는 래퍼 (여러 스레드에서 호출 가능)
+    """
+
+    def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started_at)
+
+    return wrapper
+
+
+def run_fetch(options):
+    """
+    fetch 단계: book_info.csv의 ISBN_KEY를 모의 Kakao API로 조회하고,
+    결과를 다시 CSV로 저장합니다.
+    """
+    import isbn_processor_to_csv as processor
+
+    isbn_key_list = processor.read_book_info_csv(processor.BOOK_INFO_FILENAME)
+    latencies = []
+    processor.get_book_info_from_kakao_api = timed(
+        processor.get_book_info_from_kakao_api, latencies
+    )
+    rows = []
+    errors = 0
+    started_at = time.perf_counter()
+    for isbn_key, book_json in processor.fetch_book_info(
+        isbn_key_list, options["fetch_workers"], options["rate"], cache=None
+    ):
+        book_details = processor.json_to_book_dictionary(isbn_key, book_json)
+        if book_details:
+            rows.append(book_details)
+        else:
+            errors += 1
+    processor.write_csv_rows(processor.BOOK_INFO_FILENAME, rows)
+    elapsed = time.perf_counter() - started_at
+    return summarize(len(isbn_key_list), elapsed, latencies, errors, "request")
+
+
+def run_download(options):
+    """
+    download 단계: fetch 단계가 저장한 THUMBNAIL_URL의 표지를 모의 서버에서 받아
+    이미지 저장소에 저장합니다.
+    """
+    import download_image
+
+    book_info_list = [
+        book
+        for book in download_image.read_book_info(download_image.BOOK_INFO_FILENAME)
+        if book["THUMBNAIL_URL"]
+    ]
+    latencies = []
+    download = timed(download_image.download_image, latencies)
+    workers = options["download_workers"]
+    errors = 0
+    started_at = time.perf_counter()
+    with download_image.ImageStore() as image_store, (
+        download_image.create_download_session(workers)
+    ) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                download, book["THUMBNAIL_URL"], book["ISBN_KEY"], image_store, session
+            )
+            for book in book_info_list
+        ]
+        for future in futures:
+            result, _, _ = future.result()
+            errors += result == download_image.FAILED
+    elapsed = time.perf_counter() - started_at
+    return summarize(len(book_info_list), elapsed, latencies, errors, "request")
+
+
+def run_db(options):
+    """
+    db 단계: fetch 단계가 저장한 book_info.csv를 빈 테이블에 적재합니다.
+    지연 시간은 배치 단위로 잽니다.
+    """
+    import benchmark_db_loader
+    import update_csv_to_db as loader
+
+    benchmark_db_loader.reset_tables(loader)
+    latencies = []
+    started_at = time.perf_counter()
+    if options["bulk"]:
+        loader.bulk_load_batch = timed(loader.bulk_load_batch, latencies)
+        counts = loader.bulk_load_books(
+            loader.iter_book_info_csv(loader.BOOK_INFO_FILENAME),
+            options["batch_size"] or loader.BULK_BATCH_SIZE,
+        )
+    else:
+        loader.load_batch = timed(loader.load_batch, latencies)
+        counts = loader.update_books_in_db(
+            loader.iter_book_info_csv(loader.BOOK_INFO_FILENAME),
+            options["batch_size"] or loader.COMMIT_BATCH_SIZE,
+        )
+    elapsed = time.perf_counter() - started_at
+    return summarize(
+        sum(counts.values()), elapsed, latencies, counts["rejected"], "batch"
+    )
+
+
+def run_stage(stage, directory, options):
+    """
+    단계 하나를 실행합니다. 단계마다 새 프로세스(spawn)에서 호출되므로
+    peak RSS가 다른 단계의 영향을 받지 않습니다.
+    :param stage: "fetch", "download" 또는 "db"
+    :param directory: 임시 작업 디렉토리
+    :param options: 명령행 옵션과 모의 서버 주소를 담은 딕셔너리
+    :return: summarize()의 반환값
+    """
+    os.chdir(os.path.join(directory, "work"))
+    os.environ.update(
+        {
+            "KAKAO_API_KEY": os.environ.get("KAKAO_API_KEY", "benchmark"),
+            "KAKAO_BOOK_API_URL": options["book_api_url"],
+            # 스크립트의 로그가 측정 대상 루프를 느리게 하지 않도록 치명적인 오류만 출력
+            "LOG_LEVEL": "CRITICAL",
+        }
+    )
+    if options["database"]:
+        os.environ["DB_NAME"] = options["database"]
+    return {"fetch": run_fetch, "download": run_download, "db": run_db}[stage](options)
+
+
+def git_revision():
+    """
+    현재 커밋 해시 (git 저장소가 아니면 None)
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the fetch, download and DB-load paths against a local mock "
+        "Kakao/cover server and print the results as JSON."
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1000, help="synthetic ISBNs (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--stages",
+        type=lambda value: value.split(","),
+        default=["fetch", "download"],
+        help="comma-separated stages from fetch,download,db (default: fetch,download). "
+        "download and db use the fetch output, so fetch always runs first",
+    )
+    parser.add_argument(
+        "--database",
+        help="throwaway database for the db stage (its tables are TRUNCATED)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="random seed (default: %(default)s)"
+    )
+    server = parser.add_argument_group("mock server")
+    server.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="response delay in seconds (default: %(default)s)",
+    )
+    server.add_argument(
+        "--jitter",
+        type=float,
+        default=0.01,
+        help="extra random delay in seconds (default: %(default)s)",
+    )
+    server.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of HTTP 500 responses"
+    )
+    server.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="share of HTTP 429 responses"
+    )
+    server.add_argument(
+        "--not-found-rate",
+        type=float,
+        default=0.0,
+        help="share of ISBNs with no documents",
+    )
+    stages = parser.add_argument_group("stages")
+    stages.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=8,
+        help="concurrent API requests (default: %(default)s)",
+    )
+    stages.add_argument(
+        "--rate",
+        type=float,
+        default=1000.0,
+        help="maximum API requests per second (default: %(default)s)",
+    )
+    stages.add_argument(
+        "--download-workers",
+        type=int,
+        default=8,
+        help="concurrent downloads (default: %(default)s)",
+    )
+    stages.add_argument(
+        "--bulk", action="store_true", help="db stage: use the COPY-based bulk mode"
+    )
+    stages.add_argument(
+        "--batch-size", type=int, help="db stage: rows per transaction"
+    )
+    parser.add_argument(
+        "--output", help="write the JSON result to this file instead of stdout"
+    )
+    args = parser.parse_args()
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    if "db" in args.stages and not args.database:
+        parser.error("the db stage requires --database")
+    # 뒤 단계는 fetch 결과를 입력으로 쓰므로 항상 fetch부터 정해진 순서로 실행
+    args.stages = [stage for stage in STAGES if stage in args.stages or stage == "fetch"]
+    return args
+
+
+def main():
+    args = parse_args()
+    result = {
+        "benchmark": "ingest",
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "stages": {},
+    }
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory, MockKakaoServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        not_found_rate=args.not_found_rate,
+        seed=args.seed,
+    ) as server:
+        for name in WORK_SUBDIRS:
+            os.makedirs(os.path.join(directory, name))
+        generate_isbn_csv(
+            os.path.join(directory, "data", "book_info.csv"), args.rows, args.seed
+        )
+        options = dict(vars(args), book_api_url=server.book_api_url)
+        for stage in args.stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                summary = executor.submit(run_stage, stage, directory, options).result()
+            result["stages"][stage] = summary
+            print(
+                f"{stage:>8}: {summary['records']} records in {summary['seconds']}s "
+                f"({summary['records_per_second']} records/s), "
+                f"p50/p95/p99 {summary['latency_ms']['p50']}/{summary['latency_ms']['p95']}/"
+                f"{summary['latency_ms']['p99']} ms per {summary['latency_unit']}, "
+                f"{summary['errors']} errors, peak RSS {summary['peak_rss_mb']} MB",
+                file=sys.stderr,
+            )
+        result["server"] = dict(server.stats)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# book_info.csv의 열 구조(스키마)와, 같은 데이터를 인덱스가 있는 로컬 SQLite 파일에
+# 보관하는 스테이징 저장소 모듈
+# ------------------------------------------------------------------------
+# Filename: book_info_store.py
+# Usage: from book_info_store import BOOK_INFO_HEADER, BookInfoStore
+#        python book_info_store.py import [--csv FILE] [--store FILE]
+#        python book_info_store.py export [--csv FILE] [--store FILE]
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+import threading
+
+from atomic_file import atomic_write
+
+# CSV 파일 이름 및 구조 (모든 스크립트가 이 정의를 공유)
+BOOK_INFO_FILENAME = "../data/book_info.csv"
+BOOK_INFO_HEADER = [
+    "ISBN_KEY",
+    "IS_UPDATED",
+    "TITLE",
+    "SUBTITLE",
+    "ORIGINAL_TITLE",
+    "AUTHORS",
+    "TRANSLATORS",
+    "PUBLISHER",
+    "PUBLISHED_DATE",
+    "ISBN_10",
+    "ISBN_13",
+    "PAGES",
+    "EDITION",
+    "CATEGORY",
+    "TAGS",
+    "RATING",
+    "REVIEW_TEXT",
+    "HEX1",
+    "HEX2",
+    "HEX3",
+    "HEX4",
+    "HEX5",
+    "HEX6",
+    "THUMBNAIL_URL",
+    "DESCRIPTION",
+]
+
+BOOK_INFO_STORE_PATH = os.getenv("BOOK_INFO_STORE_PATH", "../data/book_info.sqlite3")
+# iter_rows()가 한 번의 쿼리로 읽는 행 수
+STORE_FETCH_SIZE = 1000
+
+# 열 이름은 CSV 헤더를 그대로 사용 (SQLite에서 대소문자를 구분하지 않으므로 따옴표로 감쌈)
+_COLUMNS = ", ".join(f'"{name}"' for name in BOOK_INFO_HEADER)
+_PLACEHOLDERS = ", ".join("?" for _ in BOOK_INFO_HEADER)
+_ASSIGNMENTS = ", ".join(f'"{name}" = ?' for name in BOOK_INFO_HEADER)
+# IS_UPDATED 상태 비교식 (인덱스와 같은 식을 써야 인덱스를 사용함)
+_STATUS_EXPRESSION = 'upper(trim("IS_UPDATED"))'
+
+
+def to_store_value(value):
+    """
+    CSV에 쓰는 것과 같은 문자열로 변환합니다. (리스트는 str(), None은 빈 문자열)
+    """
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+class BookInfoStore:
+    """
+    book_info.csv와 같은 행을 SQLite 파일에 보관하는 스테이징 저장소
+    - ISBN_KEY와 IS_UPDATED 상태에 인덱스가 있어 한 건 조회와 상태별 조회가 전체를 읽지 않습니다.
+    - save()는 한 행을 하나의 트랜잭션으로 추가/갱신하므로 중단되어도 다른 행이 손상되지 않습니다.
+    - 행 순서(row_id)를 유지하므로 import_csv() → export_csv()는 같은 CSV를 만듭니다.
+    같은 ISBN_KEY가 여러 행에 있으면 첫 번째 행만 조회/갱신합니다. (BookInfoCsvWriter와 동일)
+    여러 스레드에서 하나의 인스턴스를 공유할 수 있습니다.
+    :param path: SQLite 파일 경로
+    :param on_save: 저장된 ISBN 키 리스트를 받아 호출할 함수
+    """
+
+    def __init__(self, path=BOOK_INFO_STORE_PATH, on_save=None):
+        self.path = path
+        self.on_save = on_save
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f'"{name}" TEXT NOT NULL DEFAULT \'\'' for name in BOOK_INFO_HEADER)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS book_info (row_id INTEGER PRIMARY KEY, {columns})"
+        )
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_book_info_isbn_key ON book_info ("ISBN_KEY")'
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_book_info_status ON book_info ({_STATUS_EXPRESSION})"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM book_info").fetchone()[0]
+
+    def get(self, isbn_key):
+        """
+        ISBN 키로 책 정보를 조회합니다.
+        :param isbn_key: ISBN 키
+        :return: 책 정보 딕셔너리 또는 None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                f'SELECT {_COLUMNS} FROM book_info WHERE "ISBN_KEY" = ? '
+                "ORDER BY row_id LIMIT 1",
+                (isbn_key,),
+            ).fetchone()
+        return dict(zip(BOOK_INFO_HEADER, row)) if row else None
+
+    def save(self, book_info):
+        """
+        책 정보를 갱신하거나 추가합니다. (한 행 단위로 commit)
+        :param book_info: 책 정보 딕셔너리
+        """
+        if not book_info:
+            logging.error("저장할 책 정보가 없습니다.")
+            return
+
+        isbn_key = book_info["ISBN_KEY"]
+        values = [to_store_value(book_info.get(name)) for name in BOOK_INFO_HEADER]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(
+                    f"UPDATE book_info SET {_ASSIGNMENTS} WHERE row_id = "
+                    '(SELECT MIN(row_id) FROM book_info WHERE "ISBN_KEY" = ?)',
+                    values + [isbn_key],
+                )
+                if cursor.rowcount == 0:
+                    self.conn.execute(
+                        f"INSERT INTO book_info ({_COLUMNS}) VALUES ({_PLACEHOLDERS})",
+                        values,
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        logging.info("책 정보가 %s에 저장되었습니다.", self.path)
+        if self.on_save:
+            self.on_save([isbn_key])
+
+    def set_updated(self, isbn_key, updated=True):
+        """
+        한 행의 IS_UPDATED 값만 바꿉니다.
+        :param isbn_key: ISBN 키
+        :param updated: True면 "TRUE", False면 "FALSE"
+        :return: 행이 있었으면 True
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                'UPDATE book_info SET "IS_UPDATED" = ? WHERE row_id = '
+                '(SELECT MIN(row_id) FROM book_info WHERE "ISBN_KEY" = ?)',
+                ("TRUE" if updated else "FALSE", isbn_key),
+            )
+        return cursor.rowcount > 0
+
+    def isbn_keys_by_status(self, updated):
+        """
+        IS_UPDATED 상태로 ISBN 키 목록을 조회합니다. (상태 인덱스 사용)
+        :param updated: True면 IS_UPDATED가 TRUE인 행, False면 FALSE인 행
+        :return: ISBN 키 리스트 (행 순서)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                f'SELECT "ISBN_KEY" FROM book_info WHERE {_STATUS_EXPRESSION} = ? '
+                "ORDER BY row_id",
+                ("TRUE" if updated else "FALSE",),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def iter_rows(self, updated=None):
+        """
+        책 정보를 행 순서대로 반환하는 제너레이터
+        STORE_FETCH_SIZE행씩 나누어 읽으므로 전체를 메모리에 올리지 않고,
+        다른 스레드의 쓰기를 오래 막지 않습니다.
+        :param updated: None이면 모든 행, True/False면 해당 IS_UPDATED 상태의 행만
+        :return: 책 정보 딕셔너리
+        """
+        condition, params = "", []
+        if updated is not None:
+            condition = f" AND {_STATUS_EXPRESSION} = ?"
+            params = ["TRUE" if updated else "FALSE"]
+        last_row_id = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT row_id, {_COLUMNS} FROM book_info "
+                    f"WHERE row_id > ?{condition} ORDER BY row_id LIMIT ?",
+                    [last_row_id] + params + [STORE_FETCH_SIZE],
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(BOOK_INFO_HEADER, row[1:]))
+            last_row_id = rows[-1][0]
+
+    def import_csv(self, filename=BOOK_INFO_FILENAME):
+        """
+        CSV 파일의 내용으로 저장소 전체를 바꿉니다. (하나의 트랜잭션)
+        BOOK_INFO_HEADER에 없는 열은 무시합니다.
+        :param filename: CSV 파일 경로
+        :return: 가져온 행 수
+        """
+        with open(filename, mode="r", encoding="utf-8", newline="") as file:
+            reader = csv.DictReader(file)
+            unknown = set(reader.fieldnames or []) - set(BOOK_INFO_HEADER)
+            if unknown:
+                logging.warning("Ignoring unknown columns in %s: %s", filename, sorted(unknown))
+            rows = (
+                [to_store_value(book.get(name)) for name in BOOK_INFO_HEADER]
+                for book in reader
+            )
+            with self.lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self.conn.execute("DELETE FROM book_info")
+                    cursor = self.conn.executemany(
+                        f"INSERT INTO book_info ({_COLUMNS}) VALUES ({_PLACEHOLDERS})",
+                        rows,
+                    )
+                    self.conn.execute("COMMIT")
+                except BaseException:
+                    self.conn.execute("ROLLBACK")
+                    raise
+        logging.info("Imported %d rows from %s into %s.", cursor.rowcount, filename, self.path)
+        return cursor.rowcount
+
+    def export_csv(self, filename=BOOK_INFO_FILENAME):
+        """
+        저장소 전체를 CSV 파일로 내보냅니다.
+        임시 파일에 먼저 쓴 뒤 rename하므로, 쓰는 도중 중단되어도 기존 파일이 손상되지 않습니다.
+        :param filename: CSV 파일 경로
+        :return: 내보낸 행 수
+        """
+        count = 0
+        with atomic_write(
+            filename, encoding="utf-8", newline="", prefix=".book_info_", fsync=True
+        ) as file:
+            writer = csv.DictWriter(file, fieldnames=BOOK_INFO_HEADER)
+            writer.writeheader()
+            for book in self.iter_rows():
+                writer.writerow(book)
+                count += 1
+        logging.info("Exported %d rows from %s to %s.", count, self.path, filename)
+        return count
+
+    def close(self):
+        """
+        SQLite 연결 종료
+        """
+        self.conn.close()
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Copy book information between book_info.csv and the staging store."
+    )
+    parser.add_argument(
+        "command",
+        choices=("import", "export"),
+        help="import: CSV -> store (replaces the store), export: store -> CSV",
+    )
+    parser.add_argument(
+        "--csv", default=BOOK_INFO_FILENAME, help="CSV file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--store",
+        default=BOOK_INFO_STORE_PATH,
+        help="SQLite staging store (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    with BookInfoStore(args.store) as store:
+        if args.command == "import":
+            store.import_csv(args.csv)
+        else:
+            store.export_csv(args.csv)
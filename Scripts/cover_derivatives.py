@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 다운로드한 표지 이미지로 여러 크기의 WebP/JPEG 파생 이미지를 만드는 스크립트
+# ------------------------------------------------------------------------
+# Filename: cover_derivatives.py
+# Usage: python cover_derivatives.py [--workers N] [--widths 120,240,480] [--force]
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.3.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# v1.1.0 - Read covers from the content-addressed image store (2026-10-16)
+# v1.2.0 - Queue-based logging (2026-10-16)
+# v1.3.0 - Record metrics in the worker processes and merge them (2026-10-16)
+# ========================================================================
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+from atomic_file import atomic_write
+from image_store import ImageStore
+from pipeline_metrics import METRICS, init_worker_metrics, install_metrics, setup_logging
+
+# 환경 변수 로드
+load_dotenv()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "ERROR").upper()
+LOG_FILE_PATH = "../logs/cover_derivatives.log"
+setup_logging(LOG_FILE_PATH, LOG_LEVEL)
+
+# 파생 이미지 저장 디렉토리 및 manifest 파일
+COVER_SAVE_DIR = "../data/covers"
+COVER_MANIFEST_FILENAME = os.path.join(COVER_SAVE_DIR, "manifest.json")
+# 웹에서 파생 이미지를 제공하는 URL 경로 (srcset 생성에 사용)
+COVER_URL_PREFIX = os.getenv("COVER_URL_PREFIX", "/media/covers/")
+# 생성할 가로 크기(px) 목록
+COVER_WIDTHS = [int(w) for w in os.getenv("COVER_WIDTHS", "120,240,480").split(",")]
+# 생성할 포맷별 확장자와 저장 옵션
+COVER_FORMATS = {
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def save_image_atomic(img, file_path, image_format, options):
+    """
+    이미지를 임시 파일에 저장한 뒤 rename합니다.
+    :param img: PIL Image
+    :param file_path: 저장할 파일 경로
+    :param image_format: PIL 저장 포맷 이름
+    :param options: PIL 저장 옵션
+    """
+    with atomic_write(file_path, mode="wb") as file:
+        img.save(file, format=image_format, **options)
+
+
+def build_derivatives(source_hash, source_path, widths):
+    """
+    원본 표지 하나로 설정된 크기와 포맷의 파생 이미지를 생성합니다. (프로세스 풀에서 실행)
+    파일 이름은 원본 해시로 정하므로 같은 표지를 쓰는 ISBN끼리 파생 이미지를 공유합니다.
+    원본보다 큰 크기로는 확대하지 않습니다.
+    :param source_hash: 원본 이미지의 SHA-256 해시
+    :param source_path: 원본 이미지 경로
+    :param widths: 생성할 가로 크기 목록
+    :return: (manifest 항목 또는 None, 실패 사유 또는 None, 작업자 메트릭 스냅샷)
+    """
+    entry, error = None, None
+    try:
+        with METRICS.timer("cover_derivative"):
+            entry = build_derivative_entry(source_hash, source_path, widths)
+        METRICS.inc("cover_derivatives_total", result="built")
+        METRICS.inc("cover_derivative_files_total", len(entry["variants"]))
+    except (OSError, ValueError) as e:
+        # 예외로 끝나면 스냅샷을 돌려줄 수 없으므로 실패 사유를 결과로 반환
+        METRICS.inc("cover_derivatives_total", result="failed")
+        error = str(e)
+    return entry, error, METRICS.take_snapshot()
+
+
+def build_derivative_entry(source_hash, source_path, widths):
+    """
+    build_derivatives의 실제 변환 작업
+    :return: manifest 항목
+    """
+    os.makedirs(os.path.join(COVER_SAVE_DIR, source_hash[:2]), exist_ok=True)
+    with Image.open(source_path) as img:
+        source_width, source_height = img.size
+        # JPEG은 필요한 최대 크기 이상으로만 축소 디코딩하여 디코딩 비용을 줄임
+        img.draft("RGB", (max(widths), max(widths) * source_height // source_width))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        # EXIF 방향 정보로 회전된 경우 원본 크기의 가로/세로도 바꿈
+        if (img.width > img.height) != (source_width > source_height):
+            source_width, source_height = source_height, source_width
+
+        target_widths = sorted({min(w, source_width) for w in widths})
+        variants = []
+        for width in target_widths:
+            height = max(1, round(source_height * width / source_width))
+            resized = (
+                img
+                if (width, height) == img.size
+                else img.resize((width, height), Image.Resampling.LANCZOS)
+            )
+            for image_format, (extension, options) in COVER_FORMATS.items():
+                filename = f"{source_hash[:2]}/{source_hash}_{width}w.{extension}"
+                save_image_atomic(
+                    resized, os.path.join(COVER_SAVE_DIR, filename), image_format, options
+                )
+                variants.append(
+                    {
+                        "format": image_format,
+                        "width": width,
+                        "height": height,
+                        "file": filename,
+                    }
+                )
+
+    return {
+        "source_sha256": source_hash,
+        "width": source_width,
+        "height": source_height,
+        "variants": variants,
+        "srcset": {
+            image_format: ", ".join(
+                f"{COVER_URL_PREFIX}{v['file']} {v['width']}w"
+                for v in variants
+                if v["format"] == image_format
+            )
+            for image_format in COVER_FORMATS
+        },
+    }
+
+
+def load_manifest(filename):
+    """
+    파생 이미지 manifest 파일을 읽어 딕셔너리로 반환합니다.
+    :param filename: manifest 파일 경로
+    :return: {ISBN_KEY: manifest 항목} 딕셔너리
+    """
+    try:
+        with open(filename, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error("Invalid manifest %s, rebuilding all covers: %s", filename, e)
+        return {}
+
+
+def save_manifest(filename, manifest):
+    """
+    manifest를 임시 파일에 쓴 뒤 rename하여 저장합니다.
+    :param filename: manifest 파일 경로
+    :param manifest: manifest 딕셔너리
+    """
+    with atomic_write(filename, encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def is_up_to_date(entry, source_hash, widths):
+    """
+    manifest 항목이 현재 원본과 설정으로 만들어졌고 파일이 모두 남아 있는지 확인합니다.
+    """
+    if not entry or entry.get("source_sha256") != source_hash:
+        return False
+    built_widths = {v["width"] for v in entry["variants"]}
+    if built_widths != {min(w, entry["width"]) for w in widths}:
+        return False
+    return all(
+        os.path.exists(os.path.join(COVER_SAVE_DIR, v["file"])) for v in entry["variants"]
+    )
+
+
+def main(workers, widths, force=False):
+    """
+    메인 함수: 새로 받았거나 바뀐 표지만 골라 프로세스 풀에서 파생 이미지를 생성합니다.
+    :param workers: 프로세스 수
+    :param widths: 생성할 가로 크기 목록
+    :param force: True이면 모든 표지를 다시 생성
+    """
+    os.makedirs(COVER_SAVE_DIR, exist_ok=True)
+    manifest = load_manifest(COVER_MANIFEST_FILENAME)
+    with ImageStore() as image_store:
+        # 저장소 인덱스에 내용 해시가 있으므로 원본을 다시 읽지 않고 변경 여부를 판단
+        sources = image_store.iter_covers()
+    started_at = time.monotonic()
+
+    # 같은 원본을 쓰는 ISBN은 한 번만 처리: {원본 해시: (원본 경로, [ISBN 키, ...])}
+    jobs = {}
+    for isbn_key, source_hash, source_path in sources:
+        if not force and is_up_to_date(manifest.get(isbn_key), source_hash, widths):
+            continue
+        jobs.setdefault(source_hash, (source_path, []))[1].append(isbn_key)
+    logging.info(
+        "%d of %d covers need derivatives (%d unique images, widths: %s).",
+        sum(len(isbn_keys) for _, isbn_keys in jobs.values()),
+        len(sources),
+        len(jobs),
+        widths,
+    )
+
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker_metrics
+    ) as executor:
+        futures = {
+            executor.submit(build_derivatives, source_hash, path, widths): source_hash
+            for source_hash, (path, _) in jobs.items()
+        }
+        try:
+            for future in as_completed(futures):
+                source_hash = futures[future]
+                entry, error, snapshot = future.result()
+                METRICS.merge(snapshot)
+                if entry is None:
+                    failed += 1
+                    logging.error(
+                        "Failed to build derivatives for image %s: %s", source_hash, error
+                    )
+                    continue
+                for isbn_key in jobs[source_hash][1]:
+                    manifest[isbn_key] = entry
+        finally:
+            save_manifest(COVER_MANIFEST_FILENAME, manifest)
+
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    logging.info(
+        "Built derivatives for %d images (%d failed) in %.1fs (%.1f images/s, %d workers).",
+        len(jobs) - failed,
+        failed,
+        elapsed,
+        len(jobs) / elapsed,
+        workers,
+    )
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Build resized WebP/JPEG cover derivatives and a srcset manifest."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--widths",
+        type=lambda value: [int(w) for w in value.split(",")],
+        default=COVER_WIDTHS,
+        help="comma-separated target widths in px (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild every cover even if the source is unchanged",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    install_metrics("cover_derivatives")
+    main(args.workers, args.widths, args.force)
+    logging.info("Script finished successfully.")
+    sys.exit(0)
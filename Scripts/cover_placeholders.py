@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 표지 이미지의 대표 색상, 팔레트, blurhash 플레이스홀더를 계산하는 스크립트
+# ------------------------------------------------------------------------
+# Filename: cover_placeholders.py
+# Usage: python cover_placeholders.py [--workers N] [--force] [--skip-db]
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.3.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# v1.1.0 - Queue-based logging (2026-10-16)
+# v1.2.0 - Store dominant colour, blurhash and aspect ratio on the books rows (2026-10-16)
+# v1.3.0 - Record metrics in the worker processes and merge them (2026-10-16)
+# ========================================================================
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+from atomic_file import atomic_write
+from image_store import ImageStore
+from isbn_utils import to_isbn13
+from pipeline_metrics import METRICS, init_worker_metrics, install_metrics, setup_logging
+
+# 환경 변수 로드
+load_dotenv()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "ERROR").upper()
+LOG_FILE_PATH = "../logs/cover_placeholders.log"
+setup_logging(LOG_FILE_PATH, LOG_LEVEL)
+
+# DB 연결 설정 (books 행에 결과 저장, --skip-db이면 사용하지 않음)
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", "5432")),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+}
+
+# 결과 저장 파일 (다음 실행에서 바뀐 표지만 계산하기 위한 기록, 웹은 books 행의 값을 사용)
+COVER_SAVE_DIR = "../data/covers"
+PLACEHOLDER_FILENAME = os.path.join(COVER_SAVE_DIR, "placeholders.json")
+# books 행에 한 번의 UPDATE로 저장하는 결과 수
+DB_UPDATE_CHUNK = 10000
+# 색상 계산 전에 축소할 최대 크기(px)
+SAMPLE_SIZE = 64
+PALETTE_SIZE = 5
+# blurhash 성분 수 (가로 x 세로), 세로로 긴 표지에 맞춤
+BLURHASH_COMPONENTS = (3, 4)
+# 프로세스 하나에 넘길 이미지 수
+CHUNK_SIZE = 64
+
+BASE83_CHARS = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+)
+
+
+def encode_base83(value, length):
+    """
+    정수를 blurhash의 base83 문자열로 변환
+    """
+    return "".join(
+        BASE83_CHARS[(value // 83 ** (length - i - 1)) % 83] for i in range(length)
+    )
+
+
+def srgb_to_linear(pixels):
+    """
+    0~255 sRGB 값 배열을 0~1 선형 RGB 배열로 변환
+    """
+    v = pixels / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(value):
+    """
+    0~1 선형 RGB 값을 0~255 sRGB 정수로 변환
+    """
+    v = min(max(value, 0.0), 1.0)
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def compute_blurhash(pixels, components=BLURHASH_COMPONENTS):
+    """
+    축소된 이미지 배열로 blurhash 문자열을 계산 (코사인 기저와의 내적을 einsum으로 한 번에 계산)
+    :param pixels: (높이, 너비, 3) uint8 배열
+    :param components: (가로 성분 수, 세로 성분 수)
+    :return: blurhash 문자열
+    """
+    components_x, components_y = components
+    height, width, _ = pixels.shape
+    linear = srgb_to_linear(pixels.astype(np.float64))
+
+    basis_x = np.cos(np.pi * np.outer(np.arange(components_x), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(components_y), np.arange(height)) / height)
+    # factors[j, i, c] = Σ basis_y[j, y] * basis_x[i, x] * linear[y, x, c]
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, linear) / (width * height)
+    factors[1:, :, :] *= 2
+    factors[0, 1:, :] *= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+    result = encode_base83((components_x - 1) + (components_y - 1) * 9, 1)
+    if len(ac):
+        actual_max = float(np.abs(ac).max())
+        quantised_max = int(max(0, min(82, int(actual_max * 166 - 0.5))))
+        maximum_value = (quantised_max + 1) / 166
+        result += encode_base83(quantised_max, 1)
+    else:
+        maximum_value = 1.0
+        result += encode_base83(0, 1)
+
+    result += encode_base83(
+        (linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]),
+        4,
+    )
+    scaled = ac / maximum_value
+    quantised = np.clip(
+        np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18
+    ).astype(int)
+    for r, g, b in quantised:
+        result += encode_base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def compute_palette(pixels, size=PALETTE_SIZE):
+    """
+    채널별 상위 4비트로 색을 양자화해 가장 많이 쓰인 색 묶음의 평균 색을 구함
+    :param pixels: (높이, 너비, 3) uint8 배열
+    :param size: 팔레트 색 수
+    :return: 많이 쓰인 순서의 "#rrggbb" 리스트 (첫 번째가 대표 색상)
+    """
+    flat = pixels.reshape(-1, 3).astype(np.int64)
+    bins = (flat[:, 0] >> 4) << 8 | (flat[:, 1] >> 4) << 4 | (flat[:, 2] >> 4)
+    counts = np.bincount(bins, minlength=4096)
+    sums = np.stack(
+        [np.bincount(bins, weights=flat[:, c], minlength=4096) for c in range(3)], axis=1
+    )
+    top_bins = np.argsort(counts)[::-1][:size]
+    top_bins = top_bins[counts[top_bins] > 0]
+    means = (sums[top_bins] / counts[top_bins, None]).round().astype(int)
+    return ["#%02x%02x%02x" % tuple(color) for color in means]
+
+
+def compute_placeholder(source_path):
+    """
+    표지 하나의 대표 색상, 팔레트, blurhash를 계산
+    :param source_path: 이미지 파일 경로
+    :return: 결과 딕셔너리
+    """
+    with Image.open(source_path) as img:
+        img.draft("RGB", (SAMPLE_SIZE, SAMPLE_SIZE))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BILINEAR)
+        pixels = np.asarray(img)
+
+    palette = compute_palette(pixels)
+    return {
+        "dominant_color": palette[0],
+        "palette": palette,
+        "blurhash": compute_blurhash(pixels),
+        "aspect_ratio": round(pixels.shape[1] / pixels.shape[0], 4),
+    }
+
+
+def compute_placeholder_chunk(jobs):
+    """
+    여러 표지의 플레이스홀더를 계산 (프로세스 풀에서 실행)
+    :param jobs: [(원본 해시, 파일 경로), ...]
+    :return: ([(원본 해시, 결과 딕셔너리 또는 None), ...], 작업자 메트릭 스냅샷)
+    """
+    results = []
+    for source_hash, source_path in jobs:
+        try:
+            with METRICS.timer("cover_placeholder"):
+                results.append((source_hash, compute_placeholder(source_path)))
+            METRICS.inc("cover_placeholders_total", result="computed")
+        except (OSError, ValueError) as e:
+            logging.error("Failed to compute placeholder for image %s: %s", source_hash, e)
+            METRICS.inc("cover_placeholders_total", result="failed")
+            results.append((source_hash, None))
+    return results, METRICS.take_snapshot()
+
+
+def load_placeholders(filename):
+    """
+    저장된 플레이스홀더 파일을 읽어 딕셔너리로 반환합니다.
+    :param filename: 파일 경로
+    :return: {ISBN_KEY: 결과 딕셔너리} 딕셔너리
+    """
+    try:
+        with open(filename, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error("Invalid placeholder file %s, rebuilding all: %s", filename, e)
+        return {}
+
+
+def save_placeholders(filename, placeholders):
+    """
+    플레이스홀더를 임시 파일에 쓴 뒤 rename하여 저장합니다.
+    :param filename: 파일 경로
+    :param placeholders: {ISBN_KEY: 결과 딕셔너리} 딕셔너리
+    """
+    with atomic_write(filename, encoding="utf-8") as file:
+        json.dump(placeholders, file, ensure_ascii=False, sort_keys=True)
+
+
+def store_placeholders_in_db(placeholders):
+    """
+    대표 색상, blurhash, 가로세로 비율을 ISBN-13이 같은 books 행에 저장합니다.
+    값이 같은 행은 쓰지 않으므로, 표지를 계산한 뒤에 추가된 도서도 다음 실행에서 채워집니다.
+    (Django 밖에서 쓰므로 도서 상세 화면 캐시는 만료된 뒤에 반영됨)
+    :param placeholders: {ISBN_KEY: 결과 딕셔너리} 딕셔너리
+    :return: 바뀐 books 행 수
+    """
+    # --skip-db로 실행할 때는 DB 드라이버가 필요 없으므로 여기서 import
+    import psycopg2  # pylint: disable=import-outside-toplevel
+
+    rows = {}
+    for isbn_key, entry in placeholders.items():
+        isbn13 = to_isbn13(isbn_key)
+        if isbn13:
+            rows[isbn13] = (entry["dominant_color"], entry["blurhash"], entry["aspect_ratio"])
+    items = sorted(rows.items())
+    updated = 0
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            for i in range(0, len(items), DB_UPDATE_CHUNK):
+                chunk = items[i : i + DB_UPDATE_CHUNK]
+                cursor.execute(
+                    """
+                    UPDATE books b SET
+                        cover_dominant_color = p.dominant_color,
+                        cover_blurhash = p.blurhash,
+                        cover_aspect_ratio = p.aspect_ratio
+                    FROM unnest(%s::varchar[], %s::char(7)[], %s::varchar[], %s::real[])
+                        AS p(isbn13, dominant_color, blurhash, aspect_ratio)
+                    WHERE b.isbn13 = p.isbn13
+                      AND (b.cover_dominant_color, b.cover_blurhash, b.cover_aspect_ratio)
+                          IS DISTINCT FROM (p.dominant_color, p.blurhash, p.aspect_ratio)
+                    """,
+                    (
+                        [isbn13 for isbn13, _ in chunk],
+                        [values[0] for _, values in chunk],
+                        [values[1] for _, values in chunk],
+                        [values[2] for _, values in chunk],
+                    ),
+                )
+                updated += cursor.rowcount
+                conn.commit()
+    finally:
+        conn.close()
+    return updated
+
+
+def main(workers, force=False, update_db=True):
+    """
+    메인 함수: 새로 받았거나 바뀐 표지만 골라 프로세스 풀에서 플레이스홀더를 계산합니다.
+    :param workers: 프로세스 수
+    :param force: True이면 모든 표지를 다시 계산
+    :param update_db: True이면 결과를 books 행에도 저장
+    """
+    os.makedirs(COVER_SAVE_DIR, exist_ok=True)
+    placeholders = load_placeholders(PLACEHOLDER_FILENAME)
+    with ImageStore() as image_store:
+        sources = image_store.iter_covers()
+    started_at = time.monotonic()
+
+    # 이미 계산한 원본 해시의 결과는 다른 ISBN에도 그대로 사용
+    known = {
+        entry["source_sha256"]: entry for entry in placeholders.values()
+    }
+    pending = {}
+    for isbn_key, source_hash, source_path in sources:
+        entry = placeholders.get(isbn_key)
+        if not force and entry and entry["source_sha256"] == source_hash:
+            continue
+        if not force and source_hash in known:
+            placeholders[isbn_key] = known[source_hash]
+            continue
+        pending.setdefault(source_hash, (source_path, []))[1].append(isbn_key)
+    logging.info("%d unique covers need placeholders.", len(pending))
+
+    jobs = [(source_hash, path) for source_hash, (path, _) in pending.items()]
+    chunks = [jobs[i : i + CHUNK_SIZE] for i in range(0, len(jobs), CHUNK_SIZE)]
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker_metrics
+    ) as executor:
+        try:
+            for results, snapshot in executor.map(compute_placeholder_chunk, chunks):
+                METRICS.merge(snapshot)
+                for source_hash, result in results:
+                    if result is None:
+                        failed += 1
+                        continue
+                    result["source_sha256"] = source_hash
+                    for isbn_key in pending[source_hash][1]:
+                        placeholders[isbn_key] = result
+        finally:
+            save_placeholders(PLACEHOLDER_FILENAME, placeholders)
+
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    logging.info(
+        "Computed placeholders for %d images (%d failed) in %.1fs (%.1f images/s, %d workers).",
+        len(jobs) - failed,
+        failed,
+        elapsed,
+        len(jobs) / elapsed,
+        workers,
+    )
+    if update_db:
+        with METRICS.timer("cover_placeholders_db_update"):
+            updated = store_placeholders_in_db(placeholders)
+        METRICS.inc("cover_placeholders_db_rows_total", updated)
+        logging.info("Updated placeholders of %d books.", updated)
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Compute dominant colour, palette and blurhash placeholders for covers."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="recompute every cover even if the source is unchanged",
+    )
+    parser.add_argument(
+        "--skip-db",
+        action="store_true",
+        help="only write placeholders.json, do not update the books rows",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    install_metrics("cover_placeholders")
+    main(args.workers, args.force, not args.skip_db)
+    logging.info("Script finished successfully.")
+    sys.exit(0)
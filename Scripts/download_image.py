@@ -3,69 +3,52 @@
 # CSV 파일에서 THUMBNAIL_URL읽어서 이미지를 다운로드 받아, 별도로 저장하는 스크립트
 # ------------------------------------------------------------------------
 # Filename: download_image.py
-# Usage: python download_image.py
+# Usage: python download_image.py [--workers N] [--store]
 # ------------------------------------------------------------------------
 # Author: KH.CHO
-# Version: 1.0.0
+# Version: 1.4.0
 # ------------------------------------------------------------------------
 # History:
 # v1.0.0 - Initial version (2024-06-05)
+# v1.1.0 - Parallel streaming downloads with conditional requests (2026-10-16)
+# v1.2.0 - Save images through the content-addressed image store (2026-10-16)
+# v1.3.0 - Shared book_info schema, added --store for the SQLite staging store (2026-10-16)
+# v1.4.0 - Shared metrics and queue-based logging (2026-10-16)
 # ========================================================================
+import argparse
 import csv
+import hashlib
+import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from atomic_file import atomic_write
+from book_info_store import BOOK_INFO_FILENAME, BOOK_INFO_HEADER, BookInfoStore
+from image_store import IMAGE_STORE_DIR, ImageStore
+from pipeline_metrics import METRICS, install_metrics, setup_logging
 
 # 환경 변수 로드
 load_dotenv()
 LOG_LEVEL = os.getenv("LOG_LEVEL", "ERROR").upper()
 LOG_FILE_PATH = "../logs/download_image.log"
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.ERROR),
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
-
-# CSV 파일 이름 및 구조
-BOOK_INFO_FILENAME = "../data/book_info.csv"
-BOOK_INFO_HEADER = [
-    "ISBN_KEY",
-    "IS_UPDATED",
-    "TITLE",
-    "SUBTITLE",
-    "ORIGINAL_TITLE",
-    "AUTHORS",
-    "TRANSLATORS",
-    "PUBLISHER",
-    "PUBLISHED_DATE",
-    "ISBN_10",
-    "ISBN_13",
-    "PAGES",
-    "EDITION",
-    "CATEGORY",
-    "TAGS",
-    "RATING",
-    "REVIEW_TEXT",
-    "HEX1",
-    "HEX2",
-    "HEX3",
-    "HEX4",
-    "HEX5",
-    "HEX6",
-    "THUMBNAIL_URL",
-    "DESCRIPTION",
-]
-# 이미지 저장 디렉토리
-IMAGE_SAVE_DIR = "../data/images"
-# 이미지 저장 디렉토리 생성
-if not os.path.exists(IMAGE_SAVE_DIR):
-    os.makedirs(IMAGE_SAVE_DIR)
+setup_logging(LOG_FILE_PATH, LOG_LEVEL)
+
+# 이미지별 ETag, Last-Modified, 크기를 기록하는 manifest 파일
+IMAGE_MANIFEST_FILENAME = os.path.join(IMAGE_STORE_DIR, "manifest.json")
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "8"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 다운로드 결과
+DOWNLOADED = "downloaded"
+NOT_MODIFIED = "not_modified"
+FAILED = "failed"
 
 
 # CSV 파일에서 책 정보 읽기
@@ -86,63 +69,223 @@ def read_book_info(filename):
         return []
 
 
-def download_image(thumbnail_url, isbn_key):
+def load_manifest(filename):
+    """
+    이미지 manifest 파일을 읽어 딕셔너리로 반환합니다.
+    :param filename: manifest 파일 경로
+    :return: {ISBN_KEY: {"url", "etag", "last_modified", "size"}} 딕셔너리
+    """
+    try:
+        with open(filename, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error("Invalid manifest %s, starting with an empty one: %s", filename, e)
+        return {}
+
+
+def save_manifest(filename, manifest):
+    """
+    이미지 manifest를 임시 파일에 쓴 뒤 rename하여 저장합니다.
+    :param filename: manifest 파일 경로
+    :param manifest: manifest 딕셔너리
+    """
+    with atomic_write(filename, encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def create_download_session(pool_size):
+    """
+    이미지 다운로드에 사용할 keep-alive 연결 풀 세션 생성
+    :param pool_size: 호스트별 연결 풀 크기
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def download_image(
+    thumbnail_url, isbn_key, image_store, session=None, manifest_entry=None
+):
     """
-    주어진 썸네일 URL에서 이미지를 다운로드하고, ISBN_KEY를 파일 이름으로 저장합니다.
+    주어진 썸네일 URL에서 이미지를 다운로드하고, ISBN_KEY로 이미지 저장소에 저장합니다.
+    이전에 받은 이미지가 있으면 ETag/Last-Modified로 조건부 요청을 보내고,
+    304 응답이면 아무것도 하지 않습니다. 본문은 해시를 계산하면서 임시 파일로 스트리밍합니다.
     :param thumbnail_url: 이미지 URL
     :param isbn_key: ISBN 키
+    :param image_store: 이미지를 저장할 ImageStore
+    :param session: 재사용할 requests.Session
+    :param manifest_entry: 이전 다운로드의 manifest 항목
+    :return: (결과, 새 manifest 항목 또는 None, 받은 바이트 수) 튜플
     """
+    requester = session or requests
+    headers = {}
+    # 같은 URL에서 받은 이미지가 저장소에 남아 있을 때만 조건부 요청
+    if (
+        manifest_entry
+        and manifest_entry.get("url") == thumbnail_url
+        and image_store.path_for(isbn_key)
+    ):
+        if manifest_entry.get("etag"):
+            headers["If-None-Match"] = manifest_entry["etag"]
+        if manifest_entry.get("last_modified"):
+            headers["If-Modified-Since"] = manifest_entry["last_modified"]
 
+    with METRICS.timer("image_download"):
+        result, entry, size = _download_image(
+            thumbnail_url, isbn_key, image_store, requester, headers, manifest_entry
+        )
+    METRICS.inc("image_downloads_total", result=result)
+    METRICS.inc("image_download_bytes_total", size)
+    return result, entry, size
+
+
+def _download_image(thumbnail_url, isbn_key, image_store, requester, headers, manifest_entry):
+    """
+    download_image()의 실제 요청과 저장 (인자와 반환값은 download_image()와 같음)
+    """
+    temp_path = None
     try:
-        # 이미지 파일이 있으면 다운로드하지 않음
-        file_path = os.path.join(IMAGE_SAVE_DIR, f"{isbn_key}.jpg")
-        if os.path.exists(file_path):
-            logging.info(
-                "Image for ISBN %s already exists at %s. Skipping download.",
-                isbn_key,
-                file_path,
+        with requester.get(
+            thumbnail_url, headers=headers, stream=True, timeout=10
+        ) as response:
+            if response.status_code == 304:
+                logging.info("Image for ISBN %s is not modified.", isbn_key)
+                return NOT_MODIFIED, manifest_entry, 0
+            response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
+
+            size = 0
+            digest = hashlib.sha256()
+            with image_store.temp_file(prefix=f"{isbn_key}_") as file:
+                temp_path = file.name
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            sha256 = image_store.put_file(isbn_key, temp_path, digest.hexdigest())
+            temp_path = None
+
+            logging.info("Downloaded image for ISBN %s (sha256 %s).", isbn_key, sha256)
+            return (
+                DOWNLOADED,
+                {
+                    "url": thumbnail_url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "size": size,
+                },
+                size,
             )
-            return None
-
-        response = requests.get(thumbnail_url, timeout=10)
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-        file_path = os.path.join(IMAGE_SAVE_DIR, f"{isbn_key}.jpg")
-        with open(file_path, "wb") as file:
-            file.write(response.content)
-        logging.info("Downloaded image for ISBN %s to %s.", isbn_key, file_path)
     except requests.RequestException as e:
         logging.error("Failed to download image for ISBN %s: %s", isbn_key, e)
-        return None
     except OSError as e:
         logging.error("File operation error for ISBN %s: %s", isbn_key, e)
-        return None
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return FAILED, None, 0
 
 
-def main():
+def main(workers=DOWNLOAD_WORKERS, use_store=False):
     """
-    메인 함수: CSV 파일에서 책 정보를 읽고, 썸네일 URL에서 이미지를 다운로드합니다.
+    메인 함수: CSV 파일에서 책 정보를 읽고, 썸네일 URL에서 이미지를 동시에 다운로드합니다.
+    :param workers: 동시 다운로드 수
+    :param use_store: True면 CSV 대신 SQLite 스테이징 저장소에서 읽음
     """
-    book_info_list = read_book_info(BOOK_INFO_FILENAME)
+    if use_store:
+        with BookInfoStore() as store:
+            book_info_list = list(store.iter_rows())
+    else:
+        book_info_list = read_book_info(BOOK_INFO_FILENAME)
     if not book_info_list:
         logging.warning("No book information found in %s.", BOOK_INFO_FILENAME)
         return
 
-    for book in book_info_list:
-        isbn_key = book.get("ISBN_KEY")
-        thumbnail_url = book.get("THUMBNAIL_URL")
-        logging.debug(
-            "Processing book: ISBN_KEY=%s, THUMBNAIL_URL=%s",
-            isbn_key,
-            thumbnail_url,
-        )
-        if isbn_key and thumbnail_url:
-            download_image(thumbnail_url, isbn_key)
-        else:
-            logging.warning("Missing ISBN_KEY or THUMBNAIL_URL for book: %s", book)
-    logging.info("Image download process completed.")
+    manifest = load_manifest(IMAGE_MANIFEST_FILENAME)
+    counts = {DOWNLOADED: 0, NOT_MODIFIED: 0, FAILED: 0}
+    total_bytes = 0
+    started_at = time.monotonic()
+
+    with ImageStore() as image_store, create_download_session(
+        workers
+    ) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for book in book_info_list:
+            isbn_key = book.get("ISBN_KEY")
+            thumbnail_url = book.get("THUMBNAIL_URL")
+            logging.debug(
+                "Processing book: ISBN_KEY=%s, THUMBNAIL_URL=%s",
+                isbn_key,
+                thumbnail_url,
+            )
+            if isbn_key and thumbnail_url:
+                future = executor.submit(
+                    download_image,
+                    thumbnail_url,
+                    isbn_key,
+                    image_store,
+                    session,
+                    manifest.get(isbn_key),
+                )
+                futures[future] = isbn_key
+            else:
+                logging.warning("Missing ISBN_KEY or THUMBNAIL_URL for book: %s", book)
+
+        try:
+            for future in as_completed(futures):
+                result, entry, size = future.result()
+                counts[result] += 1
+                total_bytes += size
+                if entry:
+                    manifest[futures[future]] = entry
+        finally:
+            save_manifest(IMAGE_MANIFEST_FILENAME, manifest)
+
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    logging.info(
+        "Image download process completed: %d downloaded, %d not modified, %d failed.",
+        counts[DOWNLOADED],
+        counts[NOT_MODIFIED],
+        counts[FAILED],
+    )
+    logging.info(
+        "Throughput: %.1f files/s, %.2f MB/s (%.2f MB in %.1fs with %d workers).",
+        sum(counts.values()) / elapsed,
+        total_bytes / elapsed / 1024 / 1024,
+        total_bytes / 1024 / 1024,
+        elapsed,
+        workers,
+    )
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Download cover images listed in the book information CSV file."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help="number of concurrent downloads (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="read the SQLite staging store instead of book_info.csv",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    install_metrics("download_image")
+    main(args.workers, args.store)
     logging.info("Script finished successfully.")
     sys.exit(0)
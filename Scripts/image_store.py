@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 표지 이미지를 내용 해시(SHA-256)로 저장하는 content-addressed 이미지 저장소
+# ------------------------------------------------------------------------
+# Filename: image_store.py
+# Usage: python image_store.py migrate [--source DIR] [--remove-source]
+#        python image_store.py gc
+#        python image_store.py stats
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# 저장소 루트 디렉토리
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "../data/image_store")
+# 이전 버전의 download_image.py가 {ISBN_KEY}.jpg로 저장하던 디렉토리
+LEGACY_IMAGE_DIR = "../data/images"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path):
+    """
+    파일 내용의 SHA-256 해시를 계산합니다.
+    :param file_path: 파일 경로
+    :return: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """
+    이미지를 내용 해시로 이름 붙여 2단계 하위 디렉토리(ab/cd/abcd....jpg)에 저장하고,
+    ISBN → 해시 인덱스를 SQLite로 관리하는 저장소
+    내용이 같은 이미지는 ISBN이 달라도 한 번만 저장됩니다.
+    여러 스레드에서 하나의 인스턴스를 공유할 수 있습니다.
+    :param root: 저장소 루트 디렉토리
+    """
+
+    def __init__(self, root=IMAGE_STORE_DIR):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(root, "index.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS covers (
+                isbn_key TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_covers_sha256 ON covers (sha256)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def blob_path(self, sha256):
+        """
+        해시에 해당하는 이미지 파일 경로
+        :param sha256: 이미지 내용의 SHA-256 해시
+        :return: 파일 경로
+        """
+        return os.path.join(self.blob_dir, sha256[:2], sha256[2:4], f"{sha256}.jpg")
+
+    def get_hash(self, isbn_key):
+        """
+        ISBN에 연결된 이미지 해시
+        :param isbn_key: ISBN 키
+        :return: SHA-256 해시 또는 None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM covers WHERE isbn_key = ?", (isbn_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def path_for(self, isbn_key):
+        """
+        ISBN에 연결된 이미지 파일 경로
+        :param isbn_key: ISBN 키
+        :return: 파일 경로 또는 None (이미지가 없는 경우)
+        """
+        sha256 = self.get_hash(isbn_key)
+        if sha256 and os.path.exists(self.blob_path(sha256)):
+            return self.blob_path(sha256)
+        return None
+
+    def temp_file(self, prefix=""):
+        """
+        저장소와 같은 파일 시스템에 임시 파일을 만듭니다. (put_file에서 rename 가능)
+        :param prefix: 임시 파일 이름 접두사
+        :return: 쓰기 모드로 열린 NamedTemporaryFile
+        """
+        return tempfile.NamedTemporaryFile(
+            dir=self.tmp_dir, prefix=prefix, suffix=".tmp", delete=False
+        )
+
+    def put_file(self, isbn_key, file_path, sha256=None, move=True):
+        """
+        이미지 파일을 저장소에 넣고 ISBN 인덱스를 갱신합니다.
+        같은 내용의 이미지가 이미 있으면 파일을 새로 저장하지 않습니다.
+        :param isbn_key: ISBN 키
+        :param file_path: 저장할 이미지 파일 경로
+        :param sha256: 미리 계산한 해시 (없으면 파일을 읽어 계산)
+        :param move: True이면 파일을 옮기고, False이면 복사
+        :return: 이미지 해시
+        """
+        sha256 = sha256 or file_sha256(file_path)
+        size = os.path.getsize(file_path)
+        target = self.blob_path(sha256)
+        if os.path.exists(target):
+            if move:
+                os.remove(file_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if move:
+                os.replace(file_path, target)
+            else:
+                with self.temp_file() as file:
+                    temp_path = file.name
+                shutil.copyfile(file_path, temp_path)
+                os.replace(temp_path, target)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO covers VALUES (?, ?, ?, ?)",
+                (isbn_key, sha256, size, time.time()),
+            )
+        return sha256
+
+    def iter_covers(self):
+        """
+        저장된 모든 표지를 ISBN 순서로 반환
+        :return: (ISBN 키, 해시, 파일 경로) 튜플의 리스트
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT isbn_key, sha256 FROM covers ORDER BY isbn_key"
+            ).fetchall()
+        return [(isbn_key, sha256, self.blob_path(sha256)) for isbn_key, sha256 in rows]
+
+    def stats(self):
+        """
+        저장소 통계
+        :return: (ISBN 수, 고유 이미지 수, 고유 이미지 전체 크기) 튜플
+        """
+        with self.lock:
+            covers, blobs, total_size = self.conn.execute(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM covers),
+                    COUNT(*),
+                    COALESCE(SUM(size), 0)
+                FROM (SELECT sha256, MAX(size) AS size FROM covers GROUP BY sha256)
+                """
+            ).fetchone()
+        return covers, blobs, total_size
+
+    def gc(self):
+        """
+        어떤 ISBN에서도 참조하지 않는 이미지 파일과 남은 임시 파일을 삭제
+        :return: 삭제한 파일 수
+        """
+        with self.lock:
+            referenced = {
+                row[0] for row in self.conn.execute("SELECT DISTINCT sha256 FROM covers")
+            }
+        removed = 0
+        for directory, _, filenames in os.walk(self.blob_dir):
+            for filename in filenames:
+                if os.path.splitext(filename)[0] not in referenced:
+                    os.remove(os.path.join(directory, filename))
+                    removed += 1
+        for filename in os.listdir(self.tmp_dir):
+            os.remove(os.path.join(self.tmp_dir, filename))
+            removed += 1
+        return removed
+
+    def close(self):
+        """
+        인덱스 연결 종료
+        """
+        self.conn.close()
+
+
+def migrate_flat_directory(store, source_dir, remove_source=False):
+    """
+    {ISBN_KEY}.jpg 형태의 기존 디렉토리를 저장소로 옮깁니다.
+    :param store: ImageStore
+    :param source_dir: 기존 이미지 디렉토리
+    :param remove_source: True이면 옮긴 원본 파일을 삭제
+    :return: 옮긴 파일 수
+    """
+    migrated = 0
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith(".jpg") or name.startswith("."):
+            continue
+        isbn_key = os.path.splitext(name)[0]
+        store.put_file(isbn_key, os.path.join(source_dir, name), move=remove_source)
+        migrated += 1
+        if migrated % 1000 == 0:
+            logging.info("Migrated %d images...", migrated)
+
+    # download_image.py의 ETag/Last-Modified manifest도 함께 옮김
+    legacy_manifest = os.path.join(source_dir, "manifest.json")
+    if os.path.exists(legacy_manifest):
+        shutil.copyfile(legacy_manifest, os.path.join(store.root, "manifest.json"))
+        if remove_source:
+            os.remove(legacy_manifest)
+    return migrated
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(description="Content-addressed cover image store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser(
+        "migrate", help="import a flat {ISBN_KEY}.jpg directory into the store"
+    )
+    migrate.add_argument(
+        "--source",
+        default=LEGACY_IMAGE_DIR,
+        help="flat image directory (default: %(default)s)",
+    )
+    migrate.add_argument(
+        "--remove-source",
+        action="store_true",
+        help="move files instead of copying them",
+    )
+    subparsers.add_parser("gc", help="delete blobs no ISBN refers to")
+    subparsers.add_parser("stats", help="print store statistics")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    args = parse_args()
+    with ImageStore() as image_store:
+        if args.command == "migrate":
+            count = migrate_flat_directory(image_store, args.source, args.remove_source)
+            logging.info("Migrated %d images from %s.", count, args.source)
+        elif args.command == "gc":
+            logging.info("Removed %d unreferenced files.", image_store.gc())
+        covers, blobs, total_size = image_store.stats()
+        logging.info(
+            "Store %s: %d ISBNs, %d unique images (%.2f MB, %d deduplicated).",
+            image_store.root,
+            covers,
+            blobs,
+            total_size / 1024 / 1024,
+            covers - blobs,
+        )
+    sys.exit(0)
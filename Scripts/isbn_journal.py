@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# ISBN 처리 결과를 기록하는 append-only 저널 모듈
+# ------------------------------------------------------------------------
+# Filename: isbn_journal.py
+# Usage: from isbn_journal import IsbnJournal
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.1.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# v1.1.0 - Thread-safe writes, added loaded status for the ingest pipeline (2026-10-16)
+# ========================================================================
+
+import json
+import logging
+import os
+import threading
+import time
+
+ISBN_JOURNAL_PATH = os.getenv("ISBN_JOURNAL_PATH", "../data/isbn_journal.jsonl")
+
+# ISBN별 처리 상태
+STATUS_FETCHED = "fetched"  # API 응답을 받음 (아직 CSV에 저장되지 않음)
+STATUS_CONVERTED = "converted"  # 변환 후 CSV에 저장 완료
+STATUS_FAILED_RETRYABLE = "failed-retryable"  # 네트워크/HTTP 오류 등, 다시 시도 가능
+STATUS_FAILED_PERMANENT = "failed-permanent"  # 검색 결과 없음 등, 다시 시도해도 실패
+STATUS_LOADED = "loaded"  # manage.py ingest로 DB에 반영 완료
+# --resume 시 건너뛸 상태
+FINISHED_STATUSES = {STATUS_CONVERTED, STATUS_FAILED_PERMANENT, STATUS_LOADED}
+
+
+class IsbnJournal:
+    """
+    ISBN별 처리 결과를 한 줄에 하나씩 JSON으로 덧붙여 기록하는 저널
+    기록할 때마다 flush하므로 프로세스가 중단되어도 그때까지의 결과가 남습니다.
+    여러 스레드에서 하나의 인스턴스를 공유할 수 있습니다.
+    :param path: 저널 파일 경로
+    """
+
+    def __init__(self, path=ISBN_JOURNAL_PATH):
+        self.path = path
+        self.file = open(path, mode="a", encoding="utf-8")
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, isbn_key, status, detail=None):
+        """
+        ISBN 처리 결과 기록
+        :param isbn_key: ISBN 키
+        :param status: 처리 상태 (STATUS_* 상수)
+        :param detail: 실패 사유 등 추가 정보
+        """
+        entry = {"isbn_key": isbn_key, "status": status, "ts": time.time()}
+        if detail:
+            entry["detail"] = detail
+        with self.lock:
+            self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def record_many(self, isbn_keys, status):
+        """
+        여러 ISBN의 처리 결과를 한 번에 기록
+        :param isbn_keys: ISBN 키 리스트
+        :param status: 처리 상태 (STATUS_* 상수)
+        """
+        ts = time.time()
+        with self.lock:
+            self.file.writelines(
+                json.dumps({"isbn_key": isbn_key, "status": status, "ts": ts}) + "\n"
+                for isbn_key in isbn_keys
+            )
+            self.file.flush()
+
+    def close(self):
+        """
+        저널 파일을 디스크에 동기화하고 닫기
+        """
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+
+
+def load_journal_statuses(path=ISBN_JOURNAL_PATH):
+    """
+    저널을 처음부터 읽어 ISBN별 마지막 처리 상태를 반환
+    중단 시점에 잘려서 기록된 마지막 줄은 무시합니다.
+    :param path: 저널 파일 경로
+    :return: {ISBN 키: 상태} 딕셔너리
+    """
+    statuses = {}
+    if not os.path.exists(path):
+        return statuses
+    with open(path, mode="r", encoding="utf-8") as file:
+        for line_no, line in enumerate(file, start=1):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning("Skipping malformed journal line %d in %s.", line_no, path)
+                continue
+            statuses[entry["isbn_key"]] = entry["status"]
+    return statuses
+
+
+def filter_unfinished(isbn_key_list, statuses):
+    """
+    저널 기준으로 완료되었거나 영구 실패한 ISBN을 제외
+    :param isbn_key_list: ISBN 키 리스트
+    :param statuses: load_journal_statuses()의 반환값
+    :return: 다시 처리해야 할 ISBN 키 리스트
+    """
+    remaining = [
+        isbn_key
+        for isbn_key in isbn_key_list
+        if statuses.get(isbn_key) not in FINISHED_STATUSES
+    ]
+    logging.info(
+        "Resume: %d of %d ISBN_KEYs already finished, %d remaining.",
+        len(isbn_key_list) - len(remaining),
+        len(isbn_key_list),
+        len(remaining),
+    )
+    return remaining
@@ -3,72 +3,79 @@
 # ISBN 정보를 읽어서 Kakao API를 통해 책 정보를 가져오고 CSV로 저장하는 스크립트
 # ------------------------------------------------------------------------
 # Filename: kakao_isbn_processor_to_csv.py
-# Usage: python kakao_isbn_processor_to_csv.py
+# Usage: python kakao_isbn_processor_to_csv.py [--workers N] [--rate R]
+#            [--flush-rows N] [--flush-interval SEC] [--no-cache] [--purge-cache]
+#            [--resume] [--store]
 # ------------------------------------------------------------------------
 # Author: KH.CHO
-# Version: 1.0.1
+# Version: 1.8.0
 # ------------------------------------------------------------------------
 # History:
 # v1.0.0 - Initial version (2024-06-04)
 # V1.0.1 - Refactored File I/O handling (2024-06-04)
+# v1.1.0 - Added concurrent, rate-limited fetch mode (2026-10-16)
+# v1.2.0 - Replaced per-ISBN CSV rewrite with a batched, atomic writer (2026-10-16)
+# v1.3.0 - Added persistent Kakao response cache (2026-10-16)
+# v1.4.0 - Added checkpoint journal and --resume mode (2026-10-16)
+# v1.5.0 - Normalize and deduplicate ISBN_KEYs before calling the API (2026-10-16)
+# v1.6.0 - Shared book_info schema, added --store for the SQLite staging store (2026-10-16)
+# v1.7.0 - KAKAO_BOOK_API_URL can be overridden to use the mock server (2026-10-16)
+# v1.8.0 - Shared metrics, queue-based logging, dropped DEBUG dump of responses (2026-10-16)
 # ========================================================================
 
+import argparse
 import csv
-import json
 import logging
 import os
+import random
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from atomic_file import atomic_write
+from book_info_store import BOOK_INFO_FILENAME, BOOK_INFO_HEADER, BookInfoStore
+from isbn_journal import (
+    STATUS_CONVERTED,
+    STATUS_FAILED_PERMANENT,
+    STATUS_FAILED_RETRYABLE,
+    STATUS_FETCHED,
+    IsbnJournal,
+    filter_unfinished,
+    load_journal_statuses,
+)
+from isbn_utils import normalize_isbn_keys, split_isbn_pair
+from kakao_response_cache import KakaoResponseCache
+from pipeline_metrics import METRICS, install_metrics, setup_logging
+
 # 환경 변수 로드
 load_dotenv()
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "ERROR").upper()
 LOG_FILE_PATH = "../logs/kakao_isbn_processor.log"
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.ERROR),
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
+setup_logging(LOG_FILE_PATH, LOG_LEVEL)
 
-KAKAO_BOOK_API_URL = "https://dapi.kakao.com/v3/search/book"
+# 벤치마크/오프라인 테스트에서는 mock_kakao_server.py의 주소로 바꿔서 사용
+KAKAO_BOOK_API_URL = os.getenv(
+    "KAKAO_BOOK_API_URL", "https://dapi.kakao.com/v3/search/book"
+)
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 
-# CSV 파일 이름 및 구조
-BOOK_INFO_FILENAME = "../data/book_info.csv"
-BOOK_INFO_HEADER = [
-    "ISBN_KEY",
-    "IS_UPDATED",
-    "TITLE",
-    "SUBTITLE",
-    "ORIGINAL_TITLE",
-    "AUTHORS",
-    "TRANSLATORS",
-    "PUBLISHER",
-    "PUBLISHED_DATE",
-    "ISBN_10",
-    "ISBN_13",
-    "PAGES",
-    "EDITION",
-    "CATEGORY",
-    "TAGS",
-    "RATING",
-    "REVIEW_TEXT",
-    "HEX1",
-    "HEX2",
-    "HEX3",
-    "HEX4",
-    "HEX5",
-    "HEX6",
-    "THUMBNAIL_URL",
-    "DESCRIPTION",
-]
+# 동시 요청 및 속도 제한 설정
+KAKAO_WORKERS = int(os.getenv("KAKAO_WORKERS", "1"))  # 동시 요청 스레드 수
+KAKAO_RATE_LIMIT = float(os.getenv("KAKAO_RATE_LIMIT", "8"))  # 초당 최대 요청 수
+KAKAO_MAX_RETRIES = int(os.getenv("KAKAO_MAX_RETRIES", "3"))
+KAKAO_BACKOFF_BASE = 0.5  # 재시도 대기 시간의 기준값 (초)
+KAKAO_BACKOFF_MAX = 30.0  # 재시도 대기 시간의 최댓값 (초)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# CSV 저장 주기 설정
+CSV_FLUSH_ROWS = int(os.getenv("CSV_FLUSH_ROWS", "100"))  # N건마다 저장
+CSV_FLUSH_INTERVAL = float(os.getenv("CSV_FLUSH_INTERVAL", "30"))  # T초마다 저장
 
 if not KAKAO_API_KEY:
     raise ValueError(
@@ -105,29 +112,8 @@ def json_to_book_dictionary(isbn_key, book_json):
 
     book = book_json["documents"][0]
 
-    raw_isbn_str = book.get("isbn", "").strip()  # ISBN 문자열에서 공백 제거
-    isbn10 = ""
-    isbn13 = ""
-
-    if raw_isbn_str:
-        parts = raw_isbn_str.split()  # 공백으로 분리
-        if len(parts) == 1:
-            part1 = parts[0].strip()
-            if len(part1) == 10 and part1.isdigit():
-                isbn10 = part1
-            elif len(part1) == 13 and part1.isdigit():
-                isbn13 = part1
-        elif len(parts) >= 2:
-            part1 = parts[0].strip()
-            part2 = parts[1].strip()
-            if len(part1) == 10 and part1.isdigit():
-                isbn10 = part1
-            elif len(part1) == 13 and part1.isdigit():
-                isbn13 = part1
-            if len(part2) == 10 and part2.isdigit():
-                isbn10 = part2
-            elif len(part2) == 13 and part2.isdigit():
-                isbn13 = part2
+    # ISBN 문자열("ISBN10 ISBN13")을 검증하고, 한쪽만 있으면 나머지를 계산해서 채움
+    isbn10, isbn13 = split_isbn_pair(book.get("isbn", ""))
 
     book_details = {
         "ISBN_KEY": isbn_key,
@@ -159,114 +145,435 @@ def json_to_book_dictionary(isbn_key, book_json):
     return book_details
 
 
-def get_book_info_from_kakao_api(isbn_key):
+class TokenBucket:
+    """
+    토큰 버킷 방식의 요청 속도 제한기 (여러 스레드에서 공유 가능)
+    :param rate: 초당 보충되는 토큰 수 (초당 최대 요청 수)
+    :param capacity: 버킷 크기 (순간적으로 허용되는 최대 요청 수)
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate!r}")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        토큰 하나를 얻을 때까지 대기
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_kakao_session(pool_size):
+    """
+    Kakao API 호출에 사용할 keep-alive 연결 풀 세션 생성
+    :param pool_size: 연결 풀 크기 (동시 요청 스레드 수)
+    :return: requests.Session
+    """
+    session = requests.Session()
+    session.headers.update({"Authorization": f"KakaoAK {KAKAO_API_KEY}"})
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_backoff_delay(attempt, retry_after=None):
+    """
+    재시도 대기 시간 계산 (지수 백오프 + full jitter)
+    :param attempt: 재시도 횟수 (0부터 시작)
+    :param retry_after: 서버가 보낸 Retry-After 헤더 값
+    :return: 대기 시간 (초)
+    """
+    delay = random.uniform(0, min(KAKAO_BACKOFF_MAX, KAKAO_BACKOFF_BASE * 2**attempt))
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+def get_book_info_from_kakao_api(
+    isbn_key, session=None, rate_limiter=None, cache=None
+):
     """
     ISBN 키를 사용하여 Kakao API에서 책 정보를 가져오고, JSON 데이터를 책 정보 딕셔너리로 변환
+    캐시에 유효한 응답이 있으면 API를 호출하지 않습니다.
+    429/5xx 응답과 타임아웃, 연결 오류는 jitter를 준 지수 백오프로 재시도합니다.
     :param isbn_key: ISBN 키
+    :param session: 재사용할 requests.Session (없으면 매번 새 연결 사용)
+    :param rate_limiter: 요청 전에 토큰을 얻을 TokenBucket
+    :param cache: 응답을 조회/저장할 KakaoResponseCache
     :return: 책 정보 딕셔너리 또는 None
     """
+    if cache:
+        data = cache.get(isbn_key)
+        METRICS.inc("kakao_cache_lookups_total", result="miss" if data is None else "hit")
+        if data is not None:
+            logging.debug("ISBN [%s] 캐시된 응답을 사용합니다.", isbn_key)
+            return data
+
+    requester = session or requests
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
     params = {"query": isbn_key, "target": "isbn"}
 
-    try:
-        response = requests.get(
-            KAKAO_BOOK_API_URL, headers=headers, params=params, timeout=10
-        )
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
+    for attempt in range(KAKAO_MAX_RETRIES + 1):
+        if rate_limiter:
+            with METRICS.timer("kakao_rate_limit_wait"):
+                rate_limiter.acquire()
+        try:
+            with METRICS.timer("kakao_request"):
+                response = requester.get(
+                    KAKAO_BOOK_API_URL, headers=headers, params=params, timeout=10
+                )
+            METRICS.inc("kakao_responses_total", status=response.status_code)
+            if (
+                response.status_code in RETRYABLE_STATUS_CODES
+                and attempt < KAKAO_MAX_RETRIES
+            ):
+                delay = get_backoff_delay(attempt, response.headers.get("Retry-After"))
+                logging.warning(
+                    "ISBN %s 처리 중 HTTP %s 응답, %.2f초 후 재시도합니다. (%d/%d)",
+                    isbn_key,
+                    response.status_code,
+                    delay,
+                    attempt + 1,
+                    KAKAO_MAX_RETRIES,
+                )
+                METRICS.inc("kakao_retries_total", reason=response.status_code)
+                time.sleep(delay)
+                continue
+            response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
+
+            data = response.json()  # 응답을 JSON 객체로 파싱
+            # 응답 전체를 직렬화하지 않고 요약만 기록 (DEBUG에서도 처리 루프를 느리게 하지 않음)
+            logging.debug(
+                "ISBN [%s] API 응답: documents %d건",
+                isbn_key,
+                len(data.get("documents") or []),
+            )
+
+            if cache:
+                cache.put(isbn_key, data)
+            return data  # 파싱된 JSON 객체 전체 반환
+
+        except requests.exceptions.Timeout:
+            METRICS.inc("kakao_request_errors_total", error="timeout")
+            logging.error("ISBN %s 처리 중 타임아웃 발생.", isbn_key)
+        except requests.exceptions.ConnectionError:
+            METRICS.inc("kakao_request_errors_total", error="connection")
+            logging.error("ISBN %s 처리 중 네트워크 연결 오류 발생.", isbn_key)
+        except requests.exceptions.HTTPError as http_err:
+            METRICS.inc("kakao_request_errors_total", error="http")
+            logging.error("ISBN %s 처리 중 HTTP 오류 발생: %s", isbn_key, http_err)
+            return None
+        except Exception as e:
+            METRICS.inc("kakao_request_errors_total", error="other")
+            logging.error("ISBN %s 처리 중 알 수 없는 오류 발생: %s", isbn_key, e)
+            return None
+
+        # 타임아웃과 연결 오류는 재시도
+        if attempt < KAKAO_MAX_RETRIES:
+            METRICS.inc("kakao_retries_total", reason="network")
+            time.sleep(get_backoff_delay(attempt))
 
-        data = response.json()  # 응답을 JSON 객체로 파싱
-        logging.debug("--- ISBN [%s] API 응답 전체 (JSON) ---", isbn_key)
-        # JSON 데이터를 예쁘게 포맷팅하여 출력 (들여쓰기 및 한글 인코딩 처리)
-        logging.debug(json.dumps(data, indent=4, ensure_ascii=False))
+    return None
 
-        return data  # 파싱된 JSON 객체 전체 반환
 
-    except requests.exceptions.Timeout:
-        logging.error("ISBN %s 처리 중 타임아웃 발생.", isbn_key)
-    except requests.exceptions.ConnectionError:
-        logging.error("ISBN %s 처리 중 네트워크 연결 오류 발생.", isbn_key)
-    except requests.exceptions.HTTPError as http_err:
-        logging.error("ISBN %s 처리 중 HTTP 오류 발생: %s", isbn_key, http_err)
-    except Exception as e:
-        logging.error("ISBN %s 처리 중 알 수 없는 오류 발생: %s", isbn_key, e)
+def fetch_book_info(isbn_key_list, workers=1, rate=KAKAO_RATE_LIMIT, cache=None):
+    """
+    ISBN 키 목록의 책 정보를 Kakao API에서 가져오는 제너레이터
+    workers가 2 이상이면 스레드 풀로 동시에 요청하지만, 결과는 항상 입력 순서대로 반환하므로
+    순차 처리와 동일한 결과를 얻습니다.
+    :param isbn_key_list: ISBN 키 리스트
+    :param workers: 동시 요청 스레드 수
+    :param rate: 초당 최대 요청 수
+    :param cache: 응답을 조회/저장할 KakaoResponseCache
+    :return: (ISBN 키, JSON 데이터 또는 None) 튜플
+    """
+    rate_limiter = TokenBucket(rate)
+    with create_kakao_session(workers) as session:
+        if workers <= 1:
+            for isbn_key in isbn_key_list:
+                logging.info("Processing ISBN_KEY: %s", isbn_key)
+                yield isbn_key, get_book_info_from_kakao_api(
+                    isbn_key, session, rate_limiter, cache
+                )
+            return
 
-    return None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda isbn_key: get_book_info_from_kakao_api(
+                    isbn_key, session, rate_limiter, cache
+                ),
+                isbn_key_list,
+            )
+            yield from zip(isbn_key_list, results)
 
 
 def write_csv_rows(filename, rows):
     """
     Helper function to write rows to a CSV file.
+    임시 파일에 먼저 쓴 뒤 rename하므로, 쓰는 도중 중단되어도 기존 파일이 손상되지 않습니다.
     :param filename: CSV 파일 경로
     :param rows: CSV에 저장할 데이터 리스트
     """
-    with open(filename, mode="w", encoding="utf-8", newline="") as file:
+    with atomic_write(
+        filename, encoding="utf-8", newline="", prefix=".book_info_", fsync=True
+    ) as file:
         writer = csv.DictWriter(file, fieldnames=BOOK_INFO_HEADER)
         writer.writeheader()
         writer.writerows(rows)
 
 
-def save_book_info_to_csv(book_info, filename):
+class BookInfoCsvWriter:
     """
-    책 정보를 CSV 파일에 저장
-    :param book_info: 책 정보 딕셔너리
+    책 정보를 CSV 파일에 모아서 저장하는 writer
+    CSV 전체를 한 번만 읽어 ISBN_KEY → 행 위치 인덱스를 메모리에 유지하고,
+    flush_rows건 또는 flush_interval초마다 한 번에 파일을 다시 씁니다.
     :param filename: CSV 파일 경로
+    :param flush_rows: 저장 전에 모아둘 최대 변경 건수
+    :param flush_interval: 저장 사이의 최대 시간 (초)
+    :param on_flush: 파일에 저장된 ISBN 키 리스트를 받아 호출할 함수
     """
-    if not book_info:
-        logging.error("저장할 책 정보가 없습니다.")
-        return
 
-    rows = []
-    if os.path.exists(filename):
-        with open(filename, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
+    def __init__(
+        self,
+        filename,
+        flush_rows=CSV_FLUSH_ROWS,
+        flush_interval=CSV_FLUSH_INTERVAL,
+        on_flush=None,
+    ):
+        self.filename = filename
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.rows = []
+        self.index = {}
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+        if os.path.exists(filename):
+            with open(filename, mode="r", encoding="utf-8") as file:
+                self.rows = list(csv.DictReader(file))
+        for i, row in enumerate(self.rows):
+            # 중복된 ISBN_KEY가 있으면 첫 번째 행만 갱신 (기존 동작과 동일)
+            self.index.setdefault(row["ISBN_KEY"], i)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def save(self, book_info):
+        """
+        책 정보를 갱신하거나 추가하고, 저장 주기가 되면 파일에 씁니다.
+        :param book_info: 책 정보 딕셔너리
+        """
+        if not book_info:
+            logging.error("저장할 책 정보가 없습니다.")
+            return
+
+        isbn_key = book_info["ISBN_KEY"]
+        if isbn_key in self.index:
+            self.rows[self.index[isbn_key]] = book_info
+            logging.info("책 정보가 %s에서 업데이트되었습니다.", self.filename)
+        else:
+            self.index[isbn_key] = len(self.rows)
+            self.rows.append(book_info)
+            logging.info("책 정보가 %s에 추가되었습니다.", self.filename)
+
+        self.pending.append(isbn_key)
+        if (
+            len(self.pending) >= self.flush_rows
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """
+        모아둔 변경 사항을 CSV 파일에 저장
+        """
+        if self.pending:
+            write_csv_rows(self.filename, self.rows)
+            logging.info(
+                "Flushed %d updated rows to %s.", len(self.pending), self.filename
+            )
+            if self.on_flush:
+                self.on_flush(self.pending)
+            self.pending = []
+        self.last_flush = time.monotonic()
+
+
+def create_book_info_writer(args, on_flush):
+    """
+    책 정보를 저장할 writer 생성
+    --store면 한 행씩 바로 commit하는 BookInfoStore를, 아니면 BookInfoCsvWriter를 사용합니다.
+    :param args: 명령행 인자
+    :param on_flush: 저장된 ISBN 키 리스트를 받아 호출할 함수
+    :return: save(book_info)를 가진 context manager
+    """
+    if args.store:
+        return BookInfoStore(on_save=on_flush)
+    return BookInfoCsvWriter(
+        BOOK_INFO_FILENAME, args.flush_rows, args.flush_interval, on_flush=on_flush
+    )
+
 
-    updated = False
-    for i, row in enumerate(rows):
-        if row["ISBN_KEY"] == book_info["ISBN_KEY"]:
-            rows[i] = book_info
-            updated = True
-            logging.info("책 정보가 %s에서 업데이트되었습니다.", filename)
-            break
+def positive_float(value):
+    """
+    0보다 큰 실수만 허용하는 argparse 인자 형식
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0: {value!r}")
+    return number
 
-    if not updated:
-        rows.append(book_info)
-        logging.info("책 정보가 %s에 추가되었습니다.", filename)
 
-    write_csv_rows(filename, rows)
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Fetch book information using Kakao API and save it to a CSV file."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=KAKAO_WORKERS,
+        help="number of concurrent API requests (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=positive_float,
+        default=KAKAO_RATE_LIMIT,
+        help="maximum API requests per second (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--flush-rows",
+        type=int,
+        default=CSV_FLUSH_ROWS,
+        help="write the CSV file after this many updated rows (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=CSV_FLUSH_INTERVAL,
+        help="write the CSV file at least every SEC seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="bypass the Kakao response cache and always call the API",
+    )
+    parser.add_argument(
+        "--purge-cache",
+        action="store_true",
+        help="delete all cached Kakao responses before processing",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip ISBN_KEYs the journal marks as converted or permanently failed",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="read and write the SQLite staging store instead of book_info.csv",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    install_metrics("isbn_processor_to_csv")
     logging.info("===============================")
     logging.info("DateTime: %s", time.strftime("%Y-%m-%d %H:%M:%S"))
     logging.info(
         "Starting the script to fetch book information using Kakao API and save it to a CSV file."
     )
+    logging.info("Workers: %d, Rate limit: %.1f req/s", args.workers, args.rate)
     logging.info("--------------------------------")
-    isbn_key_list = read_book_info_csv(BOOK_INFO_FILENAME)
+    kakao_cache = None if args.no_cache else KakaoResponseCache()
+    if args.purge_cache:
+        (kakao_cache or KakaoResponseCache()).purge()
+    if args.store:
+        with BookInfoStore() as store:
+            isbn_key_list = store.isbn_keys_by_status(updated=False)
+    else:
+        isbn_key_list = read_book_info_csv(BOOK_INFO_FILENAME)
+    if args.resume:
+        isbn_key_list = filter_unfinished(isbn_key_list, load_journal_statuses())
 
     if not isbn_key_list:
         logging.info("No ISBN_KEYs to process. Exiting the program.")
         sys.exit(0)
     else:
         logging.info("List of ISBN_KEYs to process: %s", isbn_key_list)
-        for isbn_key in isbn_key_list:
-            logging.info("Processing ISBN_KEY: %s", isbn_key)
-            book_info = get_book_info_from_kakao_api(isbn_key)
-            if book_info:
-                book_details = json_to_book_dictionary(isbn_key, book_info)
-                if book_details:
-                    save_book_info_to_csv(book_details, BOOK_INFO_FILENAME)
-                    logging.info(
-                        "Successfully processed and saved ISBN_KEY: %s", isbn_key
-                    )
-                else:
-                    logging.warning(
-                        "Failed to convert book information for ISBN_KEY: %s", isbn_key
-                    )
-            else:
-                logging.error(
-                    "Failed to fetch book information for ISBN_KEY: %s", isbn_key
-                )
+        # 요청 전에 ISBN을 정규화하고, 같은 책을 가리키는 키는 한 번만 요청
+        isbn_groups, invalid_keys = normalize_isbn_keys(isbn_key_list)
+        logging.info(
+            "Normalized %d ISBN_KEYs into %d unique ISBN-13s (%d invalid).",
+            len(isbn_key_list),
+            len(isbn_groups),
+            len(invalid_keys),
+        )
+        with IsbnJournal() as journal, create_book_info_writer(
+            args,
+            # CSV 파일(또는 저장소)에 실제로 저장된 뒤에만 완료로 기록
+            lambda keys: journal.record_many(keys, STATUS_CONVERTED),
+        ) as csv_writer:
+            for isbn_key in invalid_keys:
+                journal.record(isbn_key, STATUS_FAILED_PERMANENT, "invalid isbn")
+                logging.warning("Skipping invalid ISBN_KEY: %s", isbn_key)
+
+            for isbn13, book_info in fetch_book_info(
+                list(isbn_groups), args.workers, args.rate, kakao_cache
+            ):
+                for isbn_key in isbn_groups[isbn13]:
+                    if book_info:
+                        journal.record(isbn_key, STATUS_FETCHED)
+                        book_details = json_to_book_dictionary(isbn_key, book_info)
+                        if book_details:
+                            csv_writer.save(book_details)
+                            logging.info(
+                                "Successfully processed and saved ISBN_KEY: %s",
+                                isbn_key,
+                            )
+                        else:
+                            journal.record(
+                                isbn_key, STATUS_FAILED_PERMANENT, "no documents"
+                            )
+                            logging.warning(
+                                "Failed to convert book information for ISBN_KEY: %s",
+                                isbn_key,
+                            )
+                    else:
+                        journal.record(
+                            isbn_key, STATUS_FAILED_RETRYABLE, "fetch failed"
+                        )
+                        logging.error(
+                            "Failed to fetch book information for ISBN_KEY: %s",
+                            isbn_key,
+                        )
         logging.info("Finished processing all ISBN_KEYs.")
+        if kakao_cache:
+            kakao_cache.log_stats()
     logging.info("===============================")
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# ISBN 정규화/검증 유틸리티 모듈
+# ------------------------------------------------------------------------
+# Filename: isbn_utils.py
+# Usage: from isbn_utils import normalize_isbn_keys, to_isbn13, to_isbn10
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+
+# ISBN 문자열에서 제거할 구분 문자 (하이픈, 공백)
+ISBN_SEPARATORS = str.maketrans("", "", "-‐‑– \t")
+
+
+def clean_isbn(raw_isbn):
+    """
+    하이픈과 공백을 제거하고 대문자로 변환 (ISBN-10의 체크 문자 'x' 처리)
+    :param raw_isbn: 원본 ISBN 문자열
+    :return: 정리된 ISBN 문자열
+    """
+    return (raw_isbn or "").translate(ISBN_SEPARATORS).upper()
+
+
+def isbn10_check_digit(first9):
+    """
+    ISBN-10의 체크 문자 계산
+    :param first9: 앞 9자리 숫자 문자열
+    :return: 체크 문자 ('0'~'9' 또는 'X')
+    """
+    total = sum((10 - i) * int(digit) for i, digit in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def isbn13_check_digit(first12):
+    """
+    ISBN-13의 체크 숫자 계산
+    :param first12: 앞 12자리 숫자 문자열
+    :return: 체크 숫자 ('0'~'9')
+    """
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def to_isbn13(raw_isbn):
+    """
+    ISBN-10 또는 ISBN-13 문자열을 검증하고 표준 ISBN-13으로 변환
+    :param raw_isbn: 원본 ISBN 문자열
+    :return: ISBN-13 문자열 또는 None (형식이나 체크섬이 올바르지 않은 경우)
+    """
+    isbn = clean_isbn(raw_isbn)
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        if isbn10_check_digit(isbn[:9]) != isbn[9]:
+            return None
+        first12 = "978" + isbn[:9]
+        return first12 + isbn13_check_digit(first12)
+    if len(isbn) == 13 and isbn.isdigit() and isbn[:3] in ("978", "979"):
+        if isbn13_check_digit(isbn[:12]) != isbn[12]:
+            return None
+        return isbn
+    return None
+
+
+def to_isbn10(isbn13):
+    """
+    ISBN-13을 ISBN-10으로 변환 (978로 시작하는 경우에만 대응되는 ISBN-10이 존재)
+    :param isbn13: 검증된 ISBN-13 문자열
+    :return: ISBN-10 문자열 또는 빈 문자열
+    """
+    if not isbn13 or not isbn13.startswith("978"):
+        return ""
+    return isbn13[3:12] + isbn10_check_digit(isbn13[3:12])
+
+
+def normalize_isbn_keys(isbn_keys):
+    """
+    ISBN 키 목록 전체를 한 번에 정규화하고, 같은 책(ISBN-10/ISBN-13 표기 차이 포함)을 하나로 묶음
+    :param isbn_keys: 원본 ISBN 키 리스트
+    :return: ({ISBN-13: [원본 ISBN 키, ...]} 딕셔너리 (입력 순서 유지), 잘못된 ISBN 키 리스트)
+    """
+    isbn_groups = {}
+    invalid_keys = []
+    for isbn_key in isbn_keys:
+        isbn13 = to_isbn13(isbn_key)
+        if isbn13:
+            isbn_groups.setdefault(isbn13, []).append(isbn_key)
+        else:
+            invalid_keys.append(isbn_key)
+    return isbn_groups, invalid_keys
+
+
+def split_isbn_pair(raw_isbn_str):
+    """
+    Kakao API의 "isbn" 필드("ISBN10 ISBN13" 형식)에서 ISBN-10과 ISBN-13을 일관되게 추출
+    둘 중 하나만 있어도 나머지를 계산해서 채웁니다.
+    :param raw_isbn_str: 공백으로 구분된 ISBN 문자열
+    :return: (ISBN-10, ISBN-13) 튜플 (없으면 빈 문자열)
+    """
+    for part in (raw_isbn_str or "").split():
+        isbn13 = to_isbn13(part)
+        if isbn13:
+            return to_isbn10(isbn13), isbn13
+    return "", ""
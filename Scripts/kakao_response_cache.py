@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# Kakao API 응답을 ISBN 단위로 로컬 SQLite 파일에 저장하는 캐시 모듈
+# ------------------------------------------------------------------------
+# Filename: kakao_response_cache.py
+# Usage: from kakao_response_cache import KakaoResponseCache
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+KAKAO_CACHE_PATH = os.getenv("KAKAO_CACHE_PATH", "../data/kakao_cache.sqlite3")
+KAKAO_CACHE_TTL = float(os.getenv("KAKAO_CACHE_TTL", str(30 * 24 * 3600)))  # 30일
+# "documents"가 비어 있는 응답은 나중에 등록될 수 있으므로 짧게 유지
+KAKAO_CACHE_NEGATIVE_TTL = float(os.getenv("KAKAO_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+KAKAO_CACHE_MAX_ENTRIES = int(os.getenv("KAKAO_CACHE_MAX_ENTRIES", "500000"))
+
+
+class KakaoResponseCache:
+    """
+    ISBN 키로 Kakao API 응답(JSON)을 저장하는 캐시
+    - 항목마다 만료 시각(TTL)을 가지며, 만료된 항목은 조회되지 않습니다.
+    - 검색 결과가 없는 응답도 별도의 짧은 TTL로 저장합니다. (negative caching)
+    - 항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+    여러 스레드에서 하나의 인스턴스를 공유할 수 있습니다.
+    :param path: SQLite 파일 경로
+    :param ttl: 정상 응답의 유효 시간 (초)
+    :param negative_ttl: 검색 결과가 없는 응답의 유효 시간 (초)
+    :param max_entries: 저장할 최대 항목 수
+    """
+
+    def __init__(
+        self,
+        path=KAKAO_CACHE_PATH,
+        ttl=KAKAO_CACHE_TTL,
+        negative_ttl=KAKAO_CACHE_NEGATIVE_TTL,
+        max_entries=KAKAO_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                isbn_key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                is_negative INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self.size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get(self, isbn_key):
+        """
+        캐시된 응답을 반환
+        :param isbn_key: ISBN 키
+        :return: JSON 데이터 또는 None (없거나 만료된 경우)
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body FROM responses WHERE isbn_key = ? AND expires_at > ?",
+                (isbn_key, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE responses SET last_access = ? WHERE isbn_key = ?",
+                (now, isbn_key),
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, isbn_key, data):
+        """
+        응답을 캐시에 저장하고, 최대 항목 수를 넘으면 오래된 항목을 삭제
+        :param isbn_key: ISBN 키
+        :param data: Kakao API에서 반환된 JSON 데이터
+        """
+        is_negative = not data.get("documents")
+        now = time.time()
+        expires_at = now + (self.negative_ttl if is_negative else self.ttl)
+        body = json.dumps(data, ensure_ascii=False)
+        with self.lock:
+            exists = self.conn.execute(
+                "SELECT 1 FROM responses WHERE isbn_key = ?", (isbn_key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (isbn_key, body, int(is_negative), expires_at, now),
+            )
+            if not exists:
+                self.size += 1
+            if self.size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """
+        만료된 항목을 먼저 지우고, 그래도 부족하면 가장 오래 사용되지 않은 항목을 삭제
+        """
+        self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self.size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = self.size - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                """
+                DELETE FROM responses WHERE isbn_key IN (
+                    SELECT isbn_key FROM responses ORDER BY last_access LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            self.size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        logging.debug("Evicted cache entries, %d entries remain.", self.size)
+
+    def purge(self):
+        """
+        캐시의 모든 항목 삭제
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.execute("VACUUM")
+            self.size = 0
+        logging.info("Purged Kakao response cache at %s.", self.path)
+
+    def log_stats(self):
+        """
+        캐시 적중/미적중 횟수를 로그로 출력
+        """
+        lookups = self.hits + self.misses
+        hit_ratio = self.hits / lookups * 100 if lookups else 0.0
+        logging.info(
+            "Kakao cache: %d hits, %d misses (%.1f%% hit ratio), %d entries.",
+            self.hits,
+            self.misses,
+            hit_ratio,
+            self.size,
+        )
+
+    def close(self):
+        """
+        SQLite 연결 종료
+        """
+        self.conn.close()
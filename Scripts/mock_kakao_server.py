@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# Kakao 책 검색 API와 표지 이미지 서버를 흉내 내는 로컬 HTTP 서버
+# 벤치마크와 오프라인 테스트에서 KAKAO_BOOK_API_URL 대신 사용합니다.
+# ------------------------------------------------------------------------
+# Filename: mock_kakao_server.py
+# Usage: from mock_kakao_server import MockKakaoServer
+#        python mock_kakao_server.py [--port 8900] [--latency SEC] [--jitter SEC]
+#                                    [--error-rate R] [--throttle-rate R]
+#                                    [--not-found-rate R]
+#        KAKAO_BOOK_API_URL=http://127.0.0.1:8900/v3/search/book \
+#            python isbn_processor_to_csv.py
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.0.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# ========================================================================
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from isbn_utils import to_isbn10
+
+KAKAO_SEARCH_PATH = "/v3/search/book"
+COVER_PATH_PREFIX = "/covers/"
+COVER_IMAGE_SIZE = 16 * 1024  # 표지 이미지 크기 (bytes)
+
+
+def isbn_hash(isbn):
+    """
+    ISBN마다 항상 같은 값을 돌려주는 해시 (응답 내용을 결정적으로 만들기 위해 사용)
+    """
+    return zlib.crc32(isbn.encode("ascii"))
+
+
+def make_document(isbn13, base_url):
+    """
+    Kakao 책 검색 API의 documents 항목 하나를 만듭니다.
+    같은 ISBN이면 항상 같은 내용이 나옵니다.
+    :param isbn13: ISBN-13
+    :param base_url: 표지 URL에 사용할 서버 주소
+    :return: 책 정보 딕셔너리
+    """
+    seed = isbn_hash(isbn13)
+    authors = [f"저자{(seed >> shift) % 5000}" for shift in range(0, 8 * (seed % 3 + 1), 8)]
+    return {
+        "title": f"모의 도서 {isbn13}",
+        "contents": "모의 서버가 만든 도서 소개입니다. " * (seed % 20 + 1),
+        "url": f"{base_url}/books/{isbn13}",
+        "isbn": f"{to_isbn10(isbn13) or ''} {isbn13}",
+        "datetime": f"20{seed % 25:02d}-{seed % 12 + 1:02d}-01T00:00:00.000+09:00",
+        "authors": authors,
+        "publisher": f"출판사{seed % 2000}",
+        "translators": [f"역자{seed % 300}"] if seed % 4 == 0 else [],
+        "price": 10000 + seed % 30 * 1000,
+        "sale_price": 9000 + seed % 30 * 900,
+        "thumbnail": f"{base_url}{COVER_PATH_PREFIX}{isbn13}.jpg",
+        "status": "정상판매",
+    }
+
+
+def make_cover(isbn13, size=COVER_IMAGE_SIZE):
+    """
+    표지 이미지 대신 사용할 결정적인 바이트열 (JPEG 시작/끝 표식만 맞춤)
+    """
+    body = random.Random(isbn_hash(isbn13)).randbytes(max(0, size - 4))
+    return b"\xff\xd8" + body + b"\xff\xd9"
+
+
+class MockKakaoHandler(BaseHTTPRequestHandler):
+    """
+    검색 API와 표지 이미지 요청을 처리하는 핸들러 (keep-alive 지원)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # 요청마다 stderr에 찍히는 접근 로그는 벤치마크 출력만 어지럽히므로 생략
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        fault = mock.before_request()
+        if fault == 429:
+            self.send_body(429, b'{"errorType":"RateLimitExceeded"}', "application/json")
+            return
+        if fault == 500:
+            self.send_body(500, b'{"errorType":"InternalError"}', "application/json")
+            return
+
+        if url.path == KAKAO_SEARCH_PATH:
+            query = parse_qs(url.query).get("query", [""])[0]
+            documents = [] if mock.is_not_found(query) else [make_document(query, mock.url)]
+            body = json.dumps(
+                {"documents": documents, "meta": {"total_count": len(documents)}},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            self.send_body(200, body, "application/json; charset=utf-8")
+        elif url.path.startswith(COVER_PATH_PREFIX):
+            isbn13 = url.path[len(COVER_PATH_PREFIX) :].split(".")[0]
+            etag = f'"{isbn_hash(isbn13):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_body(304, b"", "image/jpeg", {"ETag": etag})
+            else:
+                body = make_cover(isbn13, mock.image_size)
+                self.send_body(200, body, "image/jpeg", {"ETag": etag})
+        else:
+            self.send_body(404, b"{}", "application/json")
+
+
+class MockKakaoServer:
+    """
+    백그라운드 스레드에서 동작하는 모의 Kakao API/표지 서버
+    - latency(+0~jitter)초 뒤에 응답합니다.
+    - throttle_rate 비율로 429, error_rate 비율로 500을 돌려줍니다.
+    - not_found_rate 비율의 ISBN은 항상 검색 결과가 비어 있습니다. (ISBN별로 고정)
+    :param host: 바인드할 주소
+    :param port: 포트 (0이면 빈 포트를 자동으로 선택)
+    :param latency: 기본 응답 지연 (초)
+    :param jitter: 추가 지연의 최댓값 (초)
+    :param error_rate: 500 응답 비율 (0~1)
+    :param throttle_rate: 429 응답 비율 (0~1)
+    :param not_found_rate: 검색 결과가 없는 ISBN 비율 (0~1)
+    :param image_size: 표지 이미지 크기 (bytes)
+    :param seed: 지연/오류 주입에 사용할 난수 시드
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        not_found_rate=0.0,
+        image_size=COVER_IMAGE_SIZE,
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.not_found_rate = not_found_rate
+        self.image_size = image_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0}
+        self.httpd = ThreadingHTTPServer((host, port), MockKakaoHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def book_api_url(self):
+        return self.url + KAKAO_SEARCH_PATH
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        백그라운드 스레드에서 서버 시작
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        서버 종료
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def before_request(self):
+        """
+        요청마다 호출: 지연을 주고, 주입할 오류 코드(429/500) 또는 None을 반환합니다.
+        """
+        with self.lock:
+            self.stats["requests"] += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            roll = self.random.random()
+            if roll < self.throttle_rate:
+                fault = 429
+                self.stats["throttled"] += 1
+            elif roll < self.throttle_rate + self.error_rate:
+                fault = 500
+                self.stats["errors"] += 1
+            else:
+                fault = None
+        if delay > 0:
+            time.sleep(delay)
+        return fault
+
+    def is_not_found(self, isbn):
+        """
+        검색 결과가 없는 ISBN인지 확인합니다. (ISBN별로 항상 같은 결과)
+        """
+        return isbn_hash(isbn) % 10000 < self.not_found_rate * 10000
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the Kakao book search API "
+        "and cover images."
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="bind address (default: %(default)s)"
+    )
+    parser.add_argument("--port", type=int, default=8900, help="port (default: %(default)s)")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="response delay in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random delay in seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of HTTP 500 responses"
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="share of HTTP 429 responses"
+    )
+    parser.add_argument(
+        "--not-found-rate",
+        type=float,
+        default=0.0,
+        help="share of ISBNs with no documents",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = MockKakaoServer(
+        args.host,
+        args.port,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.throttle_rate,
+        args.not_found_rate,
+    )
+    print(f"Mock Kakao API: {server.book_api_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served {server.stats}")
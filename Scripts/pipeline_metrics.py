@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# ========================================================================
+# 수집 스크립트가 공유하는 메트릭(카운터, 지연 시간 히스토그램, 진행 중 게이지)과
+# 로그 설정 모듈
+# 메트릭은 종료 시(그리고 원하면 주기적으로) JSON 요약과 Prometheus 텍스트 파일로 저장되고,
+# 로그는 큐를 거쳐 별도 스레드에서 파일에 쓰므로 처리 루프가 파일 I/O를 기다리지 않습니다.
+# 프로세스 풀의 작업자는 take_snapshot()으로 값을 돌려주고, 부모 프로세스가 merge()로 합칩니다.
+# ------------------------------------------------------------------------
+# Filename: pipeline_metrics.py
+# Usage: from pipeline_metrics import METRICS, install_metrics, setup_logging
+# ------------------------------------------------------------------------
+# Author: KH.CHO
+# Version: 1.1.0
+# ------------------------------------------------------------------------
+# History:
+# v1.0.0 - Initial version (2026-10-16)
+# v1.1.0 - Merge snapshots returned by process pool workers (2026-10-16)
+# ========================================================================
+
+import atexit
+import bisect
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from atomic_file import atomic_write
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# 메트릭 파일 저장 디렉토리와 주기적 저장 간격 (0이면 종료 시에만 저장)
+METRICS_DIR = os.getenv("METRICS_DIR", "../logs/metrics")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "0"))
+# 지연 시간 히스토그램의 구간 상한 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def setup_logging(log_file, level="ERROR"):
+    """
+    루트 로거가 QueueHandler로만 기록하도록 설정합니다.
+    실제 파일/콘솔 출력은 QueueListener 스레드가 맡고, 종료 시 남은 로그를 모두 씁니다.
+    프로세스 풀의 작업자 프로세스에는 큐를 읽는 스레드가 없으므로 핸들러에 직접 기록합니다.
+    logging.basicConfig()처럼 루트 로거에 이미 핸들러가 있으면 아무것도 하지 않습니다.
+    :param log_file: 로그 파일 경로
+    :param level: 로그 레벨 이름 (잘못된 값이면 ERROR)
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.FileHandler(log_file, encoding="utf-8"), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    root.setLevel(getattr(logging, str(level).upper(), logging.ERROR))
+    if multiprocessing.parent_process() is not None:
+        # spawn으로 시작된 작업자는 종료 시 atexit이 실행되지 않아 큐에 남은 로그를 잃을 수 있음
+        for handler in handlers:
+            root.addHandler(handler)
+        return
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    root.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    def use_direct_handlers():
+        # fork된 자식 프로세스에는 QueueListener 스레드가 없음
+        root.removeHandler(queue_handler)
+        for handler in handlers:
+            root.addHandler(handler)
+
+    os.register_at_fork(after_in_child=use_direct_handlers)
+
+
+def metric_key(name, labels):
+    """
+    이름과 라벨로 만든 레지스트리 키 (라벨 값은 문자열로 통일해 정렬할 수 있게 함)
+    """
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def format_labels(labels):
+    """
+    라벨 튜플을 Prometheus 형식({key="value",...})으로 변환합니다.
+    """
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """
+    누적 구간(bucket) 히스토그램 (Prometheus histogram과 같은 구조)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf 구간
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, buckets, counts, count, total):
+        """
+        다른 프로세스의 같은 구간 히스토그램 값을 더합니다.
+        """
+        if tuple(buckets) != self.buckets:
+            raise ValueError(f"histogram buckets differ: {buckets} != {self.buckets}")
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.count += count
+        self.sum += total
+
+    def quantile(self, q):
+        """
+        구간 안에서 선형 보간한 분위수 추정값 (+Inf 구간이면 마지막 상한)
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Metrics:
+    """
+    카운터, 게이지, 히스토그램을 이름과 라벨로 보관하는 레지스트리
+    여러 스레드에서 하나의 인스턴스를 공유할 수 있습니다.
+    프로세스마다 따로 집계되므로, 프로세스 풀의 작업자는 작업 결과와 함께 take_snapshot()을
+    돌려주고 부모 프로세스가 merge()로 합칩니다. (작업자는 init_worker_metrics로 시작)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        """
+        카운터 증가
+        """
+        key = metric_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """
+        게이지 값 설정
+        """
+        key = metric_key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def add_gauge(self, name, delta, **labels):
+        """
+        게이지 값 증감 (진행 중인 요청 수 등)
+        """
+        key = metric_key(name, labels)
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def observe(self, name, value, **labels):
+        """
+        히스토그램에 값 기록
+        """
+        key = metric_key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        블록 실행 시간을 {name}_seconds 히스토그램에 기록하고,
+        실행 중에는 {name}_in_flight 게이지를 1 올려 둡니다.
+        """
+        self.add_gauge(f"{name}_in_flight", 1, **labels)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started_at, **labels)
+            self.add_gauge(f"{name}_in_flight", -1, **labels)
+
+    def take_snapshot(self):
+        """
+        지금까지의 값을 pickle할 수 있는 딕셔너리로 꺼내고 레지스트리를 비웁니다.
+        작업 하나가 끝날 때마다 호출하므로, 같은 작업자의 값이 두 번 합쳐지지 않습니다.
+        :return: merge()에 넘길 딕셔너리
+        """
+        with self.lock:
+            snapshot = {
+                "counters": self.counters,
+                "gauges": self.gauges,
+                "histograms": {
+                    key: (
+                        histogram.buckets,
+                        histogram.counts,
+                        histogram.count,
+                        histogram.sum,
+                    )
+                    for key, histogram in self.histograms.items()
+                },
+            }
+            self.counters, self.gauges, self.histograms = {}, {}, {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """
+        작업자 프로세스의 take_snapshot() 결과를 더합니다.
+        카운터와 히스토그램은 합산하고, 게이지도 진행 중인 작업 수처럼 더하는 값으로 보고 합산합니다.
+        :param snapshot: take_snapshot()이 반환한 딕셔너리
+        """
+        with self.lock:
+            for key, value in snapshot["counters"].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, value in snapshot["gauges"].items():
+                self.gauges[key] = self.gauges.get(key, 0) + value
+            for key, (buckets, counts, count, total) in snapshot["histograms"].items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(buckets)
+                histogram.merge(buckets, counts, count, total)
+
+    def to_dict(self):
+        """
+        JSON으로 저장할 요약 (히스토그램은 건수, 합계, 평균, 추정 분위수)
+        """
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "updated_at": time.time(),
+                "counters": {
+                    name + format_labels(labels): value
+                    for (name, labels), value in sorted(self.counters.items())
+                },
+                "gauges": {
+                    name + format_labels(labels): value
+                    for (name, labels), value in sorted(self.gauges.items())
+                },
+                "histograms": {
+                    name + format_labels(labels): {
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "mean": round(histogram.sum / histogram.count, 6)
+                        if histogram.count
+                        else None,
+                        **{
+                            f"p{int(q * 100)}": histogram.quantile(q)
+                            for q in SUMMARY_QUANTILES
+                        },
+                    }
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def to_prometheus(self):
+        """
+        Prometheus 텍스트 형식 (node_exporter textfile collector에서 읽을 수 있음)
+        """
+        lines = []
+        with self.lock:
+            typed = set()
+            for kind, items in (("counter", self.counters), ("gauge", self.gauges)):
+                for (name, labels), value in sorted(items.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {name} {kind}")
+                        typed.add(name)
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    bucket_labels = format_labels(labels + (("le", bound),))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, basename, directory=METRICS_DIR):
+        """
+        {basename}.json과 {basename}.prom 파일로 저장합니다. (임시 파일에 쓴 뒤 rename)
+        장시간 실행 중에도 주기적으로 호출할 수 있습니다.
+        :param basename: 파일 이름 (확장자 제외, 보통 스크립트 이름)
+        :param directory: 저장할 디렉토리
+        """
+        os.makedirs(directory, exist_ok=True)
+        contents = {
+            ".json": json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n",
+            ".prom": self.to_prometheus(),
+        }
+        for suffix, text in contents.items():
+            with atomic_write(os.path.join(directory, basename + suffix), encoding="utf-8") as file:
+                file.write(text)
+
+
+# 스크립트 전체에서 공유하는 기본 레지스트리
+METRICS = Metrics()
+
+
+def init_worker_metrics():
+    """
+    프로세스 풀 작업자의 initializer: fork로 복사된 부모의 값을 비워, 작업자가 돌려주는
+    스냅샷에 부모 값이 다시 들어가지 않게 합니다.
+    """
+    METRICS.take_snapshot()
+
+
+def install_metrics(basename, interval=METRICS_DUMP_INTERVAL, directory=METRICS_DIR):
+    """
+    종료 시 METRICS를 저장하도록 등록하고, interval이 0보다 크면
+    그 간격으로 백그라운드 스레드에서 주기적으로 저장합니다.
+    :param basename: 파일 이름 (확장자 제외, 보통 스크립트 이름)
+    :param interval: 주기적 저장 간격 (초)
+    :param directory: 저장할 디렉토리
+    """
+
+    def dump():
+        try:
+            METRICS.dump(basename, directory)
+        except OSError as e:
+            logging.error("Failed to write metrics to %s: %s", directory, e)
+
+    atexit.register(dump)
+    if interval > 0:
+        stopped = threading.Event()
+        atexit.register(stopped.set)
+
+        def dump_periodically():
+            while not stopped.wait(interval):
+                dump()
+
+        threading.Thread(target=dump_periodically, daemon=True).start()
@@ -4,18 +4,56 @@
 # ------------------------------------------------------------------------
 # Filename: qrcode_generator.py
 # Usage: python qrcode_generator.py <text> <output_file>
-# Output: qrcode.png
+#        python qrcode_generator.py --from-db [--sheet-format pdf|png]
+#        python qrcode_generator.py --from-file <file> [--sheet-format pdf|png]
+# Output: qrcode.png, label sheets (../data/qrcodes/labels.pdf)
 # ------------------------------------------------------------------------
 # Author: KH.CHO
-# Version: 1.0.0
+# Version: 1.1.0
 # ------------------------------------------------------------------------
 # History:
 # v1.0.0 - Initial version (2024-06-04)
+# v1.1.0 - Added batch label sheet mode with render cache (2026-10-16)
 # ========================================================================
 
-import sys
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 import qrcode
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw, ImageFont
+
+# 환경 변수 로드
+load_dotenv()
+
+# DB 연결 설정 (--from-db 사용 시)
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", "5432")),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+}
+
+# 배치 모드 출력 디렉토리와 렌더링 캐시 디렉토리
+QRCODE_OUTPUT_DIR = "../data/qrcodes"
+QRCODE_CACHE_DIR = os.path.join(QRCODE_OUTPUT_DIR, "cache")
+# QR 코드 생성 옵션 (바뀌면 캐시 키도 바뀜)
+QRCODE_OPTIONS = {
+    "version": 1,
+    "error_correction": qrcode.constants.ERROR_CORRECT_L,
+    "box_size": 10,
+    "border": 4,
+}
+# 라벨 시트 레이아웃 (A4, 300dpi)
+SHEET_DPI = 300
+SHEET_SIZE = (2480, 3508)
+SHEET_MARGIN = 90
+SHEET_COLUMNS = 4
+SHEET_ROWS = 7
+LABEL_TEXT_HEIGHT = 50
 
 
 def generate_qr_code(text):
@@ -24,12 +62,7 @@ def generate_qr_code(text):
     :param text: The text to encode in the QR code.
     :return: A PIL Image object containing the QR code.
     """
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
+    qr = qrcode.QRCode(**QRCODE_OPTIONS)
     qr.add_data(text)
     qr.make(fit=True)
 
@@ -45,19 +78,199 @@ def save_qr_code(img, output_file):
     print(f"QR code saved to {output_file}")
 
 
+def get_cache_path(text):
+    """
+    Return the render cache path for a text. The key covers the text and the
+    QR options, so changing either produces a new cache entry.
+    :param text: The text encoded in the QR code.
+    :return: Path of the cached PNG file.
+    """
+    key = hashlib.sha256(
+        repr((sorted(QRCODE_OPTIONS.items()), text)).encode("utf-8")
+    ).hexdigest()
+    return os.path.join(QRCODE_CACHE_DIR, key[:2], f"{key}.png")
+
+
+def render_cached(texts):
+    """
+    Render QR codes for texts that are not in the render cache yet.
+    Runs inside a worker process.
+    :param texts: The texts to render.
+    :return: The number of newly rendered codes.
+    """
+    rendered = 0
+    for text in texts:
+        cache_path = get_cache_path(text)
+        if os.path.exists(cache_path):
+            continue
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        generate_qr_code(text).save(temp_path, format="PNG")
+        os.replace(temp_path, cache_path)
+        rendered += 1
+    return rendered
+
+
+def compose_label_sheets(texts):
+    """
+    Lay out cached QR codes with their text on A4 label sheets.
+    :param texts: The texts whose codes are already in the render cache.
+    :return: A list of PIL Image objects, one per sheet.
+    """
+    cell_width = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // SHEET_COLUMNS
+    cell_height = (SHEET_SIZE[1] - 2 * SHEET_MARGIN) // SHEET_ROWS
+    qr_size = min(cell_width, cell_height - LABEL_TEXT_HEIGHT)
+    font = ImageFont.load_default(size=32)
+    per_sheet = SHEET_COLUMNS * SHEET_ROWS
+
+    sheets = []
+    for start in range(0, len(texts), per_sheet):
+        sheet = Image.new("L", SHEET_SIZE, color=255)
+        draw = ImageDraw.Draw(sheet)
+        for i, text in enumerate(texts[start : start + per_sheet]):
+            left = SHEET_MARGIN + (i % SHEET_COLUMNS) * cell_width
+            top = SHEET_MARGIN + (i // SHEET_COLUMNS) * cell_height
+            with Image.open(get_cache_path(text)) as code:
+                code = code.convert("L").resize((qr_size, qr_size), Image.Resampling.NEAREST)
+            sheet.paste(code, (left + (cell_width - qr_size) // 2, top))
+            draw.text(
+                (left + cell_width // 2, top + qr_size + LABEL_TEXT_HEIGHT // 2),
+                text,
+                fill=0,
+                font=font,
+                anchor="mm",
+            )
+        sheets.append(sheet)
+    return sheets
+
+
+def load_identifiers_from_db():
+    """
+    Read every QR code identifier from book_instances.
+    :return: A list of identifier values.
+    """
+    # 단일 QR 생성에는 DB가 필요 없으므로 배치 모드에서만 import
+    import psycopg2
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT identifier_value FROM book_instances
+                WHERE identifier_value IS NOT NULL
+                  AND (identifier_type = 'QR_CODE' OR identifier_type IS NULL)
+                ORDER BY instance_id
+                """
+            )
+            return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def load_identifiers_from_file(filename):
+    """
+    Read identifiers from a text file, one per line.
+    :param filename: The path of the input file.
+    :return: A list of identifier values.
+    """
+    with open(filename, mode="r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def generate_label_sheets(texts, output_dir, sheet_format, workers):
+    """
+    Render QR codes for all texts in a process pool (skipping cached codes)
+    and write them out as label sheets.
+    :param texts: The texts to encode.
+    :param output_dir: The directory to write the sheets to.
+    :param sheet_format: "pdf" for one multi-page PDF, "png" for one PNG per sheet.
+    :param workers: The number of worker processes.
+    """
+    texts = list(dict.fromkeys(texts))  # 중복 제거 (순서 유지)
+    chunk_size = max(1, len(texts) // (workers * 4))
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rendered = sum(executor.map(render_cached, chunks))
+    print(f"Rendered {rendered} QR codes, {len(texts) - rendered} reused from cache.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    sheets = compose_label_sheets(texts)
+    if not sheets:
+        print("No identifiers to print.")
+        return
+    if sheet_format == "pdf":
+        output_file = os.path.join(output_dir, "labels.pdf")
+        sheets[0].save(
+            output_file, save_all=True, append_images=sheets[1:], resolution=SHEET_DPI
+        )
+        print(f"{len(sheets)} label sheets saved to {output_file}")
+    else:
+        for page, sheet in enumerate(sheets, start=1):
+            output_file = os.path.join(output_dir, f"labels_{page:03d}.png")
+            sheet.save(output_file, dpi=(SHEET_DPI, SHEET_DPI))
+        print(f"{len(sheets)} label sheets saved to {output_dir}")
+
+
+def parse_args():
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate QR codes and label sheets.")
+    parser.add_argument("text", nargs="?", help="text to encode (single mode)")
+    parser.add_argument("output_file", nargs="?", help="output image (single mode)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--from-db",
+        action="store_true",
+        help="batch mode: read book_instances.identifier_value from the database",
+    )
+    source.add_argument(
+        "--from-file", help="batch mode: read identifiers from a file, one per line"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=QRCODE_OUTPUT_DIR,
+        help="label sheet directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sheet-format",
+        choices=("pdf", "png"),
+        default="pdf",
+        help="label sheet format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    batch = args.from_db or args.from_file
+    if batch and (args.text or args.output_file):
+        parser.error("text/output_file cannot be combined with --from-db/--from-file")
+    if not batch and not (args.text and args.output_file):
+        parser.error("either <text> <output_file> or --from-db/--from-file is required")
+    return args
+
+
 def main():
     """
-    Main function to generate a QR code from the provided text and save it to a file.
+    Main function to generate a QR code from the provided text and save it to a file,
+    or to generate label sheets for a batch of identifiers.
     """
-    if len(sys.argv) != 3:
-        print("Usage: python qrcode_generator.py <text> <output_file>")
-        sys.exit(1)
+    args = parse_args()
 
-    text = sys.argv[1]
-    output_file = sys.argv[2]
+    if args.from_db or args.from_file:
+        if args.from_db:
+            texts = load_identifiers_from_db()
+        else:
+            texts = load_identifiers_from_file(args.from_file)
+        generate_label_sheets(texts, args.output_dir, args.sheet_format, args.workers)
+        return
 
-    img = generate_qr_code(text)
-    save_qr_code(img, output_file)
+    img = generate_qr_code(args.text)
+    save_qr_code(img, args.output_file)
 
 
 if __name__ == "__main__":
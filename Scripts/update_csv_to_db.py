@@ -3,36 +3,62 @@
 # CSV 파일을 읽어서 DB에 업데이트하는 스크립트
 # ------------------------------------------------------------------------
 # Filename: update_csv_to_db.py
-# Usage: python update_csv_to_db.py
+# Usage: python update_csv_to_db.py [--bulk | --dry-run] [--workers N] [--batch-size N]
+#                                   [--rejects FILE] [--store]
 # ------------------------------------------------------------------------
 # Author: KH.CHO
-# Version: 1.0.0
+# Version: 1.7.3
 # ------------------------------------------------------------------------
 # History:
 # v1.0.0 - Initial version (2024-06-05)
+# v1.1.0 - Target Schema/database.sql tables, added COPY-based bulk mode (2026-10-16)
+# v1.2.0 - Added preloaded dimension cache with batched inserts (2026-10-16)
+# v1.3.0 - Commit in batches, isolate bad rows with savepoints into a rejects file (2026-10-16)
+# v1.4.0 - Skip rows whose content fingerprint is unchanged, added --dry-run (2026-10-16)
+# v1.5.0 - Added parallel loading of ISBN-hash partitions (2026-10-16)
+# v1.6.0 - Shared book_info schema, added --store for the SQLite staging store (2026-10-16)
+# v1.7.0 - Shared metrics and queue-based logging (2026-10-16)
+# v1.7.1 - Remove links and analyses a changed row no longer has (2026-10-16)
+# v1.7.2 - Merge metrics from the partition worker processes (2026-10-16)
+# v1.7.3 - Refresh book search columns once per row-mode batch, not per link (2026-10-16)
 # ========================================================================
 
+import argparse
+import ast
 import csv
+import hashlib
+import io
+import itertools
+import json
 import logging
 import os
+import shutil
 import sys
+import tempfile
 import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal, InvalidOperation
 
 import psycopg2
 from dotenv import load_dotenv
 
+from book_info_store import (
+    BOOK_INFO_FILENAME,
+    BOOK_INFO_HEADER,
+    BOOK_INFO_STORE_PATH,
+    BookInfoStore,
+)
+from isbn_utils import to_isbn10, to_isbn13
+from pipeline_metrics import METRICS, init_worker_metrics, install_metrics, setup_logging
+
 # 환경 변수 로드
 load_dotenv()
 LOG_LEVEL = os.getenv("LOG_LEVEL", "ERROR").upper()
 LOG_FILE_PATH = "../logs/update_csv_to_db.log"
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.ERROR),
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
-)
+setup_logging(LOG_FILE_PATH, LOG_LEVEL)
 # DB 연결 설정
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -42,55 +68,423 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME"),
 }
 
-# CSV 파일 이름 및 구조
-BOOK_INFO_FILENAME = "../data/book_info.csv"
-BOOK_INFO_HEADER = [
-    "ISBN_KEY",
-    "IS_UPDATED",
-    "TITLE",
-    "SUBTITLE",
-    "ORIGINAL_TITLE",
-    "AUTHORS",
-    "TRANSLATORS",
-    "PUBLISHER",
-    "PUBLISHED_DATE",
-    "ISBN_10",
-    "ISBN_13",
-    "PAGES",
-    "EDITION",
-    "CATEGORY",
-    "TAGS",
-    "RATING",
-    "REVIEW_TEXT",
-    "HEX1",
-    "HEX2",
-    "HEX3",
-    "HEX4",
-    "HEX5",
-    "HEX6",
-    "THUMBNAIL_URL",
-    "DESCRIPTION",
+# 이름으로 찾거나 새로 만드는 참조 테이블의 ID 열
+TABLE_ID_COLUMNS = {
+    "publishers": "publisher_id",
+    "categories": "category_id",
+    "persons": "person_id",
+    "tags": "tag_id",
+}
+# books / book_analyses에 저장하는 열
+BOOK_COLUMNS = [
+    "isbn10",
+    "isbn13",
+    "title",
+    "subtitle",
+    "original_title",
+    "publication_date",
+    "edition",
+    "pages",
+    "description",
+    "cover_image_url",
+    "content_fingerprint",
 ]
+ANALYSIS_COLUMNS = ["rating", "review_text"] + [
+    f"hexagon_value_{i}" for i in range(1, 7)
+]
+# 내용 지문(content_fingerprint)을 계산하는 값: 이 값 중 하나라도 바뀌면 다시 반영
+FINGERPRINT_FIELDS = (
+    BOOK_COLUMNS[:-1]
+    + ["publisher", "category", "authors", "translators", "tags"]
+    + ANALYSIS_COLUMNS
+)
+# 스키마의 최대 길이 (Kakao 값이 더 길면 잘라서 저장, 한 행 때문에 배치 전체가 실패하지 않도록)
+COLUMN_MAX_LENGTHS = {
+    "title": 255,
+    "subtitle": 255,
+    "original_title": 255,
+    "edition": 50,
+    "publisher": 100,
+    "category": 100,
+}
+NAME_MAX_LENGTHS = {"authors": 100, "translators": 100, "tags": 50}
+# 잘린 URL은 쓸 수 없으므로 더 길면 저장하지 않음
+COVER_URL_MAX_LENGTH = 255
+# 대량 적재 시 한 번에 COPY하고 반영하는 행 수
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "5000"))
+# 행 단위 적재 시 한 트랜잭션으로 commit하는 행 수 (참조 테이블 ID도 이 단위로 한 번에 찾음)
+COMMIT_BATCH_SIZE = int(os.getenv("COMMIT_BATCH_SIZE", "500"))
+# 참조 테이블 캐시의 테이블당 최대 항목 수
+DIMENSION_CACHE_MAX_ENTRIES = int(os.getenv("DIMENSION_CACHE_MAX_ENTRIES", "200000"))
+# 적재하지 못한 행을 원본 형식 그대로 저장하는 파일 (사유는 REJECT_REASON 열)
+REJECTS_FILENAME = "../data/book_info_rejects.csv"
+# 병렬 적재 시 프로세스(DB 연결) 수
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "1"))
+# 병렬 적재 전에 참조 테이블 이름을 미리 추가할 때 한 트랜잭션의 이름 수
+DIMENSION_PREPASS_CHUNK = 10000
+# 행 단위 반영에서 book_persons 트리거의 검색 컬럼 갱신을 미루고, 배치 끝에 도서마다 한 번만 갱신
+# (Schema/database.sql의 trigger_refresh_book_search_by_book_persons 참고)
+DEFER_BOOK_SEARCH_SQL = "SET LOCAL hapinus.defer_book_search = on"
+REFRESH_BOOK_SEARCH_SQL = "UPDATE books SET search_vector = NULL WHERE book_id = ANY(%s)"
 
 
-def get_or_create(cursor, table, column, value):
+class DimensionCache:
     """
-    테이블에서 값이 존재하면 ID를 반환하고, 없으면 새로 생성 후 ID를 반환합니다.
+    참조 테이블(출판사, 카테고리, 인물, 태그)의 이름 → ID 맵을 메모리에 보관하는 캐시
+    시작할 때 테이블마다 한 번의 쿼리로 미리 읽고, 없는 이름은 여러 개를 모아 한 번에 추가합니다.
+    테이블마다 최대 max_entries개까지만 보관하며, 넘치면 가장 오래 쓰지 않은 이름부터 버립니다.
     :param cursor: 데이터베이스 커서
-    :param table: 테이블 이름
-    :param column: 검색할 열 이름
-    :param value: 검색할 값
-    :return: 해당 값의 ID
-    """
-    cursor.execute(f"SELECT {table}_id FROM {table} WHERE {column} = %s", (value,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
+    :param max_entries: 테이블당 최대 항목 수
+    """
+
+    def __init__(self, cursor, max_entries=DIMENSION_CACHE_MAX_ENTRIES):
+        self.cursor = cursor
+        self.max_entries = max_entries
+        self.entries = {table: OrderedDict() for table in TABLE_ID_COLUMNS}
+        self.hits = dict.fromkeys(TABLE_ID_COLUMNS, 0)
+        self.misses = dict.fromkeys(TABLE_ID_COLUMNS, 0)
+        # 마지막 commit 이후 새로 추가한 이름 (rollback 시 캐시에서 제거)
+        self.uncommitted = []
+        for table in TABLE_ID_COLUMNS:
+            self._preload(table)
+
+    @staticmethod
+    def _condition(table, keyword):
+        # categories는 최상위(parent_category_id IS NULL) 카테고리만 이름으로 찾음
+        return f" {keyword} parent_category_id IS NULL" if table == "categories" else ""
+
+    def _preload(self, table):
+        """
+        테이블의 이름 → ID 맵을 한 번의 쿼리로 읽습니다. (같은 이름이 여럿이면 가장 작은 ID)
+        max_entries보다 많으면 최근에 추가된 이름을 우선합니다.
+        """
+        id_column = TABLE_ID_COLUMNS[table]
+        self.cursor.execute(
+            f"SELECT name, MIN({id_column}) FROM {table}{self._condition(table, 'WHERE')} "
+            f"GROUP BY name ORDER BY MIN({id_column}) DESC LIMIT %s",
+            (self.max_entries,),
+        )
+        self.entries[table].update(reversed(self.cursor.fetchall()))
+
+    def _select(self, table, names):
+        """
+        DB에서 이름 목록의 ID를 한 번의 쿼리로 찾습니다.
+        """
+        id_column = TABLE_ID_COLUMNS[table]
+        with METRICS.timer("db_statement", statement="dimension_select"):
+            self.cursor.execute(
+                f"SELECT name, MIN({id_column}) FROM {table} "
+                f"WHERE name = ANY(%s){self._condition(table, 'AND')} GROUP BY name",
+                (names,),
+            )
+        return dict(self.cursor.fetchall())
+
+    def _insert(self, table, names):
+        """
+        새 이름 목록을 한 번의 INSERT ... RETURNING으로 추가합니다.
+        다른 세션이 먼저 추가해서 충돌한 이름은 반환값에 포함되지 않습니다.
+        """
+        if table == "persons":
+            # persons.name에는 UNIQUE 제약이 없으므로 ON CONFLICT 없이 추가
+            conflict = ""
+        elif table == "categories":
+            conflict = " ON CONFLICT (name) WHERE parent_category_id IS NULL DO NOTHING"
+        else:
+            conflict = " ON CONFLICT (name) DO NOTHING"
+        with METRICS.timer("db_statement", statement="dimension_insert"):
+            self.cursor.execute(
+                f"INSERT INTO {table} (name) SELECT unnest(%s::text[]){conflict} "
+                f"RETURNING name, {TABLE_ID_COLUMNS[table]}",
+                (names,),
+            )
+        return dict(self.cursor.fetchall())
+
+    def resolve(self, table, names, count=True):
+        """
+        이름 목록의 ID를 반환합니다. 캐시에 없는 이름은 한 번의 SELECT로 찾고,
+        DB에도 없는 이름은 한 번의 INSERT로 추가합니다.
+        :param table: 테이블 이름
+        :param names: 이름 iterable
+        :param count: False이면 적중률 통계에 세지 않음 (resolve_rows로 이미 센 이름을 다시 찾을 때)
+        :return: {이름: ID} 딕셔너리 (입력 순서 유지)
+        """
+        entries = self.entries[table]
+        result = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            if name in entries:
+                entries.move_to_end(name)
+                result[name] = entries[name]
+                self.hits[table] += count
+            else:
+                result[name] = None
+                missing.append(name)
+                self.misses[table] += count
+        if not missing:
+            return result
+
+        # 캐시 용량을 넘어서 버려진 이름은 DB에 있을 수 있으므로 먼저 조회
+        found = self._select(table, missing)
+        # 여러 연결이 동시에 추가해도 같은 순서로 잠그도록 정렬
+        new_names = sorted(name for name in missing if name not in found)
+        if new_names:
+            inserted = self._insert(table, new_names)
+            self.uncommitted.extend((table, name) for name in inserted)
+            found.update(inserted)
+            raced = [name for name in new_names if name not in inserted]
+            if raced:
+                found.update(self._select(table, raced))
+
+        for name in missing:
+            entries[name] = result[name] = found[name]
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return result
+
+    def resolve_rows(self, rows):
+        """
+        여러 행에 필요한 참조 테이블 ID를 테이블마다 한 번에 찾아 둡니다.
+        :param rows: prepare_book_row()의 반환값 리스트
+        """
+        self.resolve("publishers", (row["publisher"] for row in rows if row["publisher"]))
+        self.resolve("categories", (row["category"] for row in rows if row["category"]))
+        self.resolve("tags", (name for row in rows for name in row["tags"]))
+        self.resolve(
+            "persons",
+            (name for row in rows for name in row["authors"] + row["translators"]),
+        )
+
+    def get_id(self, table, name, count=True):
+        """
+        이름 하나의 ID를 반환합니다. (없으면 새로 추가)
+        """
+        return self.resolve(table, [name], count)[name]
+
+    def mark(self):
+        """
+        SAVEPOINT를 만들 때 호출: rollback(mark)로 되돌릴 위치를 반환합니다.
+        """
+        return len(self.uncommitted)
+
+    def commit(self):
+        """
+        트랜잭션을 commit한 뒤 호출: 새로 추가한 이름을 확정합니다.
+        """
+        self.uncommitted.clear()
+
+    def rollback(self, mark=0):
+        """
+        트랜잭션(또는 SAVEPOINT)을 rollback한 뒤 호출: DB에서 사라진 이름을 캐시에서도 제거합니다.
+        :param mark: mark()의 반환값 (기본값은 트랜잭션 전체)
+        """
+        for table, name in self.uncommitted[mark:]:
+            self.entries[table].pop(name, None)
+        del self.uncommitted[mark:]
+
+    def log_stats(self):
+        """
+        테이블별 캐시 적중률을 로그에 남깁니다.
+        """
+        for table in TABLE_ID_COLUMNS:
+            lookups = self.hits[table] + self.misses[table]
+            logging.info(
+                "Dimension cache %s: %d entries, %d lookups, %.1f%% hit rate.",
+                table,
+                len(self.entries[table]),
+                lookups,
+                100.0 * self.hits[table] / lookups if lookups else 0.0,
+            )
+
+
+def split_names(value):
+    """
+    AUTHORS, TRANSLATORS, TAGS 값을 이름 리스트로 변환합니다.
+    isbn_processor_to_csv.py가 저장한 리스트 표기("['a', 'b']")와 쉼표 구분("a, b")을 모두 지원합니다.
+    :param value: CSV 셀 값
+    :return: 중복과 빈 값을 제거한 이름 리스트 (순서 유지)
+    """
+    value = (value or "").strip()
+    if value.startswith("[") and value.endswith("]"):
+        try:
+            names = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            names = value[1:-1].split(",")
     else:
+        names = value.split(",")
+    return list(dict.fromkeys(str(name).strip() for name in names if str(name).strip()))
+
+
+def parse_optional(value, converter, field, valid=None):
+    """
+    빈 값이면 None을, 아니면 변환한 값을 반환합니다.
+    :param value: CSV 셀 값
+    :param converter: 변환 함수 (int, Decimal 등)
+    :param field: 오류 메시지에 사용할 열 이름
+    :param valid: 변환한 값의 유효성 검사 함수
+    :return: 변환한 값 또는 None
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        converted = converter(value)
+    except (ValueError, InvalidOperation) as e:
+        raise ValueError(f"Invalid {field} value: {value!r}") from e
+    if valid and not valid(converted):
+        raise ValueError(f"Out of range {field} value: {value!r}")
+    return converted
+
+
+def canonical_isbn13(book):
+    """
+    CSV 행의 ISBN_13, ISBN_KEY, ISBN_10 중 처음으로 올바른 값을 ISBN-13으로 반환합니다.
+    :param book: CSV 행 딕셔너리
+    :return: ISBN-13 문자열 또는 None
+    """
+    return (
+        to_isbn13(book["ISBN_13"])
+        or to_isbn13(book["ISBN_KEY"])
+        or to_isbn13(book["ISBN_10"])
+    )
+
+
+def prepare_book_row(book):
+    """
+    CSV의 책 정보 한 행을 DB 스키마에 맞는 값으로 정리합니다.
+    :param book: CSV 행 딕셔너리
+    :return: 정리된 책 정보 딕셔너리
+    :raises ValueError: ISBN, 제목, 숫자/날짜 값이 올바르지 않은 경우
+    """
+    isbn13 = canonical_isbn13(book)
+    if not isbn13:
+        raise ValueError(f"No valid ISBN for ISBN_KEY {book['ISBN_KEY']!r}")
+    title = book["TITLE"].strip()
+    if not title:
+        raise ValueError(f"Missing TITLE for ISBN_KEY {book['ISBN_KEY']!r}")
+
+    row = {
+        "isbn_key": book["ISBN_KEY"],
+        "isbn10": to_isbn10(isbn13) or None,
+        "isbn13": isbn13,
+        "title": title,
+        "subtitle": book["SUBTITLE"].strip() or None,
+        "original_title": book["ORIGINAL_TITLE"].strip() or None,
+        "publication_date": parse_optional(
+            book["PUBLISHED_DATE"], date.fromisoformat, "PUBLISHED_DATE"
+        ),
+        "edition": book["EDITION"].strip() or None,
+        "pages": parse_optional(book["PAGES"], int, "PAGES", lambda v: v > 0),
+        "description": book["DESCRIPTION"].strip() or None,
+        "cover_image_url": book["THUMBNAIL_URL"].strip() or None,
+        "publisher": book["PUBLISHER"].strip() or None,
+        "category": book["CATEGORY"].strip() or None,
+        "authors": split_names(book["AUTHORS"]),
+        "translators": split_names(book["TRANSLATORS"]),
+        "tags": split_names(book["TAGS"]),
+        "rating": parse_optional(
+            book["RATING"], Decimal, "RATING", lambda v: 0 <= v <= 5
+        ),
+        "review_text": book["REVIEW_TEXT"].strip() or None,
+    }
+    for i in range(1, 7):
+        row[f"hexagon_value_{i}"] = parse_optional(
+            book[f"HEX{i}"], int, f"HEX{i}", lambda v: 0 <= v <= 5
+        )
+    fit_schema_lengths(row)
+    row["content_fingerprint"] = compute_fingerprint(row)
+    return row
+
+
+def fit_schema_lengths(row):
+    """
+    스키마의 최대 길이보다 긴 값을 자르고, 너무 긴 표지 URL은 버립니다. (경고 로그를 남김)
+    :param row: prepare_book_row()에서 정리 중인 값 (갱신됨)
+    """
+    for column, max_length in COLUMN_MAX_LENGTHS.items():
+        if row[column] and len(row[column]) > max_length:
+            logging.warning(
+                "Truncated %s of ISBN_KEY %s to %d characters.",
+                column,
+                row["isbn_key"],
+                max_length,
+            )
+            row[column] = row[column][:max_length]
+    for field, max_length in NAME_MAX_LENGTHS.items():
+        if any(len(name) > max_length for name in row[field]):
+            logging.warning(
+                "Truncated %s names of ISBN_KEY %s to %d characters.",
+                field,
+                row["isbn_key"],
+                max_length,
+            )
+            # 잘라서 같아진 이름은 하나만 남김
+            row[field] = list(dict.fromkeys(name[:max_length] for name in row[field]))
+    url = row["cover_image_url"]
+    if url and len(url) > COVER_URL_MAX_LENGTH:
+        logging.warning(
+            "Dropped cover_image_url of ISBN_KEY %s longer than %d characters.",
+            row["isbn_key"],
+            COVER_URL_MAX_LENGTH,
+        )
+        row["cover_image_url"] = None
+
+
+def compute_fingerprint(row):
+    """
+    정리된 책 정보의 내용 지문을 계산합니다. DB에 저장된 지문과 같으면 바뀐 내용이 없는 행입니다.
+    :param row: prepare_book_row()에서 정리한 값
+    :return: 32자리 16진수 문자열
+    """
+    values = json.dumps(
+        [row[field] for field in FINGERPRINT_FIELDS], ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(values.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def select_changed_rows(cursor, prepared, counts):
+    """
+    배치의 지문을 DB에 저장된 지문과 한 번의 쿼리로 비교해 새로 추가되거나 바뀐 행만 골라냅니다.
+    :param cursor: 데이터베이스 커서
+    :param prepared: prepare_batch()의 반환값
+    :param counts: "inserted", "updated", "unchanged" 행 수 딕셔너리 (unchanged를 갱신)
+    :return: 반영할 (CSV 행, 정리된 행) 튜플 리스트 (정리된 행의 "change"에 "inserted"/"updated")
+    """
+    with METRICS.timer("db_statement", statement="select_fingerprints"):
         cursor.execute(
-            f"INSERT INTO {table} ({column}) VALUES (%s) RETURNING {table}_id", (value,)
+            "SELECT isbn13, content_fingerprint FROM books WHERE isbn13 = ANY(%s)",
+            ([row["isbn13"] for _, row in prepared],),
         )
-        return cursor.fetchone()[0]
+    # 지문이 NULL인 (지문 도입 전에 적재된) 행도 "이미 있음"으로 구분하기 위해 튜플로 보관
+    fingerprints = {isbn13: (fingerprint,) for isbn13, fingerprint in cursor.fetchall()}
+    changed = []
+    for book, row in prepared:
+        stored = fingerprints.get(row["isbn13"])
+        if stored and stored[0] == row["content_fingerprint"]:
+            counts["unchanged"] += 1
+            METRICS.inc("db_rows_total", result="unchanged")
+            continue
+        row["change"] = "updated" if stored else "inserted"
+        # 같은 ISBN이 배치 안에 다시 나오면 이번 행과 비교
+        fingerprints[row["isbn13"]] = (row["content_fingerprint"],)
+        changed.append((book, row))
+    return changed
+
+
+def count_written(rows, counts):
+    """
+    DB에 반영한 행을 "inserted"/"updated"로 나눠 셉니다.
+    """
+    for row in rows:
+        counts[row["change"]] += 1
+        METRICS.inc("db_rows_total", result=row["change"])
+
+
+def has_analysis(row):
+    """
+    book_analyses에 저장할 값(평점, 서평, 6각형 값)이 하나라도 있는지 확인합니다.
+    """
+    return any(row[column] is not None for column in ANALYSIS_COLUMNS)
+
 
 def read_book_info_csv(filename):
     """
@@ -98,105 +492,859 @@ def read_book_info_csv(filename):
     :param filename: CSV 파일 경로
     :return: 책 정보 리스트
     """
-    book_info_list = []
+    return list(iter_book_info_csv(filename))
+
+
+def iter_book_info_csv(filename):
+    """
+    CSV 파일에서 책 정보를 한 행씩 읽어 반환하는 제너레이터
+    :param filename: CSV 파일 경로
+    :return: 책 정보 딕셔너리
+    """
     if os.path.exists(filename):
         with open(filename, mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                book_info_list.append(row)
-    return book_info_list
+            yield from csv.DictReader(file)
+
+
+def is_updated_row(book):
+    """
+    IS_UPDATED가 TRUE인 (Kakao API로 정보를 채운) 행인지 확인합니다.
+    """
+    return book["IS_UPDATED"].strip().upper() == "TRUE"
+
+
+def delete_stale_links(cursor, book_id, row, tag_ids, person_roles):
+    """
+    바뀐 도서에서 새 내용에 없는 태그, 저자/번역가 연결과 분석 정보를 삭제합니다.
+    (편집/그림 참여자는 CSV로 관리하지 않으므로 그대로 둠)
+    :param cursor: 데이터베이스 커서
+    :param book_id: 도서 ID
+    :param row: prepare_book_row()의 반환값
+    :param tag_ids: 새 태그 ID 리스트
+    :param person_roles: 새 (person_id, role) 리스트
+    """
+    cursor.execute(
+        "DELETE FROM book_tags WHERE book_id = %s AND tag_id <> ALL(%s::integer[])",
+        (book_id, tag_ids),
+    )
+    cursor.execute(
+        """
+        DELETE FROM book_persons
+        WHERE book_id = %s
+          AND role IN ('author', 'translator')
+          AND (person_id, role) NOT IN (
+              SELECT * FROM unnest(%s::integer[], %s::varchar[])
+          )
+        """,
+        (
+            book_id,
+            [person_id for person_id, _ in person_roles],
+            [role for _, role in person_roles],
+        ),
+    )
+    if not has_analysis(row):
+        cursor.execute("DELETE FROM book_analyses WHERE book_id = %s", (book_id,))
+
+
+def update_book_row(cursor, row, dimensions):
+    """
+    정리된 책 정보 한 건을 books와 연결 테이블에 반영합니다.
+    :param cursor: 데이터베이스 커서
+    :param row: prepare_book_row()의 반환값
+    :param dimensions: DimensionCache
+    :return: book_id
+    """
+    # 출판사, 카테고리, 태그, 저자, 번역가 처리
+    # (update_rows_with_savepoints의 resolve_rows가 이미 찾아서 센 이름이므로 통계에 다시 세지 않음)
+    publisher_id = (
+        dimensions.get_id("publishers", row["publisher"], count=False)
+        if row["publisher"]
+        else None
+    )
+    category_id = (
+        dimensions.get_id("categories", row["category"], count=False)
+        if row["category"]
+        else None
+    )
+    tag_ids = list(dimensions.resolve("tags", row["tags"], count=False).values())
+    person_roles = [
+        (person_id, role)
+        for role, names in (("author", row["authors"]), ("translator", row["translators"]))
+        for person_id in dimensions.resolve("persons", names, count=False).values()
+    ]
+
+    # 책 정보 업데이트
+    cursor.execute(
+        f"""
+        INSERT INTO books ({", ".join(BOOK_COLUMNS)}, publisher_id, category_id)
+        VALUES ({", ".join(["%s"] * (len(BOOK_COLUMNS) + 2))})
+        ON CONFLICT (isbn13) DO UPDATE SET
+            {", ".join(f"{c} = EXCLUDED.{c}" for c in BOOK_COLUMNS[2:])},
+            isbn10 = EXCLUDED.isbn10,
+            publisher_id = EXCLUDED.publisher_id,
+            category_id = EXCLUDED.category_id
+        RETURNING book_id
+        """,
+        [row[c] for c in BOOK_COLUMNS] + [publisher_id, category_id],
+    )
+    book_id = cursor.fetchone()[0]
+
+    # 평점, 서평, 6각형 값 저장
+    if has_analysis(row):
+        cursor.execute(
+            f"""
+            INSERT INTO book_analyses (book_id, {", ".join(ANALYSIS_COLUMNS)})
+            VALUES (%s, {", ".join(["%s"] * len(ANALYSIS_COLUMNS))})
+            ON CONFLICT (book_id) DO UPDATE SET
+                {", ".join(f"{c} = EXCLUDED.{c}" for c in ANALYSIS_COLUMNS)}
+            """,
+            [book_id] + [row[c] for c in ANALYSIS_COLUMNS],
+        )
+    if row["change"] == "updated":
+        delete_stale_links(cursor, book_id, row, tag_ids, person_roles)
+    # 태그와 책 연결
+    for tag_id in tag_ids:
+        cursor.execute(
+            "INSERT INTO book_tags (book_id, tag_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+            (book_id, tag_id),
+        )
+    # 저자/번역가와 책 연결
+    for person_id, role in person_roles:
+        cursor.execute(
+            "INSERT INTO book_persons (book_id, person_id, role) VALUES (%s, %s, %s) "
+            "ON CONFLICT DO NOTHING",
+            (book_id, person_id, role),
+        )
+    return book_id
+
+
+class RejectWriter:
+    """
+    적재하지 못한 CSV 행을 사유와 함께 rejects 파일에 기록합니다.
+    BOOK_INFO_HEADER에 REJECT_REASON 열을 더한 형식이라 고친 뒤 다시 적재할 수 있습니다.
+    :param filename: rejects 파일 경로 (None이면 파일 없이 개수만 셈)
+    """
+
+    def __init__(self, filename=REJECTS_FILENAME):
+        self.filename = filename
+        self.count = 0
+        self.file = None
+        if filename:
+            self.file = open(filename, mode="w", encoding="utf-8", newline="")
+            self.writer = csv.DictWriter(
+                self.file,
+                fieldnames=BOOK_INFO_HEADER + ["REJECT_REASON"],
+                extrasaction="ignore",
+            )
+            self.writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, book, reason):
+        """
+        행 하나를 사유와 함께 기록합니다.
+        :param book: CSV 행 딕셔너리
+        :param reason: 적재하지 못한 사유
+        """
+        logging.error("Rejected ISBN_KEY %s: %s", book["ISBN_KEY"], reason)
+        METRICS.inc("db_rows_total", result="rejected")
+        if self.file:
+            self.writer.writerow({**book, "REJECT_REASON": str(reason).strip()})
+        self.count += 1
 
-def update_books_in_db(book_info_list):
+    def close(self):
+        """
+        파일 닫기
+        """
+        if self.file:
+            self.file.close()
+
+
+def iter_batches(book_info_iter, batch_size):
+    """
+    IS_UPDATED가 TRUE인 행만 batch_size개씩 묶어 반환하는 제너레이터
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param batch_size: 배치당 행 수
+    :return: 책 정보 딕셔너리 리스트
+    """
+    updated_rows = (book for book in book_info_iter if is_updated_row(book))
+    while True:
+        batch = list(itertools.islice(updated_rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def prepare_batch(batch, rejects):
+    """
+    배치의 각 행을 prepare_book_row()로 정리하고, 값이 잘못된 행은 rejects 파일에 기록합니다.
+    :param batch: 책 정보 딕셔너리 리스트
+    :param rejects: RejectWriter
+    :return: (CSV 행, 정리된 행) 튜플 리스트
+    """
+    prepared = []
+    for book in batch:
+        try:
+            prepared.append((book, prepare_book_row(book)))
+        except ValueError as e:
+            rejects.write(book, e)
+    return prepared
+
+
+def update_rows_with_savepoints(cursor, prepared, dimensions, rejects):
+    """
+    정리된 행을 한 건씩 SAVEPOINT 안에서 반영합니다.
+    DB 오류가 난 행만 SAVEPOINT로 되돌리고 rejects 파일에 기록하므로 나머지 행은 그대로 반영됩니다.
+    연결을 넣을 때마다 트리거가 도서 행을 다시 쓰지 않도록, 검색 컬럼은 마지막에 한 번에 갱신합니다.
+    :param cursor: 데이터베이스 커서
+    :param prepared: prepare_batch()의 반환값
+    :param dimensions: DimensionCache
+    :param rejects: RejectWriter
+    :return: 반영한 정리된 행 리스트
+    """
+    # SAVEPOINT 밖에서 설정하므로 행을 되돌려도 commit까지 유지됨
+    cursor.execute(DEFER_BOOK_SEARCH_SQL)
+    # 참조 테이블 ID를 배치 단위로 먼저 찾음 (실패하면 행마다 찾도록 넘어감)
+    cursor.execute("SAVEPOINT dimension_batch")
+    mark = dimensions.mark()
+    try:
+        dimensions.resolve_rows([row for _, row in prepared])
+        cursor.execute("RELEASE SAVEPOINT dimension_batch")
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT dimension_batch")
+        dimensions.rollback(mark)
+        logging.warning("Batch dimension lookup failed, resolving per row: %s", e)
+
+    updated = []
+    book_ids = []
+    for book, row in prepared:
+        cursor.execute("SAVEPOINT book_row")
+        mark = dimensions.mark()
+        try:
+            with METRICS.timer("db_statement", statement="upsert_book_row"):
+                book_id = update_book_row(cursor, row, dimensions)
+        except psycopg2.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT book_row")
+            dimensions.rollback(mark)
+            rejects.write(book, e)
+            continue
+        cursor.execute("RELEASE SAVEPOINT book_row")
+        updated.append(row)
+        book_ids.append(book_id)
+        logging.info("Updated book with ISBN_KEY: %s", row["isbn_key"])
+    if book_ids:
+        with METRICS.timer("db_statement", statement="refresh_book_search"):
+            cursor.execute(REFRESH_BOOK_SEARCH_SQL, (book_ids,))
+    return updated
+
+
+def load_batch(conn, cursor, batch, dimensions, rejects, counts):
+    """
+    CSV 행 한 배치를 정리하고, 바뀐 행만 SAVEPOINT 단위로 반영한 뒤 commit합니다.
+    :param conn: 데이터베이스 연결
+    :param cursor: 데이터베이스 커서
+    :param batch: 책 정보 딕셔너리 리스트
+    :param dimensions: DimensionCache
+    :param rejects: RejectWriter
+    :param counts: new_change_counts()의 반환값 (갱신됨)
+    :return: 바뀐 내용이 없거나 반영한 행의 ISBN_KEY 리스트 (거부된 행 제외)
+    """
+    with METRICS.timer("db_batch"):
+        prepared = prepare_batch(batch, rejects)
+        changed = select_changed_rows(cursor, prepared, counts)
+        written = update_rows_with_savepoints(cursor, changed, dimensions, rejects)
+        with METRICS.timer("db_statement", statement="commit"):
+            conn.commit()
+    dimensions.commit()
+    count_written(written, counts)
+    failed = {id(row) for _, row in changed} - {id(row) for row in written}
+    return [row["isbn_key"] for _, row in prepared if id(row) not in failed]
+
+
+def new_change_counts():
+    """
+    추가/변경/변경 없음 행 수를 세는 딕셔너리
+    """
+    return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+
+def log_batch_progress(batch_size, counts, rejects, started_at):
+    """
+    배치를 commit한 뒤 진행 상황(추가/변경/변경 없음/거부 행 수, 초당 행 수)을 기록합니다.
+    """
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    logging.info(
+        "Committed batch (batch size %d): %d inserted, %d updated, %d unchanged, "
+        "%d rejected (%.1f rows/s).",
+        batch_size,
+        counts["inserted"],
+        counts["updated"],
+        counts["unchanged"],
+        rejects.count,
+        (sum(counts.values()) + rejects.count) / elapsed,
+    )
+
+
+def update_books_in_db(
+    book_info_iter, batch_size=COMMIT_BATCH_SIZE, rejects_filename=REJECTS_FILENAME
+):
     """
     CSV 파일에서 읽은 책 정보를 데이터베이스에 업데이트합니다.
-    :param book_info_list: 책 정보 리스트
+    batch_size 행마다 commit하고, 잘못된 행은 건너뛰어 rejects 파일에 기록합니다.
+    DB에 저장된 내용 지문과 같은 (바뀐 내용이 없는) 행은 쓰지 않습니다.
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param batch_size: 트랜잭션당 행 수
+    :param rejects_filename: rejects 파일 경로
+    :return: "inserted", "updated", "unchanged", "rejected" 행 수 딕셔너리
     """
+    conn = psycopg2.connect(**DB_CONFIG)
+    dimensions = None
+    counts = new_change_counts()
+    started_at = time.monotonic()
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
+        with conn.cursor() as cursor, RejectWriter(rejects_filename) as rejects:
+            dimensions = DimensionCache(cursor)
+            for batch in iter_batches(book_info_iter, batch_size):
+                load_batch(conn, cursor, batch, dimensions, rejects, counts)
+                log_batch_progress(batch_size, counts, rejects, started_at)
+    except psycopg2.Error as e:
+        logging.error("Database error: %s", e)
+        conn.rollback()
+        raise
+    finally:
+        if dimensions:
+            dimensions.log_stats()
+        conn.close()
+    return {**counts, "rejected": rejects.count}
 
-        for book in book_info_list:
-            isbn_key = book["ISBN_KEY"]
-            is_updated = book["IS_UPDATED"].strip().upper() == "TRUE"
 
-            if not is_updated:
-                continue
+# ------------------------------------------------------------------------
+# 대량 적재 (COPY + 집합 단위 SQL)
+# ------------------------------------------------------------------------
+STAGING_BOOK_COLUMNS = BOOK_COLUMNS + ["publisher", "category"] + ANALYSIS_COLUMNS
 
-            # 카테고리, 태그, 저자, 번역가, 출판사, 출판일 처리
-            category_id = get_or_create(cursor, "category", "name", book["CATEGORY"])
-            tag_ids = [
-                get_or_create(cursor, "tag", "name", tag.strip())
-                for tag in book["TAGS"].split(",") if tag.strip()
-            ]
-            author_ids = [
-                get_or_create(cursor, "author", "name", author.strip())
-                for author in book["AUTHORS"].split(",") if author.strip()
-            ]
-            translator_ids = [
-                get_or_create(cursor, "translator", "name", translator.strip())
-                for translator in book["TRANSLATORS"].split(",") if translator.strip()
-            ]
-            publisher_id = get_or_create(cursor, "publisher", "name", book["PUBLISHER"])
-
-            # 책 정보 업데이트
-            cursor.execute(
-                """
-                INSERT INTO book (isbn_key, title, subtitle, original_title,
-                                  publisher_id, published_date, pages,
-                                  edition, rating, review_text,
-                                  description, thumbnail_url)
-                VALUES (%s, %s, %s, %s, %s, %s, %s,
-                        %s, %s::numeric(3, 2), %s,
-                        %s, %s)
-                ON CONFLICT (isbn_key) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    subtitle = EXCLUDED.subtitle,
-                    original_title = EXCLUDED.original_title,
-                    publisher_id = EXCLUDED.publisher_id,
-                    published_date = EXCLUDED.published_date,
-                    pages = EXCLUDED.pages,
-                    edition = EXCLUDED.edition,
-                    rating = EXCLUDED.rating,
-                    review_text = EXCLUDED.review_text,
-                    description = EXCLUDED.description,
-                    thumbnail_url = EXCLUDED.thumbnail_url
-                RETURNING book_id
-                """,
-                (
-                    isbn_key,
-                    book["TITLE"],
-                    book["SUBTITLE"],
-                    book["ORIGINAL_TITLE"],
-                    publisher_id,
-                    book["PUBLISHED_DATE"],
-                    book["PAGES"],
-                    book["EDITION"],
-                    book["RATING"],
-                    book["REVIEW_TEXT"],
-                    book["DESCRIPTION"],
-                    book["THUMBNAIL_URL"],
-                ),
-            )
-            book_id = cursor.fetchone()[0]
-            logging.info("Updated book with ISBN_KEY: %s", isbn_key)
-            # 카테고리와 책 연결
-            cursor.execute(
-                "INSERT INTO book_category (book_id, category_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                (book_id, category_id),
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS staging_books (
+    isbn10 VARCHAR(10),
+    isbn13 VARCHAR(13) PRIMARY KEY,
+    title VARCHAR(255),
+    subtitle VARCHAR(255),
+    original_title VARCHAR(255),
+    publication_date DATE,
+    edition VARCHAR(50),
+    pages INTEGER,
+    description TEXT,
+    cover_image_url VARCHAR(255),
+    content_fingerprint CHAR(32),
+    publisher VARCHAR(100),
+    category VARCHAR(100),
+    rating DECIMAL(2,1),
+    review_text TEXT,
+    {", ".join(f"hexagon_value_{i} INTEGER" for i in range(1, 7))}
+);
+CREATE TEMP TABLE IF NOT EXISTS staging_book_names (
+    isbn13 VARCHAR(13) NOT NULL,
+    kind VARCHAR(20) NOT NULL,  -- 'author', 'translator', 'tag'
+    name VARCHAR(100) NOT NULL
+);
+"""
+
+# 배치마다 실행하는 집합 단위 SQL (순서대로 실행)
+BULK_UPSERT_SQL = [
+    # 참조 테이블: 새 이름만 추가
+    """
+    INSERT INTO publishers (name)
+    SELECT DISTINCT publisher FROM staging_books WHERE publisher IS NOT NULL
+    ON CONFLICT (name) DO NOTHING
+    """,
+    """
+    INSERT INTO categories (name)
+    SELECT DISTINCT category FROM staging_books WHERE category IS NOT NULL
+    ON CONFLICT (name) WHERE parent_category_id IS NULL DO NOTHING
+    """,
+    """
+    INSERT INTO tags (name)
+    SELECT DISTINCT name FROM staging_book_names WHERE kind = 'tag'
+    ON CONFLICT (name) DO NOTHING
+    """,
+    # persons.name에는 UNIQUE 제약이 없으므로 없는 이름만 골라서 추가
+    """
+    INSERT INTO persons (name)
+    SELECT DISTINCT n.name FROM staging_book_names n
+    WHERE n.kind IN ('author', 'translator')
+      AND NOT EXISTS (SELECT 1 FROM persons p WHERE p.name = n.name)
+    """,
+    # 도서
+    f"""
+    INSERT INTO books ({", ".join(BOOK_COLUMNS)}, publisher_id, category_id)
+    SELECT {", ".join(f"s.{c}" for c in BOOK_COLUMNS)}, p.publisher_id, c.category_id
+    FROM staging_books s
+    LEFT JOIN publishers p ON p.name = s.publisher
+    LEFT JOIN categories c ON c.name = s.category AND c.parent_category_id IS NULL
+    ON CONFLICT (isbn13) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in BOOK_COLUMNS[2:])},
+        isbn10 = EXCLUDED.isbn10,
+        publisher_id = EXCLUDED.publisher_id,
+        category_id = EXCLUDED.category_id
+    """,
+    # 도서 분석
+    f"""
+    INSERT INTO book_analyses (book_id, {", ".join(ANALYSIS_COLUMNS)})
+    SELECT b.book_id, {", ".join(f"s.{c}" for c in ANALYSIS_COLUMNS)}
+    FROM staging_books s JOIN books b ON b.isbn13 = s.isbn13
+    WHERE {" OR ".join(f"s.{c} IS NOT NULL" for c in ANALYSIS_COLUMNS)}
+    ON CONFLICT (book_id) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in ANALYSIS_COLUMNS)}
+    """,
+    # 바뀐 도서에서 새 내용에 없는 연결과 분석 정보 삭제 (편집/그림 참여자는 CSV로 관리하지 않음)
+    """
+    DELETE FROM book_persons bp
+    USING staging_books s, books b, persons p
+    WHERE b.isbn13 = s.isbn13
+      AND bp.book_id = b.book_id
+      AND p.person_id = bp.person_id
+      AND bp.role IN ('author', 'translator')
+      AND NOT EXISTS (
+          SELECT 1 FROM staging_book_names n
+          WHERE n.isbn13 = s.isbn13 AND n.kind = bp.role AND n.name = p.name
+      )
+    """,
+    """
+    DELETE FROM book_tags bt
+    USING staging_books s, books b, tags t
+    WHERE b.isbn13 = s.isbn13
+      AND bt.book_id = b.book_id
+      AND t.tag_id = bt.tag_id
+      AND NOT EXISTS (
+          SELECT 1 FROM staging_book_names n
+          WHERE n.isbn13 = s.isbn13 AND n.kind = 'tag' AND n.name = t.name
+      )
+    """,
+    f"""
+    DELETE FROM book_analyses a
+    USING staging_books s, books b
+    WHERE b.isbn13 = s.isbn13
+      AND a.book_id = b.book_id
+      AND {" AND ".join(f"s.{c} IS NULL" for c in ANALYSIS_COLUMNS)}
+    """,
+    # 연결 테이블 (같은 이름의 인물이 여럿이면 가장 먼저 등록된 인물로 연결)
+    """
+    INSERT INTO book_persons (book_id, person_id, role)
+    SELECT DISTINCT b.book_id, p.person_id, n.kind
+    FROM staging_book_names n
+    JOIN books b ON b.isbn13 = n.isbn13
+    JOIN (
+        SELECT name, MIN(person_id) AS person_id FROM persons
+        WHERE name IN (SELECT name FROM staging_book_names)
+        GROUP BY name
+    ) p ON p.name = n.name
+    WHERE n.kind IN ('author', 'translator')
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO book_tags (book_id, tag_id)
+    SELECT DISTINCT b.book_id, t.tag_id
+    FROM staging_book_names n
+    JOIN books b ON b.isbn13 = n.isbn13
+    JOIN tags t ON t.name = n.name
+    WHERE n.kind = 'tag'
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    행 목록을 CSV 형식으로 만들어 COPY로 한 번에 적재합니다.
+    :param cursor: 데이터베이스 커서
+    :param table: 대상 테이블
+    :param columns: 열 이름 리스트
+    :param rows: 값 튜플 리스트 (None은 NULL로 적재)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in rows:
+        writer.writerow(["\\N" if v is None else v for v in values])
+    buffer.seek(0)
+    with METRICS.timer("db_statement", statement=f"copy_{table}"):
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+
+def bulk_load_batch(cursor, rows):
+    """
+    정리된 책 정보 한 배치를 staging 테이블에 COPY한 뒤 집합 단위 SQL로 반영합니다.
+    :param cursor: 데이터베이스 커서
+    :param rows: prepare_book_row()의 반환값 리스트
+    """
+    # 같은 ISBN이 배치 안에 여러 번 있으면 마지막 행을 사용
+    rows = list({row["isbn13"]: row for row in rows}.values())
+    cursor.execute("TRUNCATE staging_books, staging_book_names")
+    copy_rows(
+        cursor,
+        "staging_books",
+        STAGING_BOOK_COLUMNS,
+        ([row[c] for c in STAGING_BOOK_COLUMNS] for row in rows),
+    )
+    copy_rows(
+        cursor,
+        "staging_book_names",
+        ["isbn13", "kind", "name"],
+        (
+            (row["isbn13"], kind, name)
+            for row in rows
+            for kind, names in (
+                ("author", row["authors"]),
+                ("translator", row["translators"]),
+                ("tag", row["tags"]),
             )
-            # 태그와 책 연결
-            for tag_id in tag_ids:
-                cursor.execute(
-                    "INSERT INTO book_tag (book_id, tag_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                    (book_id, tag_id),
-                )
-            # 저자와 책 연결
-            for author_id in author_ids:
-                cursor.execute(
-                    "INSERT INTO book_author (book_id, author_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                    (book_id, author_id),
-                )
+            for name in names
+        ),
+    )
+    for number, sql in enumerate(BULK_UPSERT_SQL):
+        with METRICS.timer("db_statement", statement=f"bulk_upsert_{number}"):
+            cursor.execute(sql)
 
 
-if __name__ == "__main__":
+def bulk_load_books(
+    book_info_iter, batch_size=BULK_BATCH_SIZE, rejects_filename=REJECTS_FILENAME
+):
+    """
+    CSV에서 읽은 책 정보를 배치 단위로 COPY하여 데이터베이스에 반영합니다.
+    staging 테이블은 세션 전용 TEMP 테이블이라 WAL에 기록되지 않고 다른 세션과 겹치지 않습니다.
+    배치 SQL이 실패하면 그 배치만 행 단위(SAVEPOINT)로 다시 반영해 잘못된 행을 골라냅니다.
+    DB에 저장된 내용 지문과 같은 (바뀐 내용이 없는) 행은 staging 테이블에 넣지 않습니다.
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param batch_size: 배치당 행 수
+    :param rejects_filename: rejects 파일 경로
+    :return: "inserted", "updated", "unchanged", "rejected" 행 수 딕셔너리
+    """
+    conn = psycopg2.connect(**DB_CONFIG)
+    dimensions = None
+    counts = new_change_counts()
+    started_at = time.monotonic()
+    try:
+        with conn.cursor() as cursor, RejectWriter(rejects_filename) as rejects:
+            cursor.execute(CREATE_STAGING_SQL)
+            for batch in iter_batches(book_info_iter, batch_size):
+                prepared = prepare_batch(batch, rejects)
+                changed = select_changed_rows(cursor, prepared, counts)
+                cursor.execute("SAVEPOINT bulk_batch")
+                try:
+                    bulk_load_batch(cursor, [row for _, row in changed])
+                    cursor.execute("RELEASE SAVEPOINT bulk_batch")
+                    count_written([row for _, row in changed], counts)
+                except psycopg2.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bulk_batch")
+                    logging.warning("Bulk batch failed, retrying row by row: %s", e)
+                    dimensions = dimensions or DimensionCache(cursor)
+                    count_written(
+                        update_rows_with_savepoints(cursor, changed, dimensions, rejects),
+                        counts,
+                    )
+                conn.commit()
+                if dimensions:
+                    dimensions.commit()
+                log_batch_progress(batch_size, counts, rejects, started_at)
+    except psycopg2.Error as e:
+        logging.error("Database error: %s", e)
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {**counts, "rejected": rejects.count}
+
+
+def dry_run_books(book_info_iter, batch_size=BULK_BATCH_SIZE):
+    """
+    DB에 쓰지 않고 추가/변경/변경 없음/거부될 행 수만 계산해 출력합니다.
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param batch_size: 지문을 한 번에 비교하는 행 수
+    """
+    conn = psycopg2.connect(**DB_CONFIG)
+    counts = new_change_counts()
+    try:
+        with conn.cursor() as cursor, RejectWriter(None) as rejects:
+            for batch in iter_batches(book_info_iter, batch_size):
+                prepared = prepare_batch(batch, rejects)
+                changed = select_changed_rows(cursor, prepared, counts)
+                count_written([row for _, row in changed], counts)
+    finally:
+        conn.close()
+    print(
+        f"Dry run: {counts['inserted']} to insert, {counts['updated']} to update, "
+        f"{counts['unchanged']} unchanged, {rejects.count} rejected."
+    )
+
+
+# ------------------------------------------------------------------------
+# 병렬 적재 (ISBN 해시로 나눈 파티션을 프로세스마다 별도 연결로 적재)
+# ------------------------------------------------------------------------
+def partition_book_info(book_info_iter, workers, directory):
+    """
+    CSV 행을 ISBN-13 해시로 나눠 파티션 파일에 쓰고, 올바른 행의 참조 테이블 이름을 모읍니다.
+    ISBN-10/ISBN-13 표기가 달라도 같은 책은 같은 파티션에 들어가므로 파티션끼리 같은 books 행을 쓰지 않습니다.
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param workers: 파티션 수
+    :param directory: 파티션 파일을 쓸 디렉토리
+    :return: (파티션 파일 경로 리스트, {테이블 이름: 이름 집합} 딕셔너리)
+    """
+    paths = [os.path.join(directory, f"part_{i:03d}.csv") for i in range(workers)]
+    files = [open(path, mode="w", encoding="utf-8", newline="") for path in paths]
+    names = {table: set() for table in TABLE_ID_COLUMNS}
+    try:
+        writers = [csv.DictWriter(file, fieldnames=BOOK_INFO_HEADER) for file in files]
+        for writer in writers:
+            writer.writeheader()
+        for book in book_info_iter:
+            if not is_updated_row(book):
+                continue
+            isbn13 = canonical_isbn13(book) or book["ISBN_KEY"]
+            writers[zlib.crc32(isbn13.encode("utf-8")) % workers].writerow(book)
+            try:
+                row = prepare_book_row(book)
+            except ValueError:
+                continue  # 파티션을 적재하는 프로세스에서 rejects 파일에 기록
+            if row["publisher"]:
+                names["publishers"].add(row["publisher"])
+            if row["category"]:
+                names["categories"].add(row["category"])
+            names["persons"].update(row["authors"], row["translators"])
+            names["tags"].update(row["tags"])
+    finally:
+        for file in files:
+            file.close()
+    return paths, names
+
+
+def resolve_dimension_names(names):
+    """
+    모든 파티션에서 쓰는 참조 테이블 이름을 하나의 연결에서 정렬된 순서로 미리 추가합니다.
+    적재 프로세스는 이미 있는 이름만 조회하므로, 같은 이름을 동시에 추가하다가
+    서로의 잠금을 기다리는 교착 상태가 생기지 않습니다.
+    :param names: {테이블 이름: 이름 집합} 딕셔너리
+    """
+    conn = psycopg2.connect(**DB_CONFIG)
+    dimensions = None
+    try:
+        with conn.cursor() as cursor:
+            dimensions = DimensionCache(cursor)
+            for table in TABLE_ID_COLUMNS:
+                table_names = sorted(names[table])
+                for i in range(0, len(table_names), DIMENSION_PREPASS_CHUNK):
+                    chunk = table_names[i : i + DIMENSION_PREPASS_CHUNK]
+                    try:
+                        dimensions.resolve(table, chunk)
+                    except psycopg2.Error:
+                        conn.rollback()
+                        dimensions.rollback()
+                        # 추가할 수 없는 이름(열 길이 초과 등)만 빼고 하나씩 추가
+                        for name in chunk:
+                            cursor.execute("SAVEPOINT dimension_name")
+                            mark = dimensions.mark()
+                            try:
+                                dimensions.resolve(table, [name])
+                                cursor.execute("RELEASE SAVEPOINT dimension_name")
+                            except psycopg2.Error as e:
+                                cursor.execute("ROLLBACK TO SAVEPOINT dimension_name")
+                                dimensions.rollback(mark)
+                                logging.warning("Skipping %s name %r: %s", table, name, e)
+                    conn.commit()
+                    dimensions.commit()
+    except psycopg2.Error as e:
+        logging.error("Database error: %s", e)
+        conn.rollback()
+        raise
+    finally:
+        if dimensions:
+            dimensions.log_stats()
+        conn.close()
+
+
+def load_partition(path, bulk, batch_size, rejects_filename):
+    """
+    파티션 파일 하나를 적재합니다. (프로세스 풀에서 실행, 프로세스마다 별도의 DB 연결 사용)
+    :return: ("inserted", "updated", "unchanged", "rejected" 행 수 딕셔너리, 작업자 메트릭 스냅샷)
+    """
+    load = bulk_load_books if bulk else update_books_in_db
+    counts = load(iter_book_info_csv(path), batch_size, rejects_filename)
+    return counts, METRICS.take_snapshot()
 
+
+def merge_rejects(part_filenames, rejects_filename):
+    """
+    파티션별 rejects 파일을 하나로 합치고 삭제합니다.
+    """
+    with open(rejects_filename, mode="w", encoding="utf-8", newline="") as output:
+        for i, part_filename in enumerate(part_filenames):
+            with open(part_filename, mode="r", encoding="utf-8", newline="") as part:
+                if i > 0:
+                    part.readline()  # 헤더는 첫 파일에서만 사용
+                shutil.copyfileobj(part, output)
+            os.remove(part_filename)
+
+
+def parallel_load_books(
+    book_info_iter,
+    workers=LOAD_WORKERS,
+    bulk=False,
+    batch_size=None,
+    rejects_filename=REJECTS_FILENAME,
+):
+    """
+    CSV를 ISBN 해시로 파티션을 나눠 여러 프로세스에서 동시에 적재합니다.
+    1) 파티션 파일을 만들면서 참조 테이블 이름을 모으고, 2) 이름을 한 연결에서 미리 추가한 뒤,
+    3) 파티션마다 프로세스 하나가 자기 연결로 update_books_in_db/bulk_load_books를 실행합니다.
+    :param book_info_iter: 책 정보 딕셔너리의 iterable
+    :param workers: 프로세스 수
+    :param bulk: True이면 각 파티션을 COPY로 대량 적재
+    :param batch_size: 트랜잭션당 행 수
+    :param rejects_filename: rejects 파일 경로
+    :return: "inserted", "updated", "unchanged", "rejected" 행 수 딕셔너리
+    """
+    batch_size = batch_size or (BULK_BATCH_SIZE if bulk else COMMIT_BATCH_SIZE)
+    started_at = time.monotonic()
+    with tempfile.TemporaryDirectory(
+        dir=os.path.dirname(os.path.abspath(rejects_filename))
+    ) as directory:
+        paths, names = partition_book_info(book_info_iter, workers, directory)
+        resolve_dimension_names(names)
+        logging.info(
+            "Partitioned input into %d files and resolved dimensions in %.1fs.",
+            workers,
+            time.monotonic() - started_at,
+        )
+
+        part_rejects = [f"{path}.rejects" for path in paths]
+        totals = {**new_change_counts(), "rejected": 0}
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker_metrics
+        ) as executor:
+            for counts, snapshot in executor.map(
+                load_partition,
+                paths,
+                [bulk] * workers,
+                [batch_size] * workers,
+                part_rejects,
+            ):
+                for key, value in counts.items():
+                    totals[key] += value
+                METRICS.merge(snapshot)
+        merge_rejects(part_rejects, rejects_filename)
+
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    logging.info(
+        "Loaded with %d workers: %d inserted, %d updated, %d unchanged, %d rejected "
+        "in %.1fs (%.1f rows/s).",
+        workers,
+        totals["inserted"],
+        totals["updated"],
+        totals["unchanged"],
+        totals["rejected"],
+        elapsed,
+        sum(totals.values()) / elapsed,
+    )
+    return totals
+
+
+def iter_book_info_store(path=BOOK_INFO_STORE_PATH):
+    """
+    SQLite 스테이징 저장소에서 IS_UPDATED가 TRUE인 행만 읽어 반환하는 제너레이터
+    상태 인덱스를 사용하므로 아직 갱신되지 않은 행은 읽지 않습니다.
+    :param path: 저장소 파일 경로
+    :return: 책 정보 딕셔너리
+    """
+    with BookInfoStore(path) as store:
+        yield from store.iter_rows(updated=True)
+
+
+def parse_args():
+    """
+    명령행 인자 파싱
+    """
+    parser = argparse.ArgumentParser(
+        description="Load the book information CSV file into the database."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--bulk",
+        action="store_true",
+        help="load with COPY into a staging table and set-based upserts",
+    )
+    mode.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only print how many rows would be inserted, updated or left unchanged",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help=f"rows per transaction (default: {COMMIT_BATCH_SIZE}, "
+        f"{BULK_BATCH_SIZE} with --bulk)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=LOAD_WORKERS,
+        help="number of loader processes, each with its own connection "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rejects",
+        default=REJECTS_FILENAME,
+        help="file for rows that could not be loaded (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="read IS_UPDATED=TRUE rows from the SQLite staging store instead of "
+        "book_info.csv",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.dry_run:
+        install_metrics("update_csv_to_db")
+    logging.info("===============================")
+    logging.info("DateTime: %s", time.strftime("%Y-%m-%d %H:%M:%S"))
+    source = BOOK_INFO_STORE_PATH if args.store else BOOK_INFO_FILENAME
+    book_info_iter = (
+        iter_book_info_store() if args.store else iter_book_info_csv(BOOK_INFO_FILENAME)
+    )
+    logging.info("Starting the script to update the database from %s.", source)
+    logging.info("--------------------------------")
+    if args.dry_run:
+        dry_run_books(
+            book_info_iter, args.batch_size or BULK_BATCH_SIZE
+        )
+    elif args.workers > 1:
+        parallel_load_books(
+            book_info_iter,
+            args.workers,
+            args.bulk,
+            args.batch_size,
+            args.rejects,
+        )
+    elif args.bulk:
+        bulk_load_books(
+            book_info_iter,
+            args.batch_size or BULK_BATCH_SIZE,
+            args.rejects,
+        )
+    else:
+        update_books_in_db(
+            book_info_iter,
+            args.batch_size or COMMIT_BATCH_SIZE,
+            args.rejects,
+        )
+    logging.info("Finished updating the database.")
+    logging.info("===============================")
+    sys.exit(0)